@@ -0,0 +1,131 @@
+import os, threading
+
+import docx_render
+from meeting_catalog import catalog
+from meeting_search import search_index, action_items_text
+from outbox import outbox
+
+# ===================== 설정 =====================
+# 클라이언트가 수정할 수 있는 필드
+EDITABLE_FIELDS = ("name", "task", "due")
+# 수정 후 JSON/DOCX/두 DB/검색 색인 반영까지 기다리는 시간 (그 사이 같은 회의의 수정은 한 번에 반영)
+FLUSH_DELAY_SEC = float(os.getenv("ACTION_ITEMS_FLUSH_SEC", "2"))
+
+
+class ActionItemNotFound(LookupError):
+    pass
+
+
+class VersionConflict(Exception):
+    """클라이언트가 본 버전 이후에 다른 수정이 먼저 반영됨"""
+
+    def __init__(self, current: dict):
+        super().__init__(f"액션아이템 {current.get('id')} 버전 불일치 (현재 {current.get('version')})")
+        self.current = current
+
+
+# 같은 회의의 읽기-수정-쓰기가 겹치지 않도록
+_lock = threading.Lock()
+# 반영 대기 중인 회의 → 타이머
+_pending = {}
+_pending_lock = threading.Lock()
+
+
+# ===================== 단건 수정 (PATCH) =====================
+def patch_item(item_id: str, changes: dict, version: int) -> dict:
+    """액션아이템 하나만 수정 (낙관적 동시성: version이 현재 버전과 같을 때만 반영) → 수정된 항목"""
+    with _lock:
+        meeting = _load_meeting(catalog.find_action_item(item_id))
+        item = next((a for a in meeting["action_items"] if a.get("id") == item_id), None)
+        if item is None:
+            raise ActionItemNotFound(item_id)
+        if item.get("version", 1) != version:
+            raise VersionConflict(dict(item))
+
+        updates = {k: v for k, v in changes.items() if k in EDITABLE_FIELDS and item.get(k) != v}
+        if updates:
+            item.update(updates)
+            item["version"] = version + 1
+            catalog.update_action_item(meeting["name"], item)  # 카탈로그는 해당 행만 바로 갱신
+            _schedule(meeting["name"])
+        return item
+
+
+# ===================== 전체 교체 (기존 /api/update_action_item 호환) =====================
+def replace_items(meeting_name: str, items: list):
+    """배열 전체를 받아 바뀐 항목만 버전을 올려 반영 → 카탈로그 버전 (회의가 없으면 None)"""
+    with _lock:
+        try:
+            meeting = _load_meeting(meeting_name)
+        except ActionItemNotFound:
+            return None
+        previous = {a["id"]: a for a in meeting["action_items"] if a.get("id")}
+        merged = []
+        for new in items:
+            old = previous.get(new.get("id"))
+            item = {k: new.get(k) for k in EDITABLE_FIELDS}
+            if old is not None:
+                changed = any(old.get(k) != item[k] for k in EDITABLE_FIELDS)
+                item.update(id=old["id"], version=old.get("version", 1) + (1 if changed else 0))
+            merged.append(item)
+        meeting["action_items"] = merged
+        return _propagate(meeting)
+
+
+def _load_meeting(name):
+    meeting = catalog.get(name) if name else None
+    if meeting is None:
+        raise ActionItemNotFound(name)
+    return meeting
+
+
+def _propagate(meeting: dict) -> int:
+    """카탈로그는 바로 갱신하고, 나머지 저장소(검색 색인, JSON, 두 DB, DOCX)는 모아서 반영"""
+    summary = {k: meeting[k] for k in ("topic_summary", "content_summary", "decisions", "action_items")}
+    version = catalog.upsert(meeting["name"], meeting["meeting_date"], summary, meeting["meeting_file"])  # 바뀐 행만 갱신
+    _schedule(meeting["name"])
+    return version
+
+
+# ===================== 지연 반영 (연속 수정 → 마지막 상태로 1회) =====================
+def _schedule(name: str):
+    with _pending_lock:
+        if name in _pending:
+            return
+        timer = threading.Timer(FLUSH_DELAY_SEC, _flush_one, args=(name,))
+        timer.daemon = True
+        _pending[name] = timer
+        timer.start()
+
+
+def _flush_one(name: str):
+    """카탈로그의 최신 상태를 파이프라인이 썼던 나머지 저장소에 반영"""
+    with _pending_lock:
+        timer = _pending.pop(name, None)
+    if timer is None:  # 이미 flush() 가 반영함
+        return
+    timer.cancel()
+    meeting = catalog.get(name)
+    if meeting is None:
+        return
+    meeting_date = meeting["meeting_date"]
+    summary = {k: meeting[k] for k in ("topic_summary", "content_summary", "decisions", "action_items")}
+
+    from meeting_api import write_json  # LLM 스택 import를 서버 시작 경로에서 빼기 위해 지연 import
+    try:
+        search_index.update_field(name, "action_items", action_items_text(summary["action_items"]))
+        write_json(name, meeting_date, summary)
+        if meeting["meeting_file"]:
+            # 개인/팀원 DB는 outbox를 거쳐 meeting_file 기준 upsert (회의 1행)
+            outbox.enqueue(meeting["meeting_file"], summary)
+        docx_render.submit(name, meeting_date, summary)
+    except Exception as e:
+        print(f"❌ 액션아이템 반영 실패 ({name}):", e)
+
+
+def flush():
+    """대기 중인 반영을 바로 실행 (서버 종료 시 outbox/DOCX 풀을 닫기 전에 호출)"""
+    with _pending_lock:
+        names = list(_pending)
+    for name in names:
+        _flush_one(name)
@@ -0,0 +1,157 @@
+import os, json, time, wave, argparse
+from concurrent.futures import wait, FIRST_COMPLETED
+
+import chunked_stt, db_store, docx_render
+from job_queue import JobManager, QueueFullError, DONE, STT_WORKERS, LLM_WORKERS
+from outbox import outbox
+from result_cache import audio_hash
+
+# ===================== 설정 =====================
+WAV_DIR = "wav.file"
+CHECKPOINT_PATH = os.getenv("BATCH_CHECKPOINT", os.path.join(db_store.SQLITE_DIR, "batch_checkpoint.json"))
+
+
+# ===================== 체크포인트 =====================
+def load_checkpoint(path: str) -> dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: str, state: dict):
+    """중간에 죽어도 파일이 깨지지 않도록 임시 파일에 쓰고 교체"""
+    dirname = os.path.dirname(path)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+# ===================== 대상 탐색 =====================
+def audio_seconds(path: str):
+    try:
+        with wave.open(path) as w:
+            return w.getnframes() / w.getframerate()
+    except Exception:
+        return None
+
+
+def file_stat(path: str) -> dict:
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def discover(wav_dir: str, state: dict, force: bool = False) -> list:
+    """새로 생겼거나 내용이 바뀐 WAV만 (내용 해시가 체크포인트와 같고 성공한 파일은 건너뜀)
+    크기/수정시각이 체크포인트와 같으면 저장된 해시를 그대로 쓰고, 달라진 파일만 다시 해시"""
+    todo = []
+    for name in sorted(f for f in os.listdir(wav_dir) if f.endswith(".wav")):
+        path = os.path.join(wav_dir, name)
+        stat = file_stat(path)
+        done = state.get(name)
+        if done and done.get("hash") and all(done.get(k) == v for k, v in stat.items()):
+            digest = done["hash"]
+        else:
+            digest = audio_hash(path)
+            if done and done.get("hash") == digest:
+                done.update(stat)  # 내용은 그대로(touch/복사) → 다음 실행부터는 해시 생략
+        if not force and done and done.get("hash") == digest and done.get("status") == DONE:
+            continue
+        todo.append((name, path, digest, stat))
+    return todo
+
+
+# ===================== 배치 실행 =====================
+def run_batch(wav_dir: str = WAV_DIR, checkpoint: str = CHECKPOINT_PATH, stt_workers: int = STT_WORKERS,
+              llm_workers: int = LLM_WORKERS, max_inflight: int = None, backend: str = None,
+              model_size: str = None, force: bool = False, limit: int = None) -> dict:
+    """STT 풀과 LLM/DB 풀을 분리한 작업 큐로 파일들을 흘려보냄
+    → 파일 N이 요약/저장 단계에 있는 동안 파일 N+1의 STT가 진행됨"""
+    state = load_checkpoint(checkpoint)
+    todo = discover(wav_dir, state, force)[:limit]
+    if state:
+        save_checkpoint(checkpoint, state)  # discover 가 갱신한 크기/수정시각 반영
+    print(f"📂 대상 {len(todo)}개 (체크포인트: {checkpoint})")
+    if not todo:
+        return {"files": 0}
+
+    # 동시에 올려둘 작업 수: 두 단계가 모두 쉬지 않을 만큼만 (나머지는 여기서 대기)
+    max_inflight = max_inflight or stt_workers + llm_workers + 1
+    manager = JobManager(stt_workers, llm_workers, max_pending=max_inflight)
+    db_store.bootstrap()
+    outbox.start()
+
+    started = time.perf_counter()
+    inflight, queue = {}, list(todo)
+    totals = {"files": 0, "done": 0, "failed": 0, "audio_sec": 0.0}
+    try:
+        while queue or inflight:
+            while queue and len(inflight) < max_inflight:
+                name, path, digest, stat = queue[0]
+                try:
+                    job, _ = manager.submit(name, path, backend, model_size)
+                except QueueFullError:
+                    break
+                queue.pop(0)
+                inflight[job.completion] = (job, digest, stat, audio_seconds(path))
+
+            finished, _ = wait(list(inflight), return_when=FIRST_COMPLETED)
+            for fut in finished:
+                job, digest, stat, seconds = inflight.pop(fut)
+                totals["files"] += 1
+                totals[job.status if job.status == DONE else "failed"] += 1
+                if job.status == DONE and seconds:
+                    totals["audio_sec"] += seconds
+                state[job.filename] = {
+                    "hash": digest,
+                    **stat,
+                    "status": job.status,
+                    "audio_sec": seconds,
+                    "elapsed_sec": round(job.finished_at - job.started_at, 2) if job.started_at else None,
+                    "stage_seconds": job.progress.stage_seconds,
+                    "error": job.error,
+                    "finished_at": job.finished_at,
+                }
+                save_checkpoint(checkpoint, state)
+                mark = "✅" if job.status == DONE else "❌"
+                print(f"{mark} [{totals['files']}/{len(todo)}] {job.filename} ({state[job.filename]['elapsed_sec']}s)")
+    except KeyboardInterrupt:
+        print("⏹ 중단 — 완료된 파일까지 체크포인트에 저장됨, 다시 실행하면 이어서 진행")
+    finally:
+        manager.shutdown()
+        chunked_stt.shutdown()
+        docx_render.shutdown()
+        outbox.stop()
+
+    wall = time.perf_counter() - started
+    report = {
+        **totals,
+        "wall_sec": round(wall, 1),
+        "files_per_hour": round(totals["done"] / wall * 3600, 1) if wall else 0.0,
+        "audio_min_per_wall_min": round(totals["audio_sec"] / wall, 2) if wall else 0.0,
+        "outbox": outbox.status(),
+    }
+    print(f"📊 완료 {totals['done']} / 실패 {totals['failed']} — "
+          f"{report['files_per_hour']} files/h, 오디오 {report['audio_min_per_wall_min']}분/실제 1분")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="wav.file 폴더 일괄 분석 (STT ↔ LLM/DB 단계 파이프라이닝)")
+    parser.add_argument("--dir", default=WAV_DIR)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--stt-workers", type=int, default=STT_WORKERS)
+    parser.add_argument("--llm-workers", type=int, default=LLM_WORKERS)
+    parser.add_argument("--max-inflight", type=int, default=None, help="동시에 올려둘 작업 수 (기본: 두 풀 합 + 1)")
+    parser.add_argument("--backend", default=None, help="STT 백엔드 (whisper / faster-whisper)")
+    parser.add_argument("--model", default=None, help="STT 모델 크기")
+    parser.add_argument("--limit", type=int, default=None, help="이번 실행에서 처리할 최대 파일 수")
+    parser.add_argument("--force", action="store_true", help="체크포인트를 무시하고 전부 다시 분석")
+    args = parser.parse_args()
+
+    report = run_batch(args.dir, args.checkpoint, args.stt_workers, args.llm_workers, args.max_inflight,
+                       args.backend, args.model, args.force, args.limit)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
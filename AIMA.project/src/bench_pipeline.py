@@ -0,0 +1,330 @@
+import os, sys, json, time, wave, shutil, socket, argparse, tempfile, resource, threading, subprocess
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import generate_mock_meetings as mock
+from fake_llm import fake_payload
+
+# ===================== 설정 =====================
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+STAGE_ORDER = ["stt", "compact", "date", "summary", "due", "db", "json", "docx"]
+
+
+# ===================== 가짜 LLM (결정적, 네트워크 없음) =====================
+class FakeMessage:
+    def __init__(self, content: str, prompt: str):
+        self.content = content
+        # 실제 토큰 수 대신 대략치 (한글 1.5자 ≈ 1토큰)
+        self.usage_metadata = {"input_tokens": int(len(prompt) / 1.5), "output_tokens": int(len(content) / 1.5)}
+
+
+class _FakeStructured:
+    def __init__(self, llm, schema, include_raw):
+        self.llm, self.schema, self.include_raw = llm, schema, include_raw
+
+    def invoke(self, prompt: str):
+        raw = self.llm.invoke(prompt)
+        parsed = self.schema(**json.loads(raw.content))
+        return {"raw": raw, "parsed": parsed, "parsing_error": None} if self.include_raw else parsed
+
+
+class FakeChatOpenAI:
+    """ChatOpenAI 대체: 고정 지연(--llm-latency) 후 결정적 JSON 반환"""
+    latency = 0.0
+
+    def __init__(self, model_name: str = "fake", temperature: float = 0, **kwargs):
+        self.model_name, self.temperature = model_name, temperature
+
+    def invoke(self, prompt):
+        prompt = str(prompt)
+        time.sleep(self.latency)
+        return FakeMessage(json.dumps(fake_payload(prompt), ensure_ascii=False), prompt)
+
+    def with_structured_output(self, schema, include_raw: bool = False):
+        return _FakeStructured(self, schema, include_raw)
+
+
+# ===================== 가짜 STT (스크립트 = 전사 결과) =====================
+SCRIPTS_BY_AUDIO = {}
+
+
+def fake_transcribe(rtf: float):
+    def transcribe(audio, size=None, backend=None, backend_options=None, **kwargs):
+        script = SCRIPTS_BY_AUDIO[os.path.realpath(audio)]
+        seconds = audio_seconds(audio) or 60.0
+        time.sleep(seconds * rtf)
+        turns = mock.script_turns(script)
+        step = seconds / max(1, len(turns))
+        segments = [{"start": i * step, "end": (i + 1) * step, "text": f"{s}: {t}"} for i, (s, t) in enumerate(turns)]
+        return {"text": "\n".join(seg["text"] for seg in segments), "segments": segments}
+    return transcribe
+
+
+def audio_seconds(path: str):
+    try:
+        with wave.open(path) as w:
+            return w.getnframes() / w.getframerate()
+    except Exception:
+        return None
+
+
+def write_silent_wav(path: str, seconds: float):
+    with wave.open(path, "w") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b"\0\0" * int(16000 * seconds))
+
+
+# ===================== 실행 환경 (tmpfs 작업 폴더 + SQLite DB) =====================
+def prepare_workdir(args) -> str:
+    """모든 출력(static/, db/, cache/)을 tmpfs의 임시 폴더로 격리하고 환경변수로 SQLite 대체 지정"""
+    base = "/dev/shm" if os.access("/dev/shm", os.W_OK) else None
+    workdir = tempfile.mkdtemp(prefix="aima-bench-", dir=base)
+    for sub in ("static/data", "static/docs", "wav.file", "db"):
+        os.makedirs(os.path.join(workdir, sub), exist_ok=True)
+
+    os.environ.update({
+        "DB_BACKEND": "sqlite",
+        "DB_SQLITE_DIR": os.path.join(workdir, "db"),
+        "RESULT_CACHE_DIR": os.path.join(workdir, "cache"),
+        # cold: 캐시 항목이 즉시 만료 → 매 요청이 STT/LLM 전체 경로를 탐
+        "RESULT_CACHE_MAX_AGE_DAYS": "0" if args.cache == "cold" else "30",
+        "JOB_MAX_PENDING": str(max(8, args.concurrency * 2)),
+        "WHISPER_PRELOAD": "0" if args.stt == "fake" else "1",
+    })
+    if args.stt == "fake":
+        os.environ["STT_CHUNK_WORKERS"] = "1"
+    os.chdir(workdir)
+    return workdir
+
+
+def prepare_inputs(args) -> list:
+    """요청마다 다른 파일명 (작업 큐의 파일명 중복 제거에 걸리지 않게) → wav.file/ 아래 심볼릭 링크"""
+    sources = []
+    for idx, script in mock.scripts.items():
+        original = os.path.join(args.wav_dir, os.path.basename(mock.wav_path(idx)))
+        if os.path.exists(original):
+            path = os.path.realpath(original)
+        elif args.stt == "fake":
+            # 음성이 없으면 대사 길이에 맞춘 무음 WAV로 대체 (가짜 STT는 내용을 읽지 않음)
+            path = os.path.abspath(f"mock_{idx}.wav")
+            write_silent_wav(path, len(script) / 7)
+        else:
+            continue
+        SCRIPTS_BY_AUDIO[path] = script
+        sources.append(path)
+    if not sources:
+        sys.exit(f"❌ {args.wav_dir} 에 mock 회의 WAV가 없습니다 (generate_mock_meetings.py 먼저 실행)")
+
+    names = []
+    for i in range(args.requests):
+        src = sources[i % len(sources)]
+        name = f"bench_{i:04d}_{os.path.basename(src)}"
+        os.symlink(src, os.path.join("wav.file", name))
+        names.append(name)
+    return names
+
+
+def install_fakes(args):
+    import llm_router, stt_registry
+    FakeChatOpenAI.latency = args.llm_latency
+    # 모든 LLM 호출이 라우터를 거치므로 백엔드 생성만 가짜로 교체
+    llm_router.create_chat = lambda backend, temperature: FakeChatOpenAI(backend.model, temperature)
+    if args.stt == "fake":
+        stt_registry.transcribe = fake_transcribe(args.stt_rtf)
+
+
+# ===================== 부하 생성 =====================
+def warm_cache(names: list):
+    """--cache warm: 측정 전에 원본 오디오마다 한 번씩 (시간 측정 없이) 돌려 STT/LLM 결과 캐시를 채움"""
+    from meeting_api import run_meeting_pipeline
+    from progress import ProgressTracker
+
+    for name in names:
+        run_meeting_pipeline(os.path.join("wav.file", name), ProgressTracker())
+    print(f"🔥 캐시 예열 {len(names)}건 완료")
+
+
+
+def drive_pipeline(names: list, concurrency: int) -> list:
+    """run_meeting_pipeline 을 N개 스레드에서 직접 호출"""
+    import db_store
+    from meeting_api import run_meeting_pipeline
+    from outbox import outbox
+    from progress import ProgressTracker
+
+    db_store.bootstrap()
+    outbox.start()
+
+    def one(name):
+        progress = ProgressTracker()
+        t0 = time.perf_counter()
+        try:
+            run_meeting_pipeline(os.path.join("wav.file", name), progress)
+            ok = True
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            ok = False
+        return {"ok": ok, "latency": time.perf_counter() - t0, "stages": dict(progress.stage_seconds)}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(one, names))
+
+
+def drive_api(names: list, concurrency: int) -> list:
+    """uvicorn을 같은 프로세스에서 띄우고 N개 클라이언트가 POST /analyze_meeting 호출"""
+    import uvicorn
+    import main
+
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    def one(name):
+        req = urllib.request.Request(
+            f"http://127.0.0.1:{port}/analyze_meeting",
+            data=json.dumps({"filename": name}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=600) as resp:
+                ok = resp.status == 200
+                resp.read()
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            ok = False
+        return {"ok": ok, "latency": time.perf_counter() - t0, "stages": {}}
+
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(one, names))
+        # 단계별 시간은 서버 쪽 작업 기록에서 수집
+        from job_queue import job_manager
+        stages = {j.filename: j.progress.stage_seconds for j in list(job_manager._jobs.values())}
+        for name, r in zip(names, results):
+            r["stages"] = stages.get(name, {})
+        return results
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+# ===================== 리포트 =====================
+def percentile(values: list, p: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * p / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(results: list, wall: float, args) -> dict:
+    latencies = [r["latency"] for r in results if r["ok"]]
+    stage_totals = {}
+    for r in results:
+        for stage, sec in r["stages"].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + sec
+    stage_sum = sum(stage_totals.values()) or 1.0
+    ordered = sorted(stage_totals, key=lambda s: STAGE_ORDER.index(s) if s in STAGE_ORDER else len(STAGE_ORDER))
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "commit": git_commit(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("out", "compare", "keep")},
+        "requests": len(results),
+        "failed": sum(1 for r in results if not r["ok"]),
+        "wall_sec": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency_sec": {
+            "p50": round(percentile(latencies, 50), 3),
+            "p95": round(percentile(latencies, 95), 3),
+            "max": round(max(latencies), 3) if latencies else 0.0,
+        },
+        # ru_maxrss: Linux는 KB 단위
+        "peak_rss_mb": {"self": round(usage.ru_maxrss / 1024, 1), "children": round(children.ru_maxrss / 1024, 1)},
+        "stages": {
+            s: {"mean_sec": round(stage_totals[s] / max(1, len(results)), 4),
+                "share": round(stage_totals[s] / stage_sum, 3)}
+            for s in ordered
+        },
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SRC_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(report: dict, baseline_path: str):
+    with open(baseline_path, encoding="utf-8") as f:
+        base = json.load(f)
+    print(f"\n📈 비교: {base.get('commit')} → {report.get('commit')}")
+    for label, path in (("p50", ("latency_sec", "p50")), ("p95", ("latency_sec", "p95")),
+                        ("throughput", ("throughput_rps",)), ("rss", ("peak_rss_mb", "self"))):
+        old, new = base, report
+        for key in path:
+            old, new = old.get(key, {}) if isinstance(old, dict) else None, new.get(key)
+        if isinstance(old, (int, float)) and old:
+            print(f"  {label:>10}: {old} → {new} ({(new - old) / old * 100:+.1f}%)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="회의 분석 파이프라인 벤치마크 (가짜 LLM + SQLite + tmpfs)")
+    parser.add_argument("--mode", choices=["pipeline", "api"], default="pipeline",
+                        help="pipeline: run_meeting_pipeline 직접 호출 / api: FastAPI 엔드포인트 호출")
+    parser.add_argument("--requests", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--stt", choices=["fake", "real"], default="fake",
+                        help="fake: 스크립트를 전사 결과로 사용 / real: 실제 STT 모델")
+    parser.add_argument("--stt-rtf", type=float, default=0.05, help="가짜 STT의 실시간 배율 (음성 길이 × 값만큼 대기)")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="가짜 LLM 호출당 지연 (초)")
+    parser.add_argument("--cache", choices=["cold", "warm"], default="cold")
+    parser.add_argument("--wav-dir", default=os.path.abspath("wav.file"))
+    parser.add_argument("--out", default=None, help="결과 JSON 경로 (기본: bench_<commit>.json)")
+    parser.add_argument("--compare", default=None, help="이전 결과 JSON과 비교")
+    parser.add_argument("--keep", action="store_true", help="작업 폴더(결과 JSON/DOCX, SQLite DB)를 지우지 않음")
+    args = parser.parse_args()
+    args.wav_dir = os.path.abspath(args.wav_dir)
+    out = os.path.abspath(args.out or f"bench_{git_commit() or 'local'}.json")
+    baseline = os.path.abspath(args.compare) if args.compare else None
+
+    workdir = prepare_workdir(args)
+    names = prepare_inputs(args)
+    install_fakes(args)
+    if args.cache == "warm":
+        # 앞쪽 요청들이 원본 오디오를 한 바퀴 돌며 모든 원본을 포함
+        warm_cache(names[:len(SCRIPTS_BY_AUDIO)])
+    print(f"🏁 {args.mode} 벤치마크: 요청 {len(names)}개, 동시 {args.concurrency} (작업 폴더 {workdir})")
+
+    started = time.perf_counter()
+    results = (drive_api if args.mode == "api" else drive_pipeline)(names, args.concurrency)
+    wall = time.perf_counter() - started
+
+    import docx_render
+    from outbox import outbox
+    docx_render.shutdown()
+    outbox.stop()
+
+    report = summarize(results, wall, args)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    print(f"💾 {out}")
+    if baseline:
+        compare(report, baseline)
+    if args.keep:
+        print(f"📁 작업 폴더 유지: {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
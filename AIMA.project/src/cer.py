@@ -1,35 +1,262 @@
+import os, re, sys, json, time, argparse, unicodedata
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-import whisper
+import generate_mock_meetings as mock
+from bench_pipeline import percentile
+from result_cache import ResultCache, audio_hash, make_key
 
-# 1. Whisper 모델 로드
-model = whisper.load_model("large-v3")
+# ===================== 설정 =====================
+# 비교할 STT 구성 ("backend:size" 또는 "backend:size:양자화", 콤마 구분)
+EVAL_CONFIGS = os.getenv(
+    "STT_EVAL_CONFIGS",
+    "whisper:small,whisper:medium,whisper:large-v3,faster-whisper:small:int8,faster-whisper:large-v3:int8",
+)
+# 채택 기준 CER (이 값 이하인 구성 중 가장 빠른 것을 추천)
+CER_TARGET = float(os.getenv("STT_EVAL_CER_TARGET", "0.10"))
+EVAL_WORKERS = int(os.getenv("STT_EVAL_WORKERS", "2"))
 
-# 2. 음성 파일 변환 실행 (너의 mock 파일)
-AUDIO_FILE = "wav.file/10월 29일 회의록.wav"
-result = model.transcribe(AUDIO_FILE, language="ko")
+# 평가용 전사 결과는 (음성 해시, 백엔드, 모델, 양자화)별로 저장 → 구성을 추가해도 기존 결과는 재사용
+eval_cache = ResultCache("stt_eval")
 
-# 3. 변환된 텍스트 확인
-print(result["text"])   # 👈 여기가 whisper_result 값이야
 
-# 4. CER 계산
-from jiwer import cer
+def parse_config(spec: str) -> dict:
+    parts = spec.strip().split(":")
+    backend, size = (parts[0], parts[1]) if len(parts) > 1 else ("whisper", parts[0])
+    quant = parts[2] if len(parts) > 2 else ("int8" if backend == "faster-whisper" else "fp32")
+    return {"name": spec.strip(), "backend": backend, "size": size, "quantization": quant}
 
-ground_truth = """철우: 네, 모두 수고 많았습니다. 오늘은 10월 28일, 모델 성능 평가와 통합 테스트 결과를 공유하겠습니다.  
 
-윤성: 새로운 데이터셋으로 학습한 결과, 정확도가 93.1%까지 올랐습니다. 감정 분류 안정성도 좋아졌어요. 다만 테스트 세트에 중복 문장이 일부 있어서 금요일까지 다시 정제하겠습니다.  
+# ===================== 정답 (mock 스크립트 ↔ WAV) =====================
+def reference_set(indices=None) -> list:
+    """생성기 스크립트와 같은 규칙으로 화자 발화를 나눠 WAV와 짝지음 (음성이 없는 회의는 제외)"""
+    refs = []
+    for idx, script in mock.scripts.items():
+        path = mock.wav_path(idx)
+        if (indices and idx not in indices) or not os.path.exists(path):
+            continue
+        refs.append({"index": idx, "audio": path, "turns": mock.script_turns(script)})
+    return refs
 
-정우: 라벨 불일치 12건 수정했습니다. 인코딩 문제였어요. 오늘 중으로 수정본을 푸시하고 깃헙에 업로드하겠습니다.  
 
-창용: 배포 자동화는 완성됐습니다. push 이벤트마다 Docker 컨테이너가 재시작돼요. 평균 배포 시간도 40초로 단축됐습니다. 내일까지 로그 시각화 기능을 추가하겠습니다.  
+# ===================== CER / WER =====================
+def normalize(text: str) -> str:
+    """NFKC + 소문자 + 문장부호 제거 (숫자/영문/한글만 비교)"""
+    s = unicodedata.normalize("NFKC", text).lower()
+    s = re.sub(r"[^\w\s%]", " ", s)
+    return re.sub(r"\s+", " ", s).strip()
 
-소라: UI 렌더링 속도가 조금 느렸는데, DOM 구조를 정리해서 개선 중이에요. 이번 금요일까지 최종 수정 버전 올리겠습니다.  
 
-용재: SSL 인증서 자동 갱신 테스트 완료했습니다. cron 스케줄이 조금 불안정해서 내일까지 주기 재설정하고 결과 보고드리겠습니다.  
+def align_errors(ref: list, hyp: list) -> list:
+    """편집 거리 역추적 → 정답 토큰 위치별 오류 수 (치환/삭제는 그 위치, 삽입은 바로 다음 정답 토큰에 귀속)"""
+    n, m = len(ref), len(hyp)
+    dist = [list(range(m + 1))]
+    for i in range(1, n + 1):
+        prev, row = dist[-1], [i] + [0] * m
+        r = ref[i - 1]
+        for j in range(1, m + 1):
+            row[j] = min(prev[j] + 1, row[j - 1] + 1, prev[j - 1] + (r != hyp[j - 1]))
+        dist.append(row)
 
-철우: 좋네요. 윤성은 데이터셋 정제 금요일까지, 정우는 라벨 수정 오늘 안에, 창용은 로그 시각화 내일까지, 소라는 UI 수정 금요일까지, 용재는 스케줄 재설정 내일까지 마무리해주세요. 내일은 요약 자동화 쪽 테스트 중심으로 회의 진행하겠습니다.
-"""
+    errors = [0] * (n + 1)
+    i, j = n, m
+    while i > 0 or j > 0:
+        if i > 0 and j > 0 and dist[i][j] == dist[i - 1][j - 1] + (ref[i - 1] != hyp[j - 1]):
+            errors[i - 1] += ref[i - 1] != hyp[j - 1]
+            i, j = i - 1, j - 1
+        elif i > 0 and dist[i][j] == dist[i - 1][j] + 1:
+            errors[i - 1] += 1
+            i -= 1
+        else:
+            errors[i] += 1
+            j -= 1
+    # 마지막 정답 토큰 뒤 삽입은 마지막 토큰에 합산
+    if n:
+        errors[n - 1] += errors.pop()
+    return errors
 
-whisper_result = result["text"]
-score = cer(ground_truth, whisper_result)
-print(result["text"][:500])
-print("CER:", round(score*100, 2), "%")
+
+def score_turns(turns: list, hypothesis: str) -> dict:
+    """전사 결과 전체를 정답 발화들과 정렬해 발화(화자 턴)별 CER/WER 계산"""
+    result = {}
+    for unit in ("char", "word"):
+        tokens, owner = [], []
+        for t, (_, text) in enumerate(turns):
+            norm = normalize(text)
+            units = list(norm.replace(" ", "")) if unit == "char" else norm.split()
+            tokens += units
+            owner += [t] * len(units)
+        hyp = normalize(hypothesis)
+        hyp = list(hyp.replace(" ", "")) if unit == "char" else hyp.split()
+
+        per_turn_err, per_turn_len = [0] * len(turns), [0] * len(turns)
+        for t, err in zip(owner, align_errors(tokens, hyp)):
+            per_turn_err[t] += err
+            per_turn_len[t] += 1
+        result[unit] = (per_turn_err, per_turn_len)
+
+    (c_err, c_len), (w_err, w_len) = result["char"], result["word"]
+    return {
+        "cer": round(sum(c_err) / max(1, sum(c_len)), 4),
+        "wer": round(sum(w_err) / max(1, sum(w_len)), 4),
+        "char_errors": sum(c_err), "chars": sum(c_len),
+        "word_errors": sum(w_err), "words": sum(w_len),
+        "turns": [
+            {"speaker": speaker, "cer": round(c_err[t] / max(1, c_len[t]), 4),
+             "wer": round(w_err[t] / max(1, w_len[t]), 4)}
+            for t, (speaker, _) in enumerate(turns)
+        ],
+    }
+
+
+# ===================== 전사 (프로세스 풀) =====================
+def _cache_key(config: dict, path: str) -> str:
+    return make_key("stt_eval", audio_hash(path), config["backend"], config["size"], config["quantization"], "ko")
+
+
+def _transcribe_config(config: dict, paths: list, threads: int) -> dict:
+    """워커 프로세스: 구성 하나의 모델을 한 번 로드해서 해당 WAV들을 차례로 변환"""
+    from stt_backend import create_backend
+    options, decode = {}, {}
+    if config["backend"] == "faster-whisper":
+        # CTranslate2는 cpu_threads 로 스레드 수를 정함 → torch는 불러오지 않음
+        options = {"compute_type": config["quantization"], "cpu_threads": threads}
+    else:
+        import torch
+        torch.set_num_threads(threads)
+        decode = {"fp16": config["quantization"] == "fp16"}
+
+    t0 = time.perf_counter()
+    model = create_backend(config["backend"], config["size"], **options)
+    load_seconds = time.perf_counter() - t0
+
+    outputs = {}
+    for path in paths:
+        t0 = time.perf_counter()
+        result = model.transcribe(path, language="ko", **decode)
+        segments = result["segments"]
+        outputs[path] = {
+            "text": result["text"],
+            "seconds": round(time.perf_counter() - t0, 3),
+            "audio_seconds": round(segments[-1]["end"], 1) if segments else 0,
+        }
+    return {"load_seconds": round(load_seconds, 2), "outputs": outputs}
+
+
+def transcribe_all(configs: list, refs: list, workers: int = EVAL_WORKERS, refresh: bool = False) -> dict:
+    """캐시에 없는 (구성, WAV)만 변환. 구성 단위로 워커에 분배해 모델은 구성당 한 번만 로드"""
+    results = {c["name"]: {"load_seconds": None, "outputs": {}} for c in configs}
+    todo = {}
+    for config in configs:
+        for ref in refs:
+            cached = None if refresh else eval_cache.get(_cache_key(config, ref["audio"]))
+            if cached is not None:
+                results[config["name"]]["outputs"][ref["audio"]] = {**cached, "cached": True}
+            else:
+                todo.setdefault(config["name"], []).append(ref["audio"])
+    if not todo:
+        return results
+
+    by_name = {c["name"]: c for c in configs}
+    workers = max(1, min(workers, len(todo)))
+    # 워커 간 CPU 경합을 막기 위해 코어를 나눠 줌 (지연 시간 비교가 공정하도록)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"🎙️ 변환할 구성 {len(todo)}개 / 워커 {workers}개 (워커당 스레드 {threads})")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_transcribe_config, by_name[name], paths, threads): name
+                   for name, paths in todo.items()}
+        for fut in as_completed(futures):
+            name = futures[fut]
+            try:
+                done = fut.result()
+            except Exception as e:
+                print(f"❌ {name} 변환 실패: {e}")
+                results[name]["error"] = str(e)
+                continue
+            results[name]["load_seconds"] = done["load_seconds"]
+            for path, out in done["outputs"].items():
+                eval_cache.put(_cache_key(by_name[name], path), out, audio_path=path, config=name)
+                results[name]["outputs"][path] = {**out, "cached": False}
+            print(f"✅ {name} 완료 ({len(done['outputs'])}개)")
+    return results
+
+
+# ===================== 정확도 × 지연 매트릭스 =====================
+def evaluate(configs: list, refs: list, workers: int = EVAL_WORKERS, refresh: bool = False,
+             target: float = CER_TARGET) -> dict:
+    transcripts = transcribe_all(configs, refs, workers, refresh)
+    rows = []
+    for config in configs:
+        run = transcripts[config["name"]]
+        files, errs = [], {"char_errors": 0, "chars": 0, "word_errors": 0, "words": 0}
+        seconds = audio = 0.0
+        for ref in refs:
+            out = run["outputs"].get(ref["audio"])
+            if out is None:
+                continue
+            score = score_turns(ref["turns"], out["text"])
+            for k in errs:
+                errs[k] += score[k]
+            seconds += out["seconds"]
+            audio += out["audio_seconds"]
+            worst = max(score["turns"], key=lambda t: t["cer"]) if score["turns"] else None
+            files.append({"index": ref["index"], "audio": ref["audio"], "seconds": out["seconds"],
+                          "cached": out["cached"], "cer": score["cer"], "wer": score["wer"],
+                          "worst_turn": worst, "turns": score["turns"]})
+        if not files:
+            rows.append({**config, "error": run.get("error", "결과 없음")})
+            continue
+        rows.append({
+            **config,
+            "cer": round(errs["char_errors"] / max(1, errs["chars"]), 4),
+            "wer": round(errs["word_errors"] / max(1, errs["words"]), 4),
+            "worst_turn_cer": max(t["cer"] for f in files for t in f["turns"]),
+            # bench_pipeline 과 같은 보간 백분위 (파일 수가 짝수면 가운데 두 값 사이)
+            "p50_seconds": round(percentile([f["seconds"] for f in files], 50), 3),
+            "rtf": round(seconds / audio, 3) if audio else None,
+            "load_seconds": run["load_seconds"],
+            "meets_target": errs["char_errors"] / max(1, errs["chars"]) <= target,
+            "files": files,
+        })
+
+    passing = [r for r in rows if r.get("meets_target") and r.get("rtf") is not None]
+    best = min(passing, key=lambda r: r["rtf"])["name"] if passing else None
+    return {"cer_target": target, "recommended": best, "meetings": len(refs), "configs": rows}
+
+
+def print_matrix(report: dict):
+    print(f"\n{'구성':<28}{'CER':>8}{'WER':>8}{'최악 턴':>9}{'p50(s)':>9}{'RTF':>7}{'로드(s)':>9}  기준")
+    for r in sorted(report["configs"], key=lambda r: (r.get("rtf") is None, r.get("rtf") or 0)):
+        if "error" in r:
+            print(f"{r['name']:<28}  ❌ {r['error']}")
+            continue
+        load = "-" if r["load_seconds"] is None else r["load_seconds"]
+        print(f"{r['name']:<28}{r['cer']:>8.2%}{r['wer']:>8.2%}{r['worst_turn_cer']:>9.2%}"
+              f"{r['p50_seconds']:>9}{r['rtf']:>7}{load:>9}  {'✅' if r['meets_target'] else '—'}")
+    if report["recommended"]:
+        print(f"\n🏆 CER ≤ {report['cer_target']:.0%} 중 가장 빠른 구성: {report['recommended']}")
+    else:
+        print(f"\n⚠️ CER ≤ {report['cer_target']:.0%} 를 만족하는 구성이 없습니다")
+
+
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding="utf-8")
+    parser = argparse.ArgumentParser(description="mock 회의 WAV 전체에 대한 STT 정확도(CER/WER) × 지연 비교")
+    parser.add_argument("--configs", default=EVAL_CONFIGS, help="backend:size[:양자화] 콤마 구분")
+    parser.add_argument("--meetings", default=None, help="평가할 스크립트 번호 (예: 1,4)")
+    parser.add_argument("--workers", type=int, default=EVAL_WORKERS)
+    parser.add_argument("--target", type=float, default=CER_TARGET, help="채택 기준 CER (0.10 = 10%%)")
+    parser.add_argument("--refresh", action="store_true", help="평가 캐시를 무시하고 다시 변환")
+    parser.add_argument("--out", default="stt_eval.json")
+    args = parser.parse_args()
+
+    configs = [parse_config(s) for s in args.configs.split(",") if s.strip()]
+    indices = {int(i) for i in args.meetings.split(",")} if args.meetings else None
+    refs = reference_set(indices)
+    if not refs:
+        sys.exit("❌ wav.file 에 mock 회의 WAV가 없습니다 (generate_mock_meetings.py 먼저 실행)")
+
+    report = evaluate(configs, refs, args.workers, args.refresh, args.target)
+    print_matrix(report)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"💾 {args.out}")
@@ -0,0 +1,168 @@
+import os, subprocess, threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# ===================== 설정 =====================
+SAMPLE_RATE = 16000
+FRAME_MS = 30                                   # VAD 에너지 계산 프레임 길이
+MIN_SILENCE_MS = int(os.getenv("STT_MIN_SILENCE_MS", "300"))   # mock 생성기는 화자 사이 400ms 무음 삽입
+TARGET_CHUNK_SEC = float(os.getenv("STT_CHUNK_SEC", "60"))     # 이 길이를 넘으면 가장 가까운 무음에서 자름
+MAX_CHUNK_SEC = float(os.getenv("STT_MAX_CHUNK_SEC", "120"))   # 무음이 없어도 강제로 자르는 상한
+CHUNK_WORKERS = int(os.getenv("STT_CHUNK_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+
+
+# ===================== 오디오 디코딩 (ffmpeg 스트리밍) =====================
+def _ffmpeg_cmd(path: str, start: float = None, duration: float = None) -> list:
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0"]
+    if start is not None:
+        cmd += ["-ss", f"{start:.3f}"]
+    if duration is not None:
+        cmd += ["-t", f"{duration:.3f}"]
+    return cmd + ["-i", path, "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE), "-"]
+
+
+def load_segment(path: str, start: float, duration: float) -> np.ndarray:
+    """필요한 구간만 16kHz mono float32로 디코딩 (전체 파형을 메모리에 올리지 않음)"""
+    out = subprocess.run(_ffmpeg_cmd(path, start, duration), capture_output=True, check=True).stdout
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def frame_energies(path: str) -> np.ndarray:
+    """파일을 블록 단위로 흘려 읽으며 30ms 프레임별 RMS 에너지만 계산"""
+    frame = SAMPLE_RATE * FRAME_MS // 1000
+    block_bytes = frame * 2 * 1000          # 30초 분량씩 읽기
+    energies, rest = [], b""
+    proc = subprocess.Popen(_ffmpeg_cmd(path), stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            data = proc.stdout.read(block_bytes)
+            if not data:
+                break
+            data = rest + data
+            usable = len(data) - len(data) % (frame * 2)
+            samples = np.frombuffer(data[:usable], np.int16).astype(np.float32) / 32768.0
+            rest = data[usable:]
+            if samples.size:
+                energies.append(np.sqrt((samples.reshape(-1, frame) ** 2).mean(axis=1)))
+    finally:
+        proc.stdout.close()
+        proc.wait()
+    return np.concatenate(energies) if energies else np.zeros(0, np.float32)
+
+
+# ===================== VAD 기반 청크 분할 =====================
+def plan_chunks(path: str) -> list:
+    """무음 구간을 기준으로 [(start_sec, end_sec), ...] 청크 목록 생성"""
+    energies = frame_energies(path)
+    if energies.size == 0:
+        return []
+    frame_sec = FRAME_MS / 1000
+    total_sec = energies.size * frame_sec
+
+    # 적응형 임계값: 조용한 구간 기준 + 최소값
+    threshold = max(0.01, float(np.percentile(energies, 20)) * 2)
+    silent = energies < threshold
+    min_run = max(1, MIN_SILENCE_MS // FRAME_MS)
+
+    # 충분히 긴 무음 구간의 중앙을 후보 절단점으로
+    cut_points, run_start = [], None
+    for i, is_silent in enumerate(np.append(silent, False)):
+        if is_silent and run_start is None:
+            run_start = i
+        elif not is_silent and run_start is not None:
+            if i - run_start >= min_run:
+                cut_points.append((run_start + i) / 2 * frame_sec)
+            run_start = None
+
+    chunks, start = [], 0.0
+    for cut in cut_points:
+        if cut - start >= TARGET_CHUNK_SEC:
+            chunks.append((start, cut))
+            start = cut
+    chunks.append((start, total_sec))
+
+    # 무음이 없어 너무 긴 청크는 강제로 분할
+    bounded = []
+    for s, e in chunks:
+        while e - s > MAX_CHUNK_SEC:
+            bounded.append((s, s + MAX_CHUNK_SEC))
+            s += MAX_CHUNK_SEC
+        if e - s > frame_sec:
+            bounded.append((s, e))
+    return bounded
+
+
+# ===================== 프로세스 풀 워커 =====================
+# 워커 프로세스마다 모델을 한 번만 로드해서 재사용
+_worker_model = None
+
+
+def _init_worker(backend: str, model_size: str, threads: int):
+    global _worker_model
+    from stt_backend import create_backend
+    if backend == "faster-whisper":
+        # CTranslate2 스레드 수는 cpu_threads 로 지정 → torch 없는 CPU/int8 환경에서도 동작
+        options = {"cpu_threads": threads}
+    else:
+        import torch
+        torch.set_num_threads(threads)
+        options = {}
+    _worker_model = create_backend(backend, model_size, **options)
+
+
+def _transcribe_chunk(path: str, index: int, start: float, end: float, options: dict) -> dict:
+    audio = load_segment(path, start, end - start)
+    result = _worker_model.transcribe(audio, **options)
+    segments = [
+        {"start": round(start + s["start"], 2), "end": round(start + s["end"], 2), "text": s["text"]}
+        for s in result["segments"]
+    ]
+    return {"index": index, "text": result["text"], "segments": segments}
+
+
+_pool = None
+_pool_key = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool(backend: str, model_size: str, workers: int) -> ProcessPoolExecutor:
+    """백엔드/모델 크기/워커 수가 같으면 프로세스 풀(과 워커별 모델)을 요청 간에 재사용"""
+    global _pool, _pool_key
+    with _pool_lock:
+        if _pool is None or _pool_key != (backend, model_size, workers):
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                        initargs=(backend, model_size, threads))
+            _pool_key = (backend, model_size, workers)
+        return _pool
+
+
+def transcribe_chunked(path: str, backend: str, model_size: str, chunks: list, workers: int = CHUNK_WORKERS,
+                       on_progress=None, **options) -> dict:
+    """청크들을 프로세스 풀에서 병렬 변환 후 타임스탬프 기준으로 이어 붙임"""
+    pool = _get_pool(backend, model_size, workers)
+    futures = [pool.submit(_transcribe_chunk, path, i, s, e, options) for i, (s, e) in enumerate(chunks)]
+
+    parts, done = [None] * len(chunks), 0
+    for fut in as_completed(futures):
+        part = fut.result()
+        parts[part["index"]] = part
+        done += 1
+        if on_progress:
+            on_progress(done, len(chunks))
+
+    return {
+        "text": " ".join(p["text"] for p in parts if p["text"]),
+        "segments": [seg for p in parts for seg in p["segments"]],
+        "chunks": [{"start": round(s, 2), "end": round(e, 2)} for s, e in chunks],
+    }
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
@@ -1,5 +1,8 @@
-import os, re, json, torch, whisper, dateparser
-from datetime import datetime, timedelta
+import os, re, json, torch
+import stt_registry
+from due_dates import normalize_items
+from transcript_compact import ACTION_KEYWORDS
+from datetime import datetime
 from typing import List, Optional
 from pydantic import BaseModel, Field, ValidationError
 from langchain_openai import ChatOpenAI
@@ -30,9 +33,9 @@ class ActionItem(BaseModel):
 
 # ===================== 3. Whisper STT (음성 인식) =====================
 
-# 🎙️ Whisper 모델은 여전히 필요합니다.
-model = whisper.load_model("large-v3")
-print("🎙️ Whisper 변환 중...")
+# 🎙️ STT 모델은 여전히 필요합니다. (STT_BACKEND 환경변수로 whisper / faster-whisper 선택)
+model = stt_registry.get_model("large-v3", os.getenv("STT_BACKEND", "whisper"))
+print("🎙️ STT 변환 중...")
 
 if not os.path.exists(AUDIO_FILE):
     raise FileNotFoundError(f"❌ 파일 없음: {AUDIO_FILE}")
@@ -63,48 +66,6 @@ def safe_llm_json(llm, prompt_text, retries=2):
     raise ValueError("❌ LLM이 유효한 JSON을 생성하지 못했습니다.")
 
 
-def normalize_due(due_text: Optional[str], base_dt: datetime) -> Optional[str]:
-    """상대 날짜를 YYYY-MM-DD로 정규화."""
-    if not due_text: return None
-
-    s = str(due_text).strip()
-    current_year = base_dt.year
-
-    # YYYY-MM-DD 형식 이미 충족 시
-    if re.match(r"\d{4}-\d{2}-\d{2}", s):
-        try: return datetime.strptime(s, "%Y-%m-%d").strftime("%Y-%m-%d")
-        except ValueError: return None
-
-    if s in {"미정", "불명", "null", "없음", ""}: return None
-    if s in {"오늘", "오늘 중"}: return base_dt.strftime("%Y-%m-%d")
-    if s == "내일": return (base_dt + timedelta(days=1)).strftime("%Y-%m-%d")
-
-    # dateparser를 사용하여 날짜 파싱
-    parsed = dateparser.parse(
-        s,
-        languages=["ko"],
-        settings={"RELATIVE_BASE": base_dt, "PREFER_DATES_FROM": "past"},
-    )
-    
-    if any(word in s for word in ["내일", "다음", "이번 주", "이번주", "까지"]):
-        parsed_future = dateparser.parse(
-            s,
-            languages=["ko"],
-            settings={"RELATIVE_BASE": base_dt, "PREFER_DATES_FROM": "future"},
-        )
-        if parsed_future: parsed = parsed_future
-
-    if parsed:
-        if parsed.year < current_year and parsed.date() < base_dt.date():
-            parsed = parsed.replace(year=current_year + 1)
-        elif parsed.year < current_year:
-            parsed = parsed.replace(year=current_year)
-            
-        return parsed.strftime("%Y-%MM-%d")
-
-    return None
-
-
 def extract_actions_and_normalize(llm_model_name: str, action_candidates: List[str], base_dt: datetime):
     """특정 LLM 모델을 사용하여 액션 아이템을 추출하고 날짜를 정규화하는 함수"""
     print(f"\n--- 🧠 {llm_model_name} 모델로 액션 아이템 추출 시작 ---")
@@ -147,13 +108,8 @@ def extract_actions_and_normalize(llm_model_name: str, action_candidates: List[s
 
     action_items = fallback_json.get("action_items", [])
     
-    # 날짜 정규화
-    for item in action_items:
-        due_raw = item.get("due")
-        if due_raw:
-            clean_due = re.sub(r'(까지|중|부터)', '', str(due_raw))
-            clean_due = re.sub(r'(다음주)([월화수목금토일])', r'\1 \2', clean_due)
-            item["due"] = normalize_due(clean_due, base_dt)
+    # 날짜 정규화 (meeting_api와 같은 규칙 엔진 사용)
+    normalize_items(action_items, base_dt)
             
     print(f"✅ {llm_model_name} 액션 아이템 {len(action_items)}개 추출 완료")
     return action_items
@@ -164,7 +120,7 @@ def extract_actions_and_normalize(llm_model_name: str, action_candidates: List[s
 action_candidates = []
 for line in full_text.split("\n"):
     # 액션 아이템이 될 가능성이 있는 문장만 필터링
-    if any(k in line for k in ["까지", "해야", "결정", "완료", "진행", "작성", "검토"]):
+    if any(k in line for k in ACTION_KEYWORDS):
         action_candidates.append(line.strip())
 
 print(f"\n📋 액션 문장 후보 {len(action_candidates)}개 탐지됨")
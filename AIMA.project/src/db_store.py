@@ -0,0 +1,222 @@
+import os, json, time, queue, random, sqlite3, threading
+from contextlib import contextmanager
+
+import metrics
+
+# ===================== 설정 =====================
+# DB_BACKEND=sqlite 로 두면 원격 MySQL 대신 로컬 SQLite 파일로 동작 (테스트/벤치마크용)
+DB_BACKEND = os.getenv("DB_BACKEND", "mysql")
+SQLITE_DIR = os.getenv("DB_SQLITE_DIR", "db")
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "4"))
+WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "3"))
+CONNECT_TIMEOUT = int(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+
+# 저장 대상 DB (개인 DB = 외부 서버, 팀원 DB = 로컬)
+TARGETS = {
+    "personal": {
+        "table": "meeting_summary",
+        "mysql": {
+            "host": "112.175.29.231", "user": "cheolwoo", "password": "1234",
+            "database": "meeting_summary2", "port": 33067, "charset": "utf8mb4",
+        },
+    },
+    "team": {
+        "table": "team_meeting_summary",
+        "mysql": {
+            "host": "localhost", "user": "admin", "password": "1qazZAQ!",
+            "database": "final", "charset": "utf8mb4",
+        },
+    },
+}
+
+MYSQL_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    meeting_file VARCHAR(255) UNIQUE,
+    topic_summary TEXT,
+    content_summary TEXT,
+    decisions JSON,
+    action_items JSON,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+) CHARACTER SET utf8mb4;
+"""
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS {table} (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    meeting_file TEXT UNIQUE,
+    topic_summary TEXT,
+    content_summary TEXT,
+    decisions TEXT,
+    action_items TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+MYSQL_UPSERT = """
+INSERT INTO {table} (meeting_file, topic_summary, content_summary, decisions, action_items)
+VALUES (%s,%s,%s,%s,%s)
+ON DUPLICATE KEY UPDATE
+    topic_summary=VALUES(topic_summary),
+    content_summary=VALUES(content_summary),
+    decisions=VALUES(decisions),
+    action_items=VALUES(action_items),
+    created_at=CURRENT_TIMESTAMP;
+"""
+SQLITE_UPSERT = """
+INSERT INTO {table} (meeting_file, topic_summary, content_summary, decisions, action_items)
+VALUES (?,?,?,?,?)
+ON CONFLICT(meeting_file) DO UPDATE SET
+    topic_summary=excluded.topic_summary,
+    content_summary=excluded.content_summary,
+    decisions=excluded.decisions,
+    action_items=excluded.action_items,
+    created_at=CURRENT_TIMESTAMP;
+"""
+
+
+# ===================== 커넥션 풀 =====================
+class ConnectionPool:
+    """대상 DB별 커넥션 풀 (요청마다 connect 하지 않고 재사용)"""
+
+    def __init__(self, name: str, backend: str = DB_BACKEND, size: int = POOL_SIZE):
+        self.name = name
+        self.backend = backend
+        self.table = TARGETS[name]["table"]
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+
+    @property
+    def placeholder(self) -> str:
+        return "?" if self.backend == "sqlite" else "%s"
+
+    def _connect(self):
+        if self.backend == "sqlite":
+            os.makedirs(SQLITE_DIR, exist_ok=True)
+            return sqlite3.connect(os.path.join(SQLITE_DIR, f"{self.name}.db"), check_same_thread=False)
+        # MySQL 드라이버는 MySQL 백엔드에서만 필요 (SQLite 대역으로 돌릴 때는 설치 안 해도 됨)
+        import pymysql
+        return pymysql.connect(connect_timeout=CONNECT_TIMEOUT, **TARGETS[self.name]["mysql"])
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            else:
+                if self.backend == "mysql":
+                    try:
+                        conn.ping(reconnect=True)
+                    except Exception:
+                        conn = self._connect()
+            try:
+                yield conn
+            except Exception:
+                # 오류가 난 커넥션은 상태를 믿을 수 없으므로 버린다
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+                raise
+            self._idle.put_nowait(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+pools = {name: ConnectionPool(name) for name in TARGETS}
+
+
+# ===================== 스키마 부트스트랩 (서버 시작 시 1회) =====================
+def bootstrap():
+    for name, pool in pools.items():
+        # 개인 DB 테이블은 원격 서버에 이미 존재 → MySQL일 때는 팀원 DB만 생성
+        if pool.backend == "mysql" and name == "personal":
+            continue
+        schema = SQLITE_SCHEMA if pool.backend == "sqlite" else MYSQL_SCHEMA
+        try:
+            with pool.connection() as conn:
+                conn.cursor().execute(schema.format(table=pool.table))
+                conn.commit()
+            print(f"✅ {name} DB 스키마 확인 완료")
+        except Exception as e:
+            print(f"❌ {name} DB 스키마 확인 실패:", e)
+
+
+# ===================== 쓰기 (재시도 + 배치 upsert) =====================
+_stats = {name: {"ok": 0, "failed": 0, "retries": 0, "last_error": None} for name in TARGETS}
+_stats_lock = threading.Lock()
+
+
+def _count(name: str, field: str, error=None):
+    with _stats_lock:
+        _stats[name][field] += 1
+        if error is not None:
+            _stats[name]["last_error"] = str(error)
+
+
+def summary_row(meeting_file: str, summary: dict) -> tuple:
+    return (
+        meeting_file,
+        summary["topic_summary"],
+        summary["content_summary"],
+        json.dumps(summary["decisions"], ensure_ascii=False),
+        json.dumps(summary["action_items"], ensure_ascii=False),
+    )
+
+
+def is_data_error(error: Exception) -> bool:
+    """재시도해도 같은 결과인 기록 자체의 문제 (제약 위반 / 값 오류 / payload 인코딩 오류).
+    pymysql / sqlite3 예외 이름이 같음. ProgrammingError(테이블 없음 등)는 스키마·설정 문제라 포함하지 않음
+    → 고친 뒤 재시도하면 전달되므로 기록을 버리지 않음"""
+    return isinstance(error, (ValueError, KeyError, TypeError, UnicodeError)) or \
+        type(error).__name__ in ("IntegrityError", "DataError")
+
+
+def _with_retries(name: str, fn, retries: int = WRITE_RETRIES):
+    for attempt in range(retries + 1):
+        try:
+            result = fn()
+            _count(name, "ok")
+            return result
+        except Exception as e:
+            if is_data_error(e):
+                # 같은 기록을 다시 보내도 실패 → 기다리지 않고 바로 올려 outbox 가 기록 단위로 처리
+                _count(name, "failed", e)
+                raise
+            if attempt == retries:
+                _count(name, "failed", e)
+                print(f"❌ {name} DB 오류 (재시도 {retries}회 실패):", e)
+                raise
+            _count(name, "retries", e)
+            metrics.DB_WRITE_RETRIES.inc(target=name)
+            time.sleep(min(8, 0.5 * 2 ** attempt) + random.random() * 0.2)
+
+
+def upsert_batch(name: str, rows: list):
+    """여러 회의 요약을 한 트랜잭션으로 upsert (meeting_file 기준 멱등 → 재전송해도 안전)"""
+    pool = pools[name]
+    sql = (SQLITE_UPSERT if pool.backend == "sqlite" else MYSQL_UPSERT).format(table=pool.table)
+
+    def write():
+        with pool.connection() as conn:
+            conn.cursor().executemany(sql, rows)
+            conn.commit()
+
+    with metrics.DB_WRITE_SECONDS.time(target=name):
+        _with_retries(name, write)
+    metrics.DB_ROWS.inc(len(rows), target=name)
+    print(f"✅ {name} DB 저장 완료 ({len(rows)}건)")
+
+
+def status() -> dict:
+    return {"backend": DB_BACKEND, "targets": _stats}
+
+
+def shutdown():
+    for pool in pools.values():
+        pool.close_all()
@@ -0,0 +1,236 @@
+import os, io, sys, json, glob, time, shutil, argparse, threading
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import metrics
+from meeting_catalog import data_path, meeting_name
+from result_cache import CACHE_DIR, CACHE_MAX_AGE_DAYS, CACHE_SWEEP_SEC, EVICT_TARGET, make_key
+
+# ===================== 설정 =====================
+DOC_DIR = "static/docs"
+DATA_DIR = "static/data"
+DOCX_CACHE_DIR = os.path.join(CACHE_DIR, "docx")
+DOCX_WORKERS = int(os.getenv("DOCX_WORKERS", "2"))
+# 캐시된 DOCX 개수 한도 (넘으면 가장 오래 안 쓴 것부터, 기간은 결과 캐시와 같은 RESULT_CACHE_MAX_AGE_DAYS)
+DOCX_CACHE_MAX_FILES = int(os.getenv("DOCX_CACHE_MAX_FILES", "500"))
+# 보고서 양식을 바꾸면 올려서 캐시된 DOCX를 무효화
+TEMPLATE_VERSION = "1"
+
+
+# ===================== 보고서 템플릿 (프로세스당 1회 생성) =====================
+_template_bytes = None
+
+
+def _template() -> bytes:
+    """폰트/스타일 설정 + 제목까지 들어간 빈 보고서를 한 번만 만들어 bytes로 보관"""
+    global _template_bytes
+    if _template_bytes is None:
+        from docx import Document
+        from docx.enum.text import WD_ALIGN_PARAGRAPH
+        from docx.shared import Pt
+        from docx.oxml.ns import qn
+
+        doc = Document()
+        # 스타일 지정
+        style = doc.styles['Normal']
+        style.font.name = 'Malgun Gothic'  # 🔹 윈도우에서 존재하는 한글 폰트
+        style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Malgun Gothic')
+        style.font.size = Pt(12)
+
+        # --- 제목 ---
+        title = doc.add_heading("회의 요약 보고서", level=1)
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+        buf = io.BytesIO()
+        doc.save(buf)
+        _template_bytes = buf.getvalue()
+    return _template_bytes
+
+
+def doc_path(base_filename: str, meeting_date: str) -> str:
+    return os.path.join(DOC_DIR, f"회의록_{meeting_date}_{base_filename}.docx")
+
+
+def summary_key(base_filename: str, meeting_date: str, summary: dict) -> str:
+    """문서에 실제로 찍히는 값만으로 키 생성 (액션아이템 id/version 이 바뀌어도 같은 DOCX 재사용)"""
+    fields = {k: summary.get(k) for k in ("topic_summary", "content_summary", "decisions")}
+    fields["action_items"] = [[a.get("name"), a.get("task"), a.get("due")] for a in summary.get("action_items") or []]
+    return make_key("docx", TEMPLATE_VERSION, base_filename, meeting_date, fields)
+
+
+# ===================== 캐시 정리 =====================
+_last_sweep = 0.0
+
+
+def evict_cache(force: bool = False) -> int:
+    """기간 초과 DOCX 삭제 후, 개수 한도를 넘으면 가장 오래 안 쓴 것부터 한도의 90%까지 삭제 → 삭제 수
+    (렌더링마다 디렉터리를 훑지 않도록 CACHE_SWEEP_SEC 마다만, 워커 프로세스별로 실행)"""
+    global _last_sweep
+    now = time.time()
+    if not force and now - _last_sweep < CACHE_SWEEP_SEC:
+        return 0
+    _last_sweep = now
+    entries = []
+    for name in os.listdir(DOCX_CACHE_DIR):
+        path = os.path.join(DOCX_CACHE_DIR, name)
+        try:
+            entries.append((os.path.getmtime(path), path))
+        except OSError:
+            pass
+    entries.sort()
+    keep = len(entries)
+    limit = int(DOCX_CACHE_MAX_FILES * EVICT_TARGET) if keep > DOCX_CACHE_MAX_FILES else DOCX_CACHE_MAX_FILES
+    removed = 0
+    for mtime, path in entries:
+        if now - mtime <= CACHE_MAX_AGE_DAYS * 86400 and keep <= limit:
+            break
+        try:
+            os.remove(path)
+            removed += 1
+        except OSError:
+            pass  # 다른 워커가 먼저 지움
+        keep -= 1
+    return removed
+
+
+# ===================== 렌더링 =====================
+def _build(base_filename: str, meeting_date: str, summary: dict, out_path: str):
+    from docx import Document
+
+    doc = Document(io.BytesIO(_template()))  # 템플릿 복제
+
+    # --- 기본 정보 ---
+    doc.add_paragraph(f"📅 회의일자: {meeting_date}")
+    doc.add_paragraph(f"🎧 파일명: {base_filename}")
+    doc.add_paragraph("")
+
+    # --- 주제 요약 ---
+    doc.add_heading("1. 주제 요약", level=2)
+    doc.add_paragraph(summary["topic_summary"])
+
+    # --- 내용 요약 ---
+    doc.add_heading("2. 내용 요약", level=2)
+    doc.add_paragraph(summary["content_summary"])
+
+    # --- 결정사항 ---
+    doc.add_heading("3. 결정사항", level=2)
+    for d in summary["decisions"]:
+        doc.add_paragraph(f"• {d}", style="List Bullet")
+
+    # --- 액션 아이템 ---
+    doc.add_heading("4. 액션 아이템", level=2)
+    for item in summary["action_items"]:
+        p = doc.add_paragraph(style="List Number")
+        p.add_run(f"담당자: {item['name']}\n").bold = True
+        p.add_run(f"작업내용: {item['task']}\n")
+        p.add_run(f"기한: {item['due'] if item.get('due') else '미정'}")
+
+    tmp = f"{out_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    doc.save(tmp)
+    os.replace(tmp, out_path)
+
+
+def render_docx(base_filename: str, meeting_date: str, summary: dict, publish: bool = True) -> str:
+    """요약 해시가 같으면 캐시된 DOCX 재사용. publish=True면 static/docs에도 복사 → 경로 반환"""
+    os.makedirs(DOCX_CACHE_DIR, exist_ok=True)
+    cached = os.path.join(DOCX_CACHE_DIR, f"{summary_key(base_filename, meeting_date, summary)}.docx")
+    if os.path.exists(cached):
+        os.utime(cached)  # 최근 사용 표시 (정리 시 오래 안 쓴 것부터 삭제)
+    else:
+        _build(base_filename, meeting_date, summary, cached)
+        evict_cache()
+    if not publish:
+        return cached
+
+    os.makedirs(DOC_DIR, exist_ok=True)
+    out = doc_path(base_filename, meeting_date)
+    shutil.copyfile(cached, out)
+    print(f"📝 DOCX 저장 완료: {out}")
+    return out
+
+
+# ===================== 백그라운드 렌더링 풀 =====================
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=DOCX_WORKERS)
+        return _pool
+
+
+def submit(base_filename: str, meeting_date: str, summary: dict):
+    """응답을 막지 않도록 렌더링을 워커 프로세스에 맡김 → Future"""
+    t0 = time.perf_counter()
+    fut = _get_pool().submit(render_docx, base_filename, meeting_date, summary)
+
+    def report(f):
+        metrics.DOCX_SECONDS.observe(time.perf_counter() - t0, status="error" if f.exception() else "ok")
+        if f.exception():
+            print(f"❌ DOCX 생성 실패 ({base_filename}):", f.exception())
+
+    fut.add_done_callback(report)
+    return fut
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+            _pool = None
+
+
+# ===================== 저장된 JSON → DOCX =====================
+def load_summary(base_filename: str):
+    """static/data/{이름}.json (예전 {이름}.wav.json) 을 읽어 (회의일자, 요약) 반환. 없으면 None"""
+    path = data_path(base_filename, DATA_DIR)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        summary = json.load(f)
+    # 회의일자가 없는 예전 JSON은 파일 수정일로 대체
+    meeting_date = summary.get("meeting_date") or datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y-%m-%d")
+    return meeting_date, summary
+
+
+def render_saved(base_filename: str, publish: bool = True):
+    loaded = load_summary(base_filename)
+    if loaded is None:
+        return None
+    meeting_date, summary = loaded
+    return render_docx(base_filename, meeting_date, summary, publish=publish)
+
+
+def rerender_all(workers: int = os.cpu_count() or 2) -> int:
+    """static/data 의 모든 회의 JSON으로 static/docs 를 병렬 재생성"""
+    names = sorted({meeting_name(p) for p in glob.glob(os.path.join(DATA_DIR, "*.json"))})
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(render_saved, name): name for name in names}
+        for fut in as_completed(futures):
+            try:
+                fut.result()
+                done += 1
+            except Exception as e:
+                print(f"❌ {futures[fut]} 렌더링 실패:", e)
+    print(f"✅ DOCX {done}/{len(names)}개 재생성 완료")
+    return done
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="회의록 DOCX 렌더링")
+    parser.add_argument("--all", action="store_true", help="static/data 전체를 static/docs 로 재생성")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("names", nargs="*", help="재생성할 회의 이름 (확장자 제외)")
+    args = parser.parse_args()
+
+    if args.all:
+        rerender_all(args.workers)
+    else:
+        for name in args.names:
+            if render_saved(name) is None:
+                print(f"❌ 요약 JSON 없음: {name}", file=sys.stderr)
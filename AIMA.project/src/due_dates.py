@@ -0,0 +1,304 @@
+import re, time, argparse, calendar, threading, unicodedata
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Optional
+
+# ===================== 규칙 문법 (모듈 로드 시 1회 컴파일) =====================
+UNKNOWN = {"미정", "불명", "null", "none", "없음", "추후", "추후 결정", "tbd", ""}
+WEEKDAYS = {"월": 0, "화": 1, "수": 2, "목": 3, "금": 4, "토": 5, "일": 6}
+WEEK_OFFSETS = {"이번": 0, "금": 0, "다음": 1, "차": 1, "내": 1, "다다음": 2}
+# 주 안의 구간 → 월요일 기준 일수 (기한이므로 구간의 마지막 날: 주초 월, 주 중반 수, 주말 토)
+WEEK_PARTS = {"초": 0, "중반": 2, "말": 5}
+# 달 안의 구간 → 마지막 날 (초순 ~10일, 중순 ~20일, 하순/말 → 말일은 None)
+MONTH_PARTS = {"초": 10, "초순": 10, "월초": 10, "중순": 20, "하순": None, "말": None, "월말": None, "말일": None}
+RELATIVE_DAYS = {"오늘": 0, "금일": 0, "당일": 0, "내일": 1, "명일": 1, "모레": 2, "글피": 3}
+COUNT_WORDS = {"하루": 1, "이틀": 2, "사흘": 3, "나흘": 4, "닷새": 5, "일주일": 7, "열흘": 10}
+
+# 날짜 판단에 필요 없는 시각 표현 / 기한 접미사
+_TIME = re.compile(r"(오전|오후|아침|저녁|밤|정오)?\s*(\d{1,2}\s*시(\s*\d{1,2}\s*분|\s*반)?|\d{1,2}:\d{2})|오전|오후|정오|아침|저녁")
+# ("3일 이내"의 "이내"처럼 기간 표현에 붙는 말은 규칙에서 직접 처리하므로 제거하지 않음)
+_SUFFIX = re.compile(r"(전까지|까지|중으로|중에|중|쯤|경|무렵|마감|에)$")
+
+_RULES = []
+
+
+def rule(pattern: str):
+    def register(fn):
+        _RULES.append((re.compile(pattern), fn))
+        return fn
+    return register
+
+
+def _month_end(year: int, month: int) -> date:
+    return date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _month_part(year: int, month: int, part: Optional[str]) -> date:
+    day = MONTH_PARTS.get(part or "말")
+    return date(year, month, day) if day else _month_end(year, month)
+
+
+def _add_months(base: date, months: int) -> tuple:
+    m = base.month - 1 + months
+    return base.year + m // 12, m % 12 + 1
+
+
+def _future_month_day(base: date, month: int, day: int) -> Optional[date]:
+    """연도 없는 월/일 → 회의일 이후로 가장 가까운 날짜 (지난 날짜면 내년)"""
+    try:
+        d = date(base.year, month, day)
+    except ValueError:
+        return None
+    if d < base:
+        try:
+            d = date(base.year + 1, month, day)
+        except ValueError:
+            return None
+    return d
+
+
+@rule(r"(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})")
+def _absolute(m, base):
+    y, mo, d = map(int, m.groups())
+    # 🔹 과거 연도면 회의 연도로 교체 (LLM이 학습 시점 연도를 쓰는 경우)
+    try:
+        return date(max(y, base.year), mo, d)
+    except ValueError:
+        return None
+
+
+@rule(r"(\d{1,2})\s*월\s*(\d{1,2})\s*일")
+def _month_day(m, base):
+    return _future_month_day(base, int(m.group(1)), int(m.group(2)))
+
+
+@rule(r"^(\d{1,2})\s*/\s*(\d{1,2})$")
+def _slash_month_day(m, base):
+    return _future_month_day(base, int(m.group(1)), int(m.group(2)))
+
+
+@rule(r"(이번\s*달|이달|금월|다음\s*달|내달|익월)\s*(\d{1,2})\s*일")
+def _relative_month_day(m, base):
+    ahead = 0 if re.sub(r"\s", "", m.group(1)) in ("이번달", "이달", "금월") else 1
+    year, month = _add_months(base, ahead)
+    day = int(m.group(2))
+    return date(year, month, day) if day <= calendar.monthrange(year, month)[1] else None
+
+
+@rule(r"(\d{1,2})\s*월\s*(초순|초|중순|하순|말)?$")
+def _named_month_end(m, base):
+    # "10월 말", "12월 중" → 그 달 말일, "11월 초" → 11월 10일, "11월 중순" → 11월 20일
+    month = int(m.group(1))
+    if not 1 <= month <= 12:
+        return None
+    year = base.year if month >= base.month else base.year + 1
+    return _month_part(year, month, m.group(2))
+
+
+@rule(r"^(이번\s*달|이달|금월|다음\s*달|내달|익월)?\s*(월말|말일|말|월초|초순|초|중순|하순)$")
+def _month_end_rule(m, base):
+    ahead = 1 if m.group(1) and re.sub(r"\s", "", m.group(1)) in ("다음달", "내달", "익월") else 0
+    d = _month_part(*_add_months(base, ahead), m.group(2))
+    # 달 지정 없이 "월초"인데 이미 지났으면 다음 달
+    return d if m.group(1) or d >= base else _month_part(*_add_months(base, 1), m.group(2))
+
+
+@rule(r"(다다음|이번|다음|금|차|내)\s*주\s*([월화수목금토일])(요일)?")
+def _week_weekday(m, base):
+    monday = base - timedelta(days=base.weekday())
+    return monday + timedelta(weeks=WEEK_OFFSETS[m.group(1)], days=WEEKDAYS[m.group(2)])
+
+
+@rule(r"(다다음|이번|다음|금|차|내)\s*주\s*(초|중반|말)?")
+def _week(m, base):
+    # 요일 없이 "다음주까지" → 그 주 금요일, "이번 주말" → 토요일, "다음 주 초" → 월요일
+    monday = base - timedelta(days=base.weekday())
+    return monday + timedelta(weeks=WEEK_OFFSETS[m.group(1)], days=WEEK_PARTS.get(m.group(2), 4))
+
+
+@rule(r"^주말$")
+def _weekend(m, base):
+    # 가장 가까운 토요일 (일요일 회의면 당일)
+    return base + timedelta(days=5 - base.weekday()) if base.weekday() <= 5 else base
+
+
+@rule(r"^([월화수목금토일])요일$")
+def _weekday(m, base):
+    # 가장 가까운 해당 요일 (오늘 포함)
+    return base + timedelta(days=(WEEKDAYS[m.group(1)] - base.weekday()) % 7)
+
+
+@rule(r"(\d+)\s*(일|주일|주|개월|달)\s*(후|뒤|이내|내|안)")
+def _after_n(m, base):
+    n, unit = int(m.group(1)), m.group(2)
+    if unit == "일":
+        return base + timedelta(days=n)
+    if unit in ("주", "주일"):
+        return base + timedelta(weeks=n)
+    year, month = _add_months(base, n)
+    return min(date(year, month, 1) + timedelta(days=base.day - 1), _month_end(year, month))
+
+
+@rule(r"(" + "|".join(COUNT_WORDS) + r")\s*(후|뒤|이내|내|안)")
+def _after_words(m, base):
+    return base + timedelta(days=COUNT_WORDS[m.group(1)])
+
+
+@rule(r"^(" + "|".join(RELATIVE_DAYS) + r")")
+def _relative_day(m, base):
+    return base + timedelta(days=RELATIVE_DAYS[m.group(1)])
+
+
+@rule(r"^(\d{1,2})\s*일$")
+def _day_of_month(m, base):
+    # "25일" → 이번 달 25일 (지났으면 다음 달)
+    day = int(m.group(1))
+    for ahead in (0, 1):
+        year, month = _add_months(base, ahead)
+        if day <= calendar.monthrange(year, month)[1] and date(year, month, day) >= base:
+            return date(year, month, day)
+    return None
+
+
+def clean(text: str) -> str:
+    """NFKC 정규화 + 시각 표현 / 기한 접미사 제거 ("다음 주 금요일 오후 3시까지" → "다음 주 금요일")"""
+    s = unicodedata.normalize("NFKC", text).strip().lower()
+    s = _TIME.sub(" ", s)
+    s = re.sub(r"\s+", " ", s).strip()
+    while True:
+        stripped = _SUFFIX.sub("", s).strip()
+        if stripped == s:
+            return s
+        s = stripped
+
+
+# ===================== dateparser (마지막 수단) =====================
+_parser_lock = threading.Lock()
+
+
+@lru_cache(maxsize=8)
+def _dateparser(base: date):
+    """회의일별 DateDataParser 재사용 (매 호출마다 언어/설정을 다시 로드하지 않음)"""
+    from dateparser.date import DateDataParser
+    return DateDataParser(
+        languages=["ko"],
+        settings={"RELATIVE_BASE": datetime.combine(base, datetime.min.time()), "PREFER_DATES_FROM": "future"},
+    )
+
+
+def warmup():
+    """dateparser 첫 호출(언어 데이터 로드, 수백 ms)을 미리 치러 둠 — 서버 시작 시 백그라운드에서 호출
+    (실패는 호출 측 readiness 상태로 남김, 규칙 문법만으로도 정규화는 동작)"""
+    with _parser_lock:
+        _dateparser(date.today()).get_date_data("다음 달 3일")
+
+
+def _fallback(s: str, base: date) -> Optional[date]:
+    try:
+        with _parser_lock:
+            parsed = _dateparser(base).get_date_data(s).date_obj
+    except Exception:
+        return None
+    if not parsed:
+        return None
+    # 🔹 연도 보정: 과거 연도면 회의 연도로 덮어쓰기
+    if parsed.year < base.year:
+        try:
+            parsed = parsed.replace(year=base.year)
+        except ValueError:
+            return None
+    return parsed.date()
+
+
+# ===================== 정규화 =====================
+@lru_cache(maxsize=4096)
+def _normalize(text: str, base: date) -> Optional[str]:
+    s = clean(text)
+    if s in UNKNOWN:
+        # "오후 3시까지"처럼 시각만 있으면 당일
+        return base.isoformat() if s == "" and _TIME.search(text) else None
+    for pattern, handler in _RULES:
+        m = pattern.search(s)
+        if m:
+            d = handler(m, base)
+            return d.isoformat() if d else None
+    d = _fallback(s, base)
+    return d.isoformat() if d else None
+
+
+def normalize_due(due_text: Optional[str], base_dt: datetime) -> Optional[str]:
+    """LLM이 반환한 due 문자열 → 회의일 기준 YYYY-MM-DD (모르면 None). (문자열, 회의일) 단위로 메모이즈"""
+    if not due_text:
+        return None
+    base = base_dt.date() if isinstance(base_dt, datetime) else base_dt
+    return _normalize(str(due_text), base)
+
+
+def normalize_items(items: list, base_dt: datetime) -> list:
+    """회의 하나의 액션아이템 due를 한 번에 정규화 (같은 표현은 한 번만 계산)"""
+    resolved = {}
+    for item in items:
+        raw = item.get("due")
+        if raw not in resolved:
+            resolved[raw] = normalize_due(raw, base_dt)
+        item["due"] = resolved[raw]
+    return items
+
+
+def cache_info():
+    return _normalize.cache_info()
+
+
+# ===================== 마이크로 벤치마크 =====================
+SAMPLES = [
+    "2024-10-30", "10월 31일", "11/5", "오늘", "내일 오전 10시", "모레까지", "이번주 금요일", "다음 주 화요일까지",
+    "다다음주 월요일", "내주 월요일", "다음주 중", "다음 주 초", "주말", "월말", "11월 중순", "다음 달 말", "3일 후", "2주 이내", "이틀 뒤", "금요일", "25일",
+    "오후 3시까지", "미정", "다음 분기",
+]
+
+
+def benchmark(rounds: int = 2000) -> dict:
+    base = datetime(2025, 10, 23)
+    rule_samples = [s for s in SAMPLES if s != "다음 분기"]
+
+    _normalize.cache_clear()
+    started = time.perf_counter()
+    for s in rule_samples:
+        normalize_due(s, base)
+    cold = (time.perf_counter() - started) / len(rule_samples)
+
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for s in rule_samples:
+            normalize_due(s, base)
+    cached = (time.perf_counter() - started) / (rounds * len(rule_samples))
+
+    started = time.perf_counter()
+    _fallback("다음 분기", base.date())
+    first_fallback = time.perf_counter() - started
+    started = time.perf_counter()
+    for i in range(20):
+        _fallback("다음 분기", (base + timedelta(days=i % 3)).date())
+    warm_fallback = (time.perf_counter() - started) / 20
+
+    return {
+        "rule_cold_us": round(cold * 1e6, 2),
+        "cached_us": round(cached * 1e6, 3),
+        "dateparser_first_ms": round(first_fallback * 1e3, 1),
+        "dateparser_warm_ms": round(warm_fallback * 1e3, 2),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="due 날짜 정규화")
+    parser.add_argument("--bench", action="store_true", help="항목당 정규화 비용 측정")
+    parser.add_argument("--base", default=date.today().isoformat(), help="회의일 (YYYY-MM-DD)")
+    parser.add_argument("texts", nargs="*", help="정규화할 due 표현")
+    args = parser.parse_args()
+
+    if args.bench:
+        for k, v in benchmark().items():
+            print(f"{k:>22}: {v}")
+    base = datetime.strptime(args.base, "%Y-%m-%d")
+    for text in args.texts or ([] if args.bench else SAMPLES):
+        print(f"{text!r:>24} → {normalize_due(text, base)}")
@@ -0,0 +1,23 @@
+import re
+
+# ===================== 가짜 LLM 응답 (결정적, 네트워크 없음) =====================
+# 벤치마크(bench_pipeline) · LLM 스텁 서버(llm_router --stub) · 라우터 테스트가 같은 응답을 쓰도록 한 곳에 둠
+
+
+def fake_payload(prompt: str) -> dict:
+    """프롬프트 속 회의 대화만 보고 항상 같은 요약 JSON을 만든다"""
+    turns = re.findall(r"^(\S+): (.+)$", prompt, re.M)
+    date = re.search(r"(20\d\d)년 (\d{1,2})월 (\d{1,2})일", prompt)
+    sentences = [s.strip() for _, text in turns for s in re.split(r"(?<=[.?!])\s+", text) if s.strip()]
+    actions = [
+        {"name": speaker, "task": text.split(".")[0][:60], "due": due.group(0)}
+        for speaker, text in turns
+        for due in [re.search(r"\S+\s?(?:오전|오후)?\s?까지", text)] if due
+    ]
+    return {
+        "meeting_date": f"{date.group(1)}-{int(date.group(2)):02d}-{int(date.group(3)):02d}" if date else None,
+        "topic_summary": (sentences[0] if sentences else "회의")[:80],
+        "content_summary": " ".join(sentences[1:4]),
+        "decisions": [s for s in sentences if "하겠습니다" in s][:3],
+        "action_items": actions,
+    }
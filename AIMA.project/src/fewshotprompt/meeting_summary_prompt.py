@@ -46,3 +46,97 @@ meeting_summary_prompt = PromptTemplate.from_template("""
 회의록:
 {text}
 """)
+
+
+# ===========================================
+# 🎯 단일 호출 추출 Prompt (회의일자 + 요약 + 결정사항 + 액션아이템)
+#   - 출력 형식은 MeetingExtraction 스키마(structured output)로 강제되므로
+#     JSON 형식 안내 대신 각 필드의 작성 기준만 설명
+# ===========================================
+meeting_extract_prompt = PromptTemplate.from_template("""
+당신은 'AI 회의 요약 비서'입니다.
+다음 회의록 대화를 분석하여 회의일자, 요약, 결정사항, 액션아이템을 한 번에 추출하세요.
+
+요구사항:
+- "meeting_date": 회의가 실제로 열린 날짜 (YYYY-MM-DD). 대화 속 날짜·요일·상대 표현(오늘, 내일, 이번 주 등)으로 추정하고,
+  연도가 언급되지 않으면 현재 연도({current_year})로 작성. 추정할 근거가 없으면 null
+- "topic_summary": 회의의 핵심 주제를 한 문장으로 요약
+- "content_summary": 회의 전반의 진행 내용, 논의 흐름, 이유 등을 5줄 이내로 정리
+- "decisions": 회의 중 실제로 합의된 사항만을 항목별로 정리 (액션아이템과 중복 금지)
+- "action_items": 각 참가자별 해야 할 일과 마감 기한을 정리
+  - name: 사람 이름 (없으면 "담당자 미상")
+  - task: 해야 할 일
+  - due: 대화에 나온 기한 표현 그대로 (예: "금요일까지", "내일", "다음 주 화요일") 또는 "미정"
+
+예시:
+회의록: "철우: 2025년 10월 27일 회의 시작하겠습니다. ... 소라는 UI 시안 내일까지 정리해주세요."
+→ meeting_date: "2025-10-27", action_items: [{{"name": "소라", "task": "UI 시안 정리", "due": "내일"}}]
+
+회의록:
+{text}
+""")
+
+
+# ===========================================
+# 🎯 긴 회의용 map-reduce Prompt
+#   - map: 회의록 일부 구간에서 요약/결정사항/액션아이템 추출
+#   - reduce: 구간별 요약을 하나의 회의 요약으로 통합
+# ===========================================
+meeting_map_prompt = PromptTemplate.from_template("""
+당신은 'AI 회의 요약 비서'입니다.
+아래는 긴 회의록 중 {index}/{total} 번째 구간입니다. 이 구간에 나온 내용만 근거로 추출하세요.
+
+요구사항:
+- "meeting_date": 이 구간에서 회의 날짜를 알 수 있으면 YYYY-MM-DD (연도 미언급 시 {current_year}), 없으면 null
+- "topic_summary": 이 구간의 핵심 주제 한 문장
+- "content_summary": 이 구간의 논의 흐름 3줄 이내
+- "decisions": 이 구간에서 합의된 사항만
+- "action_items": 이 구간에서 나온 담당자별 할 일
+  - name: 사람 이름 (없으면 "담당자 미상")
+  - task: 해야 할 일
+  - due: 대화에 나온 기한 표현 그대로 또는 "미정"
+
+회의록 구간:
+{text}
+""")
+
+meeting_reduce_prompt = PromptTemplate.from_template("""
+당신은 'AI 회의 요약 비서'입니다.
+아래는 하나의 긴 회의를 여러 구간으로 나눠 요약한 결과입니다. 이를 하나의 회의 요약으로 통합하세요.
+
+요구사항:
+- "topic_summary": 회의 전체의 핵심 주제를 한 문장으로 요약
+- "content_summary": 회의 전반의 진행 내용, 논의 흐름, 이유 등을 5줄 이내로 정리
+- "decisions": 구간별 결정사항을 합치되 같은 의미의 항목은 하나로 병합
+
+구간별 요약(JSON):
+{partials}
+""")
+
+
+# ===========================================
+# 🎯 실시간 회의용 누적 요약 Prompt
+#   - 지금까지의 요약(JSON) + 새로 전사된 구간만 입력 → 갱신된 요약
+#   - 액션아이템은 새 구간에서 나온 것만 (기존 항목과의 병합은 코드에서 처리)
+# ===========================================
+meeting_update_prompt = PromptTemplate.from_template("""
+당신은 'AI 회의 요약 비서'입니다.
+아래는 진행 중인 회의의 지금까지 요약과, 그 뒤에 새로 전사된 대화 구간입니다.
+새 구간 내용을 반영해 요약을 갱신하세요.
+
+요구사항:
+- "meeting_date": 지금까지 요약에 값이 있으면 그대로, 없으면 새 구간에서 알 수 있을 때 YYYY-MM-DD (연도 미언급 시 {current_year}), 모르면 null
+- "topic_summary": 회의 전체(지금까지 + 새 구간)의 핵심 주제 한 문장
+- "content_summary": 회의 전체의 진행 내용, 논의 흐름을 5줄 이내로 정리
+- "decisions": 기존 결정사항에 새 구간의 합의 사항을 더하되 같은 의미의 항목은 하나로
+- "action_items": 새 구간에서 나온 담당자별 할 일만
+  - name: 사람 이름 (없으면 "담당자 미상")
+  - task: 해야 할 일
+  - due: 대화에 나온 기한 표현 그대로 또는 "미정"
+
+지금까지 요약(JSON):
+{summary}
+
+새 구간:
+{text}
+""")
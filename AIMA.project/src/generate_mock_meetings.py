@@ -1,13 +1,5 @@
 import os, re
-from pydub import AudioSegment
-import openai
 import sys
-sys.stdout.reconfigure(encoding='utf-8')
-
-openai.api_key = os.getenv("OPENAI_API_KEY")
-
-os.makedirs("wav.file", exist_ok=True)
-os.makedirs("mock_data/meetings", exist_ok=True)
 
 SPEAKERS = {
     "철우": "alloy",    # 리더, 중저음
@@ -114,33 +106,65 @@ scripts = {
 철우: 좋아요, 전반적으로 일정이 잘 맞춰지고 있네요. 윤성은 그래프 내일 오전까지, 정우는 리포트 오늘 오후까지, 창용은 로그 내일까지, 소라는 QA 오늘 밤까지, 용재는 보안 리포트 금요일 오전까지 마무리합시다. 내일은 리허설 겸 최종 발표 리허설 진행할게요.'''
 }
 
-for idx, script in scripts.items():
-    print(f"\n🎧 [{idx}] 회의 오디오 생성 중...")
 
-    segments = []
-    for i, line in enumerate(script.strip().split("\n")):
+def wav_path(idx: int) -> str:
+    """스크립트 번호 → 생성되는 회의 음성 파일 경로"""
+    return f"wav.file/10월 2{idx+5}일 회의록.wav"
+
+
+def script_turns(script: str) -> list:
+    """스크립트 → [(화자, 발화), ...] (음성 생성과 같은 규칙으로 분리)"""
+    turns = []
+    for line in script.strip().split("\n"):
         match = re.match(r"(.+?): (.+)", line)
-        if not match:
+        if match:
+            turns.append((match.group(1), match.group(2).strip()))
+    return turns
+
+
+def generate(indices=None):
+    """OpenAI TTS로 화자별 음성을 만들어 회의 하나당 WAV 하나로 합침"""
+    from pydub import AudioSegment
+    import openai
+
+    openai.api_key = os.getenv("OPENAI_API_KEY")
+    os.makedirs("wav.file", exist_ok=True)
+    os.makedirs("mock_data/meetings", exist_ok=True)
+
+    for idx, script in scripts.items():
+        if indices and idx not in indices:
             continue
+        print(f"\n🎧 [{idx}] 회의 오디오 생성 중...")
+
+        segments = []
+        for i, line in enumerate(script.strip().split("\n")):
+            match = re.match(r"(.+?): (.+)", line)
+            if not match:
+                continue
+
+            speaker, text = match.groups()
+            voice = SPEAKERS.get(speaker, "alloy")
+            filename = f"temp_{idx}_{i:02d}_{speaker}.mp3"
+
+            with openai.audio.speech.with_streaming_response.create(
+                model="gpt-4o-mini-tts",
+                voice=voice,
+                input=text
+            ) as response:
+                response.stream_to_file(filename)
 
-        speaker, text = match.groups()
-        voice = SPEAKERS.get(speaker, "alloy")
-        filename = f"temp_{idx}_{i:02d}_{speaker}.mp3"
+            print(f"  ✅ {speaker} → {filename}")
+            seg = AudioSegment.from_file(filename, format="mp3") + AudioSegment.silent(duration=400)
+            segments.append(seg)
 
-        with openai.audio.speech.with_streaming_response.create(
-            model="gpt-4o-mini-tts",
-            voice=voice,
-            input=text
-        ) as response:
-            response.stream_to_file(filename)
+        combined = sum(segments)
+        final_path = wav_path(idx)
+        combined.export(final_path, format="wav")
+        print(f"🎉 {final_path} 생성 완료!")
 
-        print(f"  ✅ {speaker} → {filename}")
-        seg = AudioSegment.from_file(filename, format="mp3") + AudioSegment.silent(duration=400)
-        segments.append(seg)
+    print("\n✅ 모든 회의 오디오 생성 완료! (wav.file 폴더 확인)")
 
-    combined = sum(segments)
-    final_path = f"wav.file/10월 2{idx+5}일 회의록.wav"
-    combined.export(final_path, format="wav")
-    print(f"🎉 {final_path} 생성 완료!")
 
-print("\n✅ 모든 회의 오디오 생성 완료! (wav.file 폴더 확인)")
+if __name__ == "__main__":
+    sys.stdout.reconfigure(encoding='utf-8')
+    generate()
@@ -0,0 +1,180 @@
+import os, time, uuid, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+
+from progress import ProgressTracker
+from stt_backend import STT_BACKEND
+from stt_registry import DEFAULT_MODEL_SIZE
+from llm_client import client as llm_client, MAX_INFLIGHT as LLM_MAX_INFLIGHT
+import metrics
+
+# ===================== 설정 =====================
+# STT는 CPU 바운드(공유 모델이라 모델당 1개씩만 추론), LLM/DB는 I/O 바운드 → 풀을 분리
+STT_WORKERS = int(os.getenv("JOB_STT_WORKERS", "1"))
+# 공급자 한도(동시성/RPM/TPM)는 llm_client 가 전역으로 지키므로 여러 회의의 LLM 단계를 그만큼 겹쳐 실행
+LLM_WORKERS = int(os.getenv("JOB_LLM_WORKERS", str(LLM_MAX_INFLIGHT)))
+# 대기 + 실행 중인 작업 수 상한 (넘으면 429로 back-pressure)
+MAX_PENDING_JOBS = int(os.getenv("JOB_MAX_PENDING", "8"))
+# 완료된 작업 기록 보관 개수
+MAX_FINISHED_JOBS = int(os.getenv("JOB_MAX_FINISHED", "200"))
+
+QUEUED, TRANSCRIBING, ANALYZING = "queued", "transcribing", "analyzing"
+DONE, FAILED, CANCELLED = "done", "failed", "cancelled"
+ACTIVE_STATES = {QUEUED, TRANSCRIBING, ANALYZING}
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, filename: str, audio_path: str, backend: str = None, model_size: str = None):
+        self.id = uuid.uuid4().hex[:12]
+        self.filename = filename
+        self.audio_path = audio_path
+        self.backend = backend
+        self.model_size = model_size
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_requested = False
+        # 작업 종료 시 결과/예외가 들어가는 Future (async 엔드포인트에서 await 용)
+        self.completion = Future()
+        self._stage_future = None
+        # 단계별 진행 이벤트 (SSE로 스트리밍)
+        self.progress = ProgressTracker()
+        self.progress.emit("queue", "queued")
+
+    def to_dict(self) -> dict:
+        return {
+            "job_id": self.id,
+            "filename": self.filename,
+            "status": self.status,
+            "backend": self.backend,
+            "model_size": self.model_size,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "stage_seconds": self.progress.stage_seconds,
+        }
+
+
+# ===================== 작업 관리자 =====================
+class JobManager:
+    def __init__(self, stt_workers=STT_WORKERS, llm_workers=LLM_WORKERS, max_pending=MAX_PENDING_JOBS):
+        self._stt_pool = ThreadPoolExecutor(max_workers=stt_workers, thread_name_prefix="stt")
+        self._llm_pool = ThreadPoolExecutor(max_workers=llm_workers, thread_name_prefix="llm")
+        self._max_pending = max_pending
+        self._jobs = OrderedDict()
+        self._active_by_file = {}   # (파일, STT 백엔드, 모델 크기) → 대기/실행 중 작업
+        self._lock = threading.RLock()
+
+    def submit(self, filename: str, audio_path: str, backend: str = None, model_size: str = None):
+        """작업 등록. 같은 파일이 같은 STT 설정으로 이미 대기/실행 중이면 기존 작업을 돌려준다 → (job, 신규여부)
+        (백엔드/모델이 다르면 결과도 다르므로 별도 작업)"""
+        backend, model_size = backend or STT_BACKEND, model_size or DEFAULT_MODEL_SIZE
+        key = (filename, backend, model_size)
+        with self._lock:
+            existing = self._active_by_file.get(key)
+            if existing is not None:
+                return existing, False
+            pending = sum(1 for j in self._jobs.values() if j.status in ACTIVE_STATES)
+            if pending >= self._max_pending:
+                raise QueueFullError(f"대기 중인 작업이 너무 많습니다 ({pending}/{self._max_pending})")
+
+            job = Job(filename, audio_path, backend, model_size)
+            self._jobs[job.id] = job
+            self._active_by_file[key] = job
+            job._stage_future = self._stt_pool.submit(self._run_stt, job)
+            return job, True
+
+    def get(self, job_id: str):
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> bool:
+        """대기 중이면 즉시 취소, 실행 중이면 현재 단계가 끝난 뒤 다음 단계로 넘어가지 않음
+        (LLM 단계는 대기/실행 중인 LLM 호출까지 바로 취소)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.status not in ACTIVE_STATES:
+                return False
+            job.cancel_requested = True
+            if job._stage_future is not None and job._stage_future.cancel():
+                self._finish(job, CANCELLED)
+            elif job.status == ANALYZING:
+                llm_client.cancel(job.id)
+            return True
+
+    def stats(self) -> dict:
+        counts = {}
+        for j in list(self._jobs.values()):
+            counts[j.status] = counts.get(j.status, 0) + 1
+        return {"max_pending": self._max_pending, "jobs": counts}
+
+    def shutdown(self):
+        self._stt_pool.shutdown(wait=False, cancel_futures=True)
+        self._llm_pool.shutdown(wait=False, cancel_futures=True)
+
+    # ---------- 단계 실행 ----------
+    def _run_stt(self, job: Job):
+        if job.cancel_requested:
+            return self._finish(job, CANCELLED)
+        job.status, job.started_at = TRANSCRIBING, time.time()
+        # meeting_api(LLM/STT 스택)는 무거워서 서버 import 시점이 아닌 첫 작업(또는 워밍업)에서 로드
+        from meeting_api import transcribe_audio
+        try:
+            full_text = transcribe_audio(job.audio_path, job.progress, job.backend, job.model_size)
+        except Exception as e:
+            return self._finish(job, FAILED, error=e)
+
+        with self._lock:
+            if job.cancel_requested:
+                return self._finish(job, CANCELLED)
+            job.status = ANALYZING
+            job._stage_future = self._llm_pool.submit(self._run_llm, job, full_text)
+
+    def _run_llm(self, job: Job, full_text: str):
+        if job.cancel_requested:
+            return self._finish(job, CANCELLED)
+        from meeting_api import analyze_transcript
+        try:
+            with llm_client.scope(job.id):
+                result = analyze_transcript(job.audio_path, full_text, job.progress)
+        except Exception as e:
+            if job.cancel_requested:
+                return self._finish(job, CANCELLED)
+            return self._finish(job, FAILED, error=e)
+        self._finish(job, DONE, result=result)
+
+    def _finish(self, job: Job, status: str, result=None, error=None):
+        with self._lock:
+            job.status, job.result, job.finished_at = status, result, time.time()
+            if error is not None:
+                job.error = str(error)
+                print(f"❌ 작업 실패 [{job.id}] {job.filename}: {error}")
+            key = (job.filename, job.backend, job.model_size)
+            if self._active_by_file.get(key) is job:
+                del self._active_by_file[key]
+
+            if not job.completion.done():
+                if status == DONE:
+                    job.completion.set_result(result)
+                elif status == FAILED:
+                    job.completion.set_exception(error)
+                else:
+                    job.completion.cancel()
+                job.progress.close(status, error=job.error)
+                metrics.JOBS.inc(status=status)
+                metrics.JOB_SECONDS.observe(job.finished_at - job.created_at, status=status)
+
+            # 오래된 완료 작업 기록 정리
+            finished = [k for k, j in self._jobs.items() if j.status not in ACTIVE_STATES]
+            for k in finished[: max(0, len(finished) - MAX_FINISHED_JOBS)]:
+                self._jobs.pop(k, None)
+
+
+job_manager = JobManager()
@@ -0,0 +1,307 @@
+import os, json, time, wave, argparse, tempfile, threading
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+
+import stt_registry
+from progress import ProgressTracker
+
+# ===================== 설정 =====================
+# 입력 오디오: 16kHz mono PCM16(little-endian) 바이너리 프레임
+SAMPLE_RATE = stt_registry.SAMPLE_RATE
+BYTES_PER_SEC = SAMPLE_RATE * 2
+# 버퍼가 이 길이를 넘으면 전사 (짧을수록 지연↓, Whisper 문맥↓)
+CHUNK_SEC = float(os.getenv("LIVE_CHUNK_SEC", "15"))
+# 청크 끝 이 구간 안에서 가장 조용한 지점에서 자름 (단어 중간 절단 방지)
+CUT_SEARCH_SEC = float(os.getenv("LIVE_CUT_SEARCH_SEC", "3"))
+FRAME_MS = 30
+# 새 전사문이 이만큼(토큰 추정치) 쌓이거나 마지막 갱신 후 이 시간이 지나면 누적 요약 갱신
+SUMMARY_TOKENS = int(os.getenv("LIVE_SUMMARY_TOKENS", "600"))
+SUMMARY_INTERVAL_SEC = float(os.getenv("LIVE_SUMMARY_INTERVAL_SEC", "90"))
+WAV_DIR = "wav.file"
+
+EMPTY_SUMMARY = {"meeting_date": None, "topic_summary": "", "content_summary": "", "decisions": [], "action_items": []}
+
+
+def default_name() -> str:
+    now = datetime.now()
+    return f"{now.month}월 {now.day}일 {now:%H%M} 실시간 회의록"
+
+
+def _quietest_cut(pcm: bytes) -> int:
+    """마지막 CUT_SEARCH_SEC 안에서 에너지가 가장 낮은 30ms 프레임 위치 (바이트 오프셋)"""
+    import numpy as np
+    frame = SAMPLE_RATE * FRAME_MS // 1000 * 2
+    end = len(pcm)
+    lo = max(0, end - int(CUT_SEARCH_SEC * BYTES_PER_SEC))
+    lo += (end - lo) % frame
+    if end - lo < frame:
+        return end
+    samples = np.frombuffer(pcm[lo:end], np.int16).astype(np.float32)
+    energies = (samples.reshape(-1, frame // 2) ** 2).mean(axis=1)
+    return lo + int(energies.argmin()) * frame
+
+
+# ===================== 실시간 세션 =====================
+class LiveSession:
+    """오디오 청크 → (상주 STT 모델로) 증분 전사 → 새 구간만으로 누적 요약 갱신 → 종료 시 일반 저장 경로로 마무리
+
+    STT 단계와 요약 단계는 각각 세션 전용 스레드 1개에서 순서대로 실행 → 입력이 계속 들어와도 순서 보장,
+    요약이 느려도 전사는 밀리지 않음."""
+
+    def __init__(self, name: str = None, on_event=None, backend: str = None, model_size: str = None):
+        self.name = os.path.splitext(os.path.basename(name or default_name()))[0]
+        self.backend = backend
+        self.model_size = model_size or stt_registry.DEFAULT_MODEL_SIZE
+        self.on_event = on_event or (lambda event: None)
+        self.started_at = time.time()
+        self.audio = bytearray()    # 아직 전사하지 않은 오디오만 (전사한 구간은 임시 WAV로 내려씀)
+        self._wav = self._wav_path = None
+        self.segments = []
+        self.summary = json.loads(json.dumps(EMPTY_SUMMARY))
+        self.windows = 0
+        self.result = None
+        self._cursor = 0            # 전사가 끝나 임시 WAV에 쓴 오디오 바이트 수
+        self._summarized = 0        # 요약에 반영된 segment 개수
+        self._last_summary_at = time.time()
+        self._stt_queued = self._summary_queued = False
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stt = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-stt")
+        self._llm = ThreadPoolExecutor(max_workers=1, thread_name_prefix="live-llm")
+
+    # ---------- 입력 ----------
+    def feed(self, pcm: bytes) -> bool:
+        """마무리가 시작된 뒤 들어온 오디오는 버리고 error 이벤트로 알림 → False"""
+        with self._lock:
+            closed = self._closed
+            if not closed:
+                self.audio += pcm[: len(pcm) - len(pcm) % 2]
+                ready = len(self.audio) >= CHUNK_SEC * BYTES_PER_SEC and not self._stt_queued
+                if ready:
+                    self._stt_queued = True
+        if closed:
+            self.on_event({"type": "error", "error": "이미 종료된 세션입니다 (마무리 이후 오디오는 반영되지 않음)."})
+            return False
+        if ready:
+            self._stt.submit(self._guard, self._stt_step, False)
+        return True
+
+    def _guard(self, fn, *args):
+        try:
+            return fn(*args)
+        except Exception as e:
+            print(f"❌ 실시간 회의 처리 실패 ({self.name}): {e}")
+            self.on_event({"type": "error", "error": str(e)})
+
+    # ---------- 증분 전사 ----------
+    def _stt_step(self, final: bool):
+        import numpy as np
+        with self._lock:
+            self._stt_queued = False
+            start = self._cursor
+            end = start + (len(self.audio) if final else _quietest_cut(bytes(self.audio)))
+            pcm = bytes(self.audio[:end - start])
+        if not pcm:
+            return
+
+        offset = start / BYTES_PER_SEC
+        audio = np.frombuffer(pcm, np.int16).astype(np.float32) / 32768.0
+        result = stt_registry.transcribe(audio, size=self.model_size, backend=self.backend, language="ko")
+        segments = [
+            {"start": round(offset + s["start"], 2), "end": round(offset + s["end"], 2), "text": s["text"]}
+            for s in result["segments"] if s["text"].strip()
+        ]
+        self._spill(pcm)
+        with self._lock:
+            self.segments += segments
+            del self.audio[:end - start]
+            self._cursor = end
+            more = not final and len(self.audio) >= CHUNK_SEC * BYTES_PER_SEC and not self._stt_queued
+            if more:
+                self._stt_queued = True
+        self.on_event({"type": "transcript", "segments": segments, "audio_seconds": round(end / BYTES_PER_SEC, 1)})
+        if more:
+            self._stt.submit(self._guard, self._stt_step, False)
+        if not final:
+            self._maybe_summarize()
+
+    # ---------- 누적 요약 ----------
+    def _pending_text(self) -> str:
+        return "\n".join(s["text"] for s in self.segments[self._summarized:])
+
+    def _maybe_summarize(self):
+        from long_summary import estimate_tokens
+        with self._lock:
+            text = self._pending_text()
+            due = estimate_tokens(text) >= SUMMARY_TOKENS or (
+                text and time.time() - self._last_summary_at >= SUMMARY_INTERVAL_SEC)
+            if not due or self._summary_queued:
+                return
+            self._summary_queued = True
+        self._llm.submit(self._guard, self._summary_step)
+
+    def _summary_step(self):
+        """지금까지 요약 + 아직 반영 안 된 전사 구간만 LLM에 보냄 (전체 전사문 재전송 없음)"""
+        from schemas import MeetingExtraction
+        from llm_calls import structured_llm_call
+        from long_summary import dedupe_action_items
+        from result_cache import prompt_version
+        from prompts.meeting_summary_prompt import meeting_update_prompt
+        from transcript_compact import prepare as compact_transcript
+
+        with self._lock:
+            self._summary_queued = False
+            upto = len(self.segments)
+            text = "\n".join(s["text"] for s in self.segments[self._summarized:upto])
+            previous = {k: v for k, v in self.summary.items() if k != "action_items"}
+        if not text.strip():
+            return
+
+        text, _ = compact_transcript(text)
+        prompt_text = meeting_update_prompt.format(
+            summary=json.dumps(previous, ensure_ascii=False), text=text, current_year=datetime.now().year)
+        update = structured_llm_call(prompt_text, MeetingExtraction, prompt_version(meeting_update_prompt))
+
+        with self._lock:
+            self.summary.update(
+                meeting_date=self.summary["meeting_date"] or update.get("meeting_date"),
+                topic_summary=update["topic_summary"],
+                content_summary=update["content_summary"],
+                decisions=update["decisions"],
+                action_items=dedupe_action_items(self.summary["action_items"] + update["action_items"]),
+            )
+            self._summarized = upto
+            self._last_summary_at = time.time()
+            self.windows += 1
+            snapshot = json.loads(json.dumps(self.summary))
+        self.on_event({"type": "summary", "window": self.windows, "summary": snapshot})
+
+    # ---------- 오디오 저장 (전사한 구간부터 임시 WAV로) ----------
+    def _spill(self, pcm: bytes):
+        """STT 스레드에서만 호출 → 긴 회의도 메모리에는 전사 대기 중인 구간만 남음"""
+        if self._wav is None:
+            os.makedirs(WAV_DIR, exist_ok=True)
+            # .wav.part 라 wav.file 목록에는 보이지 않고, 같은 폴더라 저장 시 rename 한 번으로 끝남
+            fd, self._wav_path = tempfile.mkstemp(dir=WAV_DIR, prefix=".live-", suffix=".wav.part")
+            os.close(fd)
+            self._wav = wave.open(self._wav_path, "wb")
+            self._wav.setnchannels(1)
+            self._wav.setsampwidth(2)
+            self._wav.setframerate(SAMPLE_RATE)
+        self._wav.writeframes(pcm)
+
+    def _discard_audio(self):
+        if self._wav is not None:
+            self._wav.close()
+            os.remove(self._wav_path)
+            self._wav = None
+
+    # ---------- 종료 ----------
+    def save_audio(self) -> str:
+        with self._lock:
+            rest = bytes(self.audio)
+            self.audio.clear()
+        self._spill(rest)
+        self._wav.close()
+        self._wav = None
+        path = os.path.join(WAV_DIR, f"{self.name}.wav")
+        os.replace(self._wav_path, path)
+        return path
+
+    def finalize(self, progress: ProgressTracker = None) -> dict:
+        """남은 오디오 전사 → 마지막 구간 요약 → 일반 분석과 같은 저장 경로(due 정규화, outbox, JSON, 색인, DOCX)"""
+        from meeting_api import persist_summary, parse_meeting_date
+
+        progress = progress or ProgressTracker()
+        with self._lock:
+            self._closed = True
+        t0 = time.perf_counter()
+        try:
+            with progress.stage("stt") as st:
+                self._stt.submit(self._stt_step, True).result()
+                st.update(segments=len(self.segments), audio_seconds=round(self._cursor / BYTES_PER_SEC, 1))
+            with progress.stage("summary") as st:
+                self._llm.submit(self._summary_step).result()
+                st.update(mode="live", windows=self.windows)
+            if not self.segments:
+                raise ValueError("전사된 내용이 없습니다.")
+
+            audio_path = self.save_audio()
+            full_text = "\n".join(s["text"] for s in self.segments)
+            parsed = json.loads(json.dumps(self.summary))
+            base_dt = parse_meeting_date(parsed.pop("meeting_date", None))
+            self.result = persist_summary(audio_path, parsed, base_dt, full_text, progress, mode="live")
+        except Exception as e:
+            self.on_event({"type": "error", "error": str(e)})
+            raise
+        finally:
+            self._stt.shutdown(wait=False)
+            self._llm.shutdown(wait=False)
+            self._discard_audio()  # 저장 전에 실패했으면 임시 WAV 정리
+            _sessions.pop(self.name, None)
+
+        elapsed = round(time.perf_counter() - t0, 2)
+        print(f"✅ 실시간 회의 마무리 ({self.name}): 종료 후 {elapsed}초")
+        self.on_event({"type": "final", "name": self.name, "finalize_seconds": elapsed, "result": self.result})
+        return self.result
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "started_at": self.started_at,
+                "audio_seconds": round((self._cursor + len(self.audio)) / BYTES_PER_SEC, 1),
+                "transcribed_seconds": round(self._cursor / BYTES_PER_SEC, 1),
+                "segments": len(self.segments),
+                "summary_windows": self.windows,
+            }
+
+
+# ===================== 세션 관리 =====================
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def start_session(name: str = None, on_event=None, backend: str = None, model_size: str = None) -> LiveSession:
+    session = LiveSession(name, on_event, backend, model_size)
+    with _sessions_lock:
+        if session.name in _sessions or os.path.exists(os.path.join(WAV_DIR, f"{session.name}.wav")):
+            raise ValueError(f"이미 있는 회의 이름입니다: {session.name}")
+        _sessions[session.name] = session
+    return session
+
+
+def sessions() -> list:
+    return [s.to_dict() for s in list(_sessions.values())]
+
+
+# ===================== 재생 시뮬레이션 =====================
+def replay(path: str, name: str = None, speed: float = 1.0, frame_sec: float = 0.5) -> dict:
+    """WAV를 실시간처럼 잘라 넣어 종료 후 요약까지 걸린 시간 측정 (16kHz mono PCM16 파일)"""
+    session = start_session(name or f"{os.path.splitext(os.path.basename(path))[0]} 실시간",
+                            on_event=lambda e: print(f"  📡 {e['type']}", {k: v for k, v in e.items()
+                                                                            if k in ("window", "audio_seconds")}))
+    with wave.open(path) as w:
+        if (w.getframerate(), w.getnchannels(), w.getsampwidth()) != (SAMPLE_RATE, 1, 2):
+            raise ValueError("16kHz mono PCM16 WAV만 지원합니다.")
+        step = int(SAMPLE_RATE * frame_sec)
+        while True:
+            frames = w.readframes(step)
+            if not frames:
+                break
+            session.feed(frames)
+            if speed > 0:
+                time.sleep(frame_sec / speed)
+    t0 = time.perf_counter()
+    result = session.finalize()
+    return {"name": session.name, "windows": session.windows, "time_to_summary_sec": round(time.perf_counter() - t0, 2),
+            "action_items": len(result["action_items"])}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="실시간 회의 모드 재생 테스트 (WAV를 청크 단위로 흘려 넣음)")
+    parser.add_argument("wav")
+    parser.add_argument("--name", default=None)
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 배속 (0이면 대기 없이)")
+    args = parser.parse_args()
+    print(json.dumps(replay(args.wav, args.name, args.speed), ensure_ascii=False, indent=2))
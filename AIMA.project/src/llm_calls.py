@@ -0,0 +1,78 @@
+import re, json, time
+
+from result_cache import llm_cache, text_hash, make_key
+from llm_router import RoutedChat
+import metrics
+
+
+# ===================== 안전한 JSON 파싱 =====================
+def _served_model(llm) -> str:
+    """라우터를 거쳤으면 실제로 응답한 백엔드의 모델명"""
+    backend = getattr(llm, "last_backend", None)
+    if backend is not None:
+        return backend.model
+    return getattr(llm, "model_name", None) or getattr(llm, "model", "unknown")
+
+
+def _from_primary(llm) -> bool:
+    """캐시 키는 1순위 백엔드 모델 기준 → fallback/hedge 로 다른 백엔드가 답한 결과는 캐시에 넣지 않음"""
+    backend = getattr(llm, "last_backend", None)
+    return backend is None or backend is llm.router.primary
+
+
+def safe_llm_json(llm, prompt_text, retries=2):
+    for i in range(retries + 1):
+        if i:
+            metrics.LLM_RETRIES.inc(fn="safe_llm_json", model=_served_model(llm))
+        t0 = time.perf_counter()
+        resp = llm.invoke(prompt_text)
+        model = _served_model(llm)
+        metrics.LLM_SECONDS.observe(time.perf_counter() - t0, fn="safe_llm_json", model=model)
+        metrics.LLM_CALLS.inc(fn="safe_llm_json", model=model)
+        metrics.record_llm_usage(resp, model, "safe_llm_json")
+        text = resp.content.strip()
+        json_part = re.search(r'\{[\s\S]*\}', text)
+        if not json_part:
+            continue
+        try:
+            return json.loads(json_part.group(0))
+        except json.JSONDecodeError:
+            prompt_text += "\n\nJSON 형식만 정확히 출력해주세요."
+    raise ValueError("❌ LLM이 올바른 JSON을 반환하지 못했습니다.")
+
+
+def cached_llm_json(llm, prompt_text, version):
+    """(전사 내용 + 모델 + 프롬프트 버전 + 파라미터)가 같으면 LLM을 다시 부르지 않음"""
+    key = make_key("llm", text_hash(prompt_text), llm.model_name, llm.temperature, version)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+    parsed = safe_llm_json(llm, prompt_text)
+    if _from_primary(llm):
+        llm_cache.put(key, parsed, model=llm.model_name, prompt_version=version)
+    return parsed
+
+
+# ===================== 구조화 출력 호출 =====================
+def structured_llm_call(prompt_text: str, schema, version: str, temperature: float = 0.2) -> dict:
+    """스키마(Pydantic)로 출력이 강제되는 호출 — 정규식 추출/재시도 루프가 필요 없음"""
+    # 백엔드(클라우드 / 로컬 Ollama)는 라우터가 지연·실패 통계로 선택
+    llm = RoutedChat(temperature)
+    key = make_key("llm", text_hash(prompt_text), llm.model_name, temperature, version, schema.__name__)
+    cached = llm_cache.get(key)
+    if cached is not None:
+        return cached
+
+    # include_raw=True → 파싱 결과와 함께 원본 메시지(토큰 사용량)도 받음
+    t0 = time.perf_counter()
+    out = llm.with_structured_output(schema, include_raw=True).invoke(prompt_text)
+    model = _served_model(llm)
+    metrics.LLM_SECONDS.observe(time.perf_counter() - t0, fn="structured", model=model)
+    metrics.LLM_CALLS.inc(fn="structured", model=model)
+    metrics.record_llm_usage(out["raw"], model, "structured")
+    if out["parsed"] is None:
+        raise ValueError(f"❌ 구조화 출력 파싱 실패: {out.get('parsing_error')}")
+    parsed = out["parsed"].dict()
+    if _from_primary(llm):
+        llm_cache.put(key, parsed, model=model, prompt_version=version)
+    return parsed
@@ -0,0 +1,305 @@
+import os, time, random, asyncio, argparse, threading, contextvars
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, CancelledError
+
+import metrics
+
+# ===================== 설정 =====================
+# 클라우드 백엔드(openai): 동시 요청 수 / 분당 요청 수 / 분당 토큰 수 (0이면 제한 없음)
+MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "8"))
+RPM = int(os.getenv("LLM_RPM", "500"))
+TPM = int(os.getenv("LLM_TPM", "200000"))
+# 로컬 백엔드(ollama): GPU 하나를 나눠 쓰므로 동시 요청만 제한
+LOCAL_MAX_INFLIGHT = int(os.getenv("LLM_LOCAL_MAX_INFLIGHT", "2"))
+# 호출당 제한 시간 / 일시적 오류 재시도 (지수 백오프 + full jitter)
+CALL_TIMEOUT_SEC = float(os.getenv("LLM_CALL_TIMEOUT_SEC", "90"))
+MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+BACKOFF_BASE_SEC = float(os.getenv("LLM_BACKOFF_BASE_SEC", "1"))
+BACKOFF_MAX_SEC = float(os.getenv("LLM_BACKOFF_MAX_SEC", "30"))
+# 응답 토큰 예상치 (요청 전 TPM 버킷에서 미리 차감, 응답 후 실제 사용량으로 정산)
+EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", "800"))
+
+
+# ===================== 토큰 버킷 =====================
+class TokenBucket:
+    """분당 한도를 초당 보충량으로 나눠 채우는 버킷 (이벤트 루프 스레드에서만 사용)"""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float) -> float:
+        """amount 만큼 차감될 때까지 대기 → 기다린 시간(초)"""
+        if self.rate <= 0:
+            return 0.0
+        amount = min(amount, self.capacity)  # 버킷보다 큰 요청이 영원히 막히지 않도록
+        waited = 0.0
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return waited
+            delay = (amount - self.tokens) / self.rate
+            waited += delay
+            await asyncio.sleep(delay)
+
+    def settle(self, delta: float):
+        """예상치와 실제 사용량 차이 정산 (더 썼으면 빚으로 남아 다음 요청이 그만큼 대기)"""
+        if self.rate <= 0:
+            return
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class Limiter:
+    def __init__(self, max_inflight: int, rpm: int = 0, tpm: int = 0):
+        self.max_inflight = max_inflight
+        self.semaphore = asyncio.Semaphore(max_inflight)
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.inflight = 0
+        self.waiting = 0
+
+    def to_dict(self) -> dict:
+        return {
+            "max_inflight": self.max_inflight,
+            "inflight": self.inflight,
+            "waiting": self.waiting,
+            "rpm_available": round(self.requests.tokens, 1) if self.requests.rate else None,
+            "tpm_available": round(self.tokens.tokens) if self.tokens.rate else None,
+        }
+
+
+# ===================== 오류 분류 =====================
+def is_rate_limited(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or type(error).__name__ == "RateLimitError" or "rate limit" in str(error).lower()
+
+
+def is_retryable(error: BaseException) -> bool:
+    """rate limit / 타임아웃 / 연결 오류 / 5xx 만 재시도 (4xx 요청 오류·파싱 오류는 즉시 실패)"""
+    if is_rate_limited(error) or isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    return type(error).__name__ in ("APITimeoutError", "APIConnectionError", "InternalServerError",
+                                    "ServiceUnavailableError", "ConnectError", "ReadTimeout")
+
+
+def retry_after(error: BaseException):
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """지수 백오프 + full jitter: [0, min(상한, base * 2^attempt)]"""
+    return random.uniform(0, min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2 ** attempt))
+
+
+def usage_tokens(out) -> int:
+    """응답(AIMessage 또는 include_raw dict)의 실제 입력+출력 토큰"""
+    message = out.get("raw") if isinstance(out, dict) else out
+    usage = getattr(message, "usage_metadata", None) or {}
+    return int(usage.get("input_tokens", 0) + usage.get("output_tokens", 0))
+
+
+def _release(limiter: Limiter, future):
+    limiter.inflight -= 1
+    limiter.semaphore.release()
+    if not future.cancelled():
+        future.exception()  # 기다림을 그만둔 호출의 오류가 "never retrieved" 경고로 남지 않게
+
+
+# ===================== 취소 범위 =====================
+# 작업(job) 단위로 걸린 LLM 호출을 한 번에 취소하기 위한 범위 이름
+_scope = contextvars.ContextVar("llm_scope", default=None)
+
+
+def current_scope():
+    return _scope.get()
+
+
+# ===================== 클라이언트 =====================
+class LLMClient:
+    """전용 이벤트 루프 스레드에서 동시성(세마포어) / RPM·TPM 버킷 / 타임아웃 / 백오프를 관리하는 LLM 호출 계층.
+    LangChain 동기 호출은 스레드 풀에서 실행하고, 파이프라인 스레드는 run() 으로, async 코드는 acall() 로 사용"""
+
+    def __init__(self):
+        self._loop = None
+        self._limiters = {}
+        self._pool = ThreadPoolExecutor(max_workers=max(MAX_INFLIGHT, LOCAL_MAX_INFLIGHT) * 2,
+                                        thread_name_prefix="llm-call")
+        self._scoped = defaultdict(set)
+        self._cancelled = set()
+        self._depth = defaultdict(int)   # 범위별 중첩 수 (map 스레드가 같은 범위를 다시 열어도 바깥 범위가 끝날 때만 정리)
+        self._lock = threading.Lock()
+
+    # ---------- 이벤트 루프 ----------
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-client", daemon=True).start()
+            return self._loop
+
+    def limiter(self, backend) -> Limiter:
+        limiter = self._limiters.get(backend.name)
+        if limiter is None:
+            if backend.kind == "ollama":
+                limiter = Limiter(LOCAL_MAX_INFLIGHT)
+            else:
+                limiter = Limiter(MAX_INFLIGHT, RPM, TPM)
+            self._limiters[backend.name] = limiter
+        return limiter
+
+    # ---------- 호출 ----------
+    async def acall(self, backend, fn, tokens: int = 0, timeout: float = CALL_TIMEOUT_SEC,
+                    retry_rate_limit: bool = True):
+        """fn()(동기 LangChain 호출)을 한도 안에서 실행. 일시적 오류는 백오프 후 재시도,
+        rate limit은 다른 백엔드로 넘길 수 있으면(retry_rate_limit=False) 바로 올려 보냄"""
+        limiter = self.limiter(backend)
+        estimate = tokens + EXPECTED_COMPLETION_TOKENS
+        for attempt in range(MAX_RETRIES + 1):
+            limiter.waiting += 1
+            try:
+                waited = await limiter.requests.acquire(1) + await limiter.tokens.acquire(estimate)
+                await limiter.semaphore.acquire()
+            finally:
+                limiter.waiting -= 1
+            if waited:
+                metrics.LLM_THROTTLE_SECONDS.inc(waited, backend=backend.name)
+
+            limiter.inflight += 1
+            future = asyncio.get_running_loop().run_in_executor(self._pool, fn)
+            # 스레드의 호출은 중간에 멈출 수 없음 → 타임아웃/취소로 기다림을 그만둬도 실제로 끝날 때 슬롯 반납
+            future.add_done_callback(lambda f: _release(limiter, f))
+            done, _ = await asyncio.wait({future}, timeout=timeout)
+            if not done:
+                # 앞 호출이 아직 실행 중이므로 같은 요청을 겹쳐 보내지 않고 바로 실패 (라우터가 다른 백엔드로 넘김)
+                raise TimeoutError(f"LLM 응답 시간 초과 ({timeout:.0f}초, {backend.name})")
+            try:
+                out = future.result()
+            except Exception as e:
+                error = e
+            else:
+                limiter.tokens.settle(usage_tokens(out) - estimate if usage_tokens(out) else 0)
+                return out
+
+            limited = is_rate_limited(error)
+            if attempt == MAX_RETRIES or not is_retryable(error) or (limited and not retry_rate_limit):
+                raise error
+            delay = (retry_after(error) if limited else None) or backoff_delay(attempt)
+            metrics.LLM_BACKOFFS.inc(backend=backend.name, reason="rate_limited" if limited else "transient")
+            print(f"⏳ LLM 재시도 {attempt + 1}/{MAX_RETRIES} ({backend.name}, {delay:.1f}초 후): {error}")
+            await asyncio.sleep(delay)
+
+    def run(self, backend, fn, tokens: int = 0, scope=None, **options):
+        """스레드에서 호출하는 동기 버전 (scope 가 cancel() 되면 대기/실행 중이어도 CancelledError)"""
+        scope = scope if scope is not None else current_scope()
+        if scope is not None and scope in self._cancelled:
+            raise CancelledError()
+        future = asyncio.run_coroutine_threadsafe(self.acall(backend, fn, tokens, **options), self.loop())
+        if scope is not None:
+            with self._lock:
+                self._scoped[scope].add(future)
+        try:
+            return future.result()
+        finally:
+            if scope is not None:
+                with self._lock:
+                    self._scoped[scope].discard(future)
+                    if not self._scoped[scope]:
+                        del self._scoped[scope]
+
+    # ---------- 취소 ----------
+    @contextmanager
+    def scope(self, name):
+        """이 블록(같은 컨텍스트)에서 나가는 LLM 호출을 name 으로 묶음"""
+        token = _scope.set(name)
+        with self._lock:
+            self._depth[name] += 1
+        try:
+            yield
+        finally:
+            _scope.reset(token)
+            with self._lock:
+                self._depth[name] -= 1
+                if not self._depth[name]:
+                    del self._depth[name]
+                    self._cancelled.discard(name)
+
+    def cancel(self, name) -> int:
+        """해당 범위의 대기 중/실행 중 호출을 모두 취소 (이후 같은 범위의 새 호출도 바로 취소).
+        호출한 쪽은 바로 CancelledError 를 받고, 이미 보낸 요청의 슬롯은 응답이 끝날 때 반납됨"""
+        with self._lock:
+            self._cancelled.add(name)
+            futures = list(self._scoped.get(name, ()))
+        for future in futures:
+            future.cancel()
+        return len(futures)
+
+    def status(self) -> dict:
+        return {name: limiter.to_dict() for name, limiter in self._limiters.items()}
+
+
+client = LLMClient()
+
+
+# ===================== 부하 시뮬레이션 =====================
+def simulate(calls: int = 60, latency: float = 0.3, rpm: int = 120, inflight: int = 4, fail_rate: float = 0.1) -> dict:
+    """가짜 백엔드로 동시 호출을 몰아넣어 RPM·동시성 한도와 백오프가 지켜지는지 확인"""
+    from concurrent.futures import ThreadPoolExecutor as Pool
+
+    class Backend:
+        name, kind = "sim:fake", "openai"
+
+    class Transient(Exception):
+        status_code = 503
+
+    sim = LLMClient()
+    sim._limiters[Backend.name] = Limiter(inflight, rpm, 0)
+    peak = {"now": 0, "max": 0}
+    lock = threading.Lock()
+
+    def fake_call():
+        with lock:
+            peak["now"] += 1
+            peak["max"] = max(peak["max"], peak["now"])
+        try:
+            time.sleep(latency)
+            if random.random() < fail_rate:
+                raise Transient("stub 503")
+            return "ok"
+        finally:
+            with lock:
+                peak["now"] -= 1
+
+    started = time.perf_counter()
+    with Pool(max_workers=calls) as pool:
+        results = list(pool.map(lambda _: sim.run(Backend, fake_call), range(calls)))
+    wall = time.perf_counter() - started
+    return {"calls": len(results), "wall_sec": round(wall, 2), "peak_inflight": peak["max"],
+            "effective_rpm": round(len(results) / wall * 60, 1)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM 클라이언트 한도 시뮬레이션 (가짜 백엔드)")
+    parser.add_argument("--calls", type=int, default=60)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--rpm", type=int, default=120)
+    parser.add_argument("--inflight", type=int, default=4)
+    parser.add_argument("--fail-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    print(simulate(args.calls, args.latency, args.rpm, args.inflight, args.fail_rate))
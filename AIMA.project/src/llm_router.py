@@ -0,0 +1,337 @@
+import os, json, time, random, argparse, threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import metrics
+from llm_client import client, current_scope, is_rate_limited, retry_after, CancelledError
+
+# ===================== 설정 =====================
+# 기본(클라우드) 모델 — 캐시 키 / 기본 백엔드에 사용
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4o-mini")
+# 우선순위 순 백엔드 목록 ("종류:모델[@base_url]", 콤마 구분)
+#   예) "openai:gpt-4o-mini,ollama:exaone3.5:7.8b"
+#       "openai:gpt-4o-mini@http://127.0.0.1:8801/v1,ollama:exaone3.5:7.8b@http://127.0.0.1:8802"  (스텁 서버 테스트)
+LLM_BACKENDS = os.getenv("LLM_BACKENDS", f"openai:{LLM_MODEL}")
+LLM_TIMEOUT_SEC = float(os.getenv("LLM_TIMEOUT_SEC", "60"))
+# 최근 호출 N개로 지연/실패율 집계
+STATS_WINDOW = int(os.getenv("LLM_STATS_WINDOW", "50"))
+# 1순위 백엔드의 최근 p95가 이 값을 넘으면 더 빠른 백엔드를 먼저 사용
+SLOW_P95_SEC = float(os.getenv("LLM_SLOW_P95_SEC", "30"))
+# hedge: 1순위 응답이 (p95, 최소 HEDGE_MIN_SEC) 안에 안 오면 2순위에도 같은 요청을 보내고 먼저 온 응답 사용
+HEDGE_ENABLED = os.getenv("LLM_HEDGE", "0") == "1"
+HEDGE_MIN_SEC = float(os.getenv("LLM_HEDGE_MIN_SEC", "2"))
+HEDGE_DEFAULT_SEC = float(os.getenv("LLM_HEDGE_AFTER_SEC", "20"))   # 통계가 쌓이기 전 기본값
+# 연속 실패 / rate limit 시 해당 백엔드를 잠시 건너뜀
+BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "3"))
+COOLDOWN_SEC = float(os.getenv("LLM_COOLDOWN_SEC", "30"))
+MIN_SAMPLES = 5
+
+
+# ===================== 백엔드별 통계 =====================
+class BackendStats:
+    def __init__(self, window: int = STATS_WINDOW):
+        self.samples = deque(maxlen=window)     # (지연, 성공 여부)
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.inflight = 0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, ok: bool, rate_limited: bool = False, retry_after: float = None):
+        with self._lock:
+            self.samples.append((seconds, ok))
+            self.consecutive_failures = 0 if ok else self.consecutive_failures + 1
+            if rate_limited:
+                self.cooldown_until = time.time() + (retry_after or COOLDOWN_SEC)
+            elif self.consecutive_failures >= BREAKER_FAILURES:
+                self.cooldown_until = time.time() + COOLDOWN_SEC
+
+    def percentile(self, p: float):
+        with self._lock:
+            latencies = sorted(s for s, ok in self.samples if ok)
+        if len(latencies) < MIN_SAMPLES:
+            return None
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p / 100))]
+
+    def failure_rate(self) -> float:
+        with self._lock:
+            return sum(1 for _, ok in self.samples if not ok) / len(self.samples) if self.samples else 0.0
+
+    def available(self) -> bool:
+        return time.time() >= self.cooldown_until
+
+
+class Backend:
+    def __init__(self, spec: str):
+        spec, _, base_url = spec.strip().partition("@")
+        kind, _, model = spec.partition(":")
+        if kind not in ("openai", "ollama"):
+            raise ValueError(f"지원하지 않는 LLM 백엔드: {kind}")
+        self.kind, self.model, self.base_url = kind, model, base_url or None
+        self.name = f"{kind}:{model}"
+        self.stats = BackendStats()
+        self._chats, self._chats_lock = {}, threading.Lock()
+
+    def chat(self, temperature: float):
+        """temperature별 chat 모델을 하나만 만들어 재사용 (hedge 중복 요청 포함, HTTP 연결 풀·keep-alive 유지)"""
+        with self._chats_lock:
+            chat = self._chats.get(temperature)
+            if chat is None:
+                chat = self._chats[temperature] = create_chat(self, temperature)
+            return chat
+
+    def to_dict(self) -> dict:
+        p50, p95 = self.stats.percentile(50), self.stats.percentile(95)
+        return {
+            "name": self.name,
+            "base_url": self.base_url,
+            "p50_sec": round(p50, 3) if p50 is not None else None,
+            "p95_sec": round(p95, 3) if p95 is not None else None,
+            "failure_rate": round(self.stats.failure_rate(), 3),
+            "samples": len(self.stats.samples),
+            "inflight": self.stats.inflight,
+            "cooldown_sec": max(0.0, round(self.stats.cooldown_until - time.time(), 1)),
+        }
+
+
+def create_chat(backend: Backend, temperature: float):
+    """백엔드 → LangChain chat 모델 (재시도/백오프는 llm_client 가 한도와 함께 관리하므로 SDK 재시도는 끔)"""
+    if backend.kind == "openai":
+        from langchain_openai import ChatOpenAI
+        options = {"base_url": backend.base_url} if backend.base_url else {}
+        return ChatOpenAI(model_name=backend.model, temperature=temperature, timeout=LLM_TIMEOUT_SEC,
+                          max_retries=0, **options)
+    options = {"base_url": backend.base_url} if backend.base_url else {}
+    # 타임아웃을 SDK에도 넘겨야 llm_client 가 기다림을 그만둔 뒤 스레드의 요청도 끝남
+    try:
+        from langchain_ollama import ChatOllama
+        options["client_kwargs"] = {"timeout": LLM_TIMEOUT_SEC}
+    except ImportError:
+        from langchain_community.chat_models import ChatOllama
+        options["timeout"] = int(LLM_TIMEOUT_SEC)
+    return ChatOllama(model=backend.model, temperature=temperature, **options)
+
+
+# ===================== 라우터 =====================
+class LLMRouter:
+    """모든 LLM 호출의 백엔드 선택 (지연/실패 통계 기반 순서 + hedge + 로컬 모델 fallback)"""
+
+    def __init__(self, specs: str = LLM_BACKENDS):
+        self.backends = [Backend(s) for s in specs.split(",") if s.strip()]
+        self._pool = ThreadPoolExecutor(max_workers=16, thread_name_prefix="llm-route")
+
+    @property
+    def primary(self) -> Backend:
+        return self.backends[0]
+
+    def ranked(self) -> list:
+        """쓸 수 있는 백엔드를 우선순위 순으로. 1순위가 느려졌으면 최근 p95가 가장 낮은 백엔드를 앞으로"""
+        healthy = [b for b in self.backends if b.stats.available()]
+        if not healthy:
+            # 전부 쉬는 중이면 가장 먼저 풀리는 백엔드부터
+            return sorted(self.backends, key=lambda b: b.stats.cooldown_until)
+        first_p95 = healthy[0].stats.percentile(95)
+        if first_p95 is not None and first_p95 > SLOW_P95_SEC:
+            faster = min(healthy[1:], key=lambda b: b.stats.percentile(95) or float("inf"), default=None)
+            if faster is not None and (faster.stats.percentile(95) or float("inf")) < first_p95:
+                healthy.remove(faster)
+                healthy.insert(0, faster)
+        return healthy
+
+    def hedge_delay(self, backend: Backend) -> float:
+        p95 = backend.stats.percentile(95)
+        return max(HEDGE_MIN_SEC, p95 if p95 is not None else HEDGE_DEFAULT_SEC)
+
+    def _call(self, backend: Backend, call, temperature: float, tokens: int, scope, can_fallback: bool):
+        """llm_client 한도(동시성/RPM/TPM) 안에서 실행. 통계에는 대기 시간을 뺀 실제 응답 시간만 기록"""
+        timing, started = {}, time.perf_counter()
+
+        def attempt():
+            t0 = time.perf_counter()
+            try:
+                return call(backend.chat(temperature))
+            finally:
+                timing["elapsed"] = time.perf_counter() - t0
+
+        with backend.stats._lock:
+            backend.stats.inflight += 1
+        try:
+            # 다른 백엔드로 넘길 수 있으면 rate limit 은 기다리지 않고 바로 fallback
+            out = client.run(backend, attempt, tokens, scope=scope, retry_rate_limit=not can_fallback)
+        except CancelledError:
+            raise
+        except Exception as e:
+            # 타임아웃이면 응답이 아직 안 끝났으므로 기다린 전체 시간으로 기록
+            elapsed = timing.get("elapsed", time.perf_counter() - started)
+            limited = is_rate_limited(e)
+            backend.stats.record(elapsed, False, limited, retry_after(e) if limited else None)
+            metrics.LLM_BACKEND_SECONDS.observe(elapsed, backend=backend.name)
+            metrics.LLM_ROUTED.inc(backend=backend.name, outcome="rate_limited" if limited else "error")
+            raise
+        finally:
+            with backend.stats._lock:
+                backend.stats.inflight -= 1
+        elapsed = timing["elapsed"]
+        backend.stats.record(elapsed, True)
+        metrics.LLM_BACKEND_SECONDS.observe(elapsed, backend=backend.name)
+        metrics.LLM_ROUTED.inc(backend=backend.name, outcome="ok")
+        return out
+
+    def invoke(self, call, temperature: float = 0.2, hedge: bool = None, tokens: int = 0):
+        """call(chat_model) 을 골라진 백엔드에서 실행 → (결과, 백엔드).
+        실패하면 다음 백엔드로, hedge가 켜져 있으면 1순위가 늦을 때 2순위에도 동시에 요청.
+        tokens: 프롬프트 토큰 추정치 (TPM 버킷 차감용)"""
+        hedge = HEDGE_ENABLED if hedge is None else hedge
+        queue = self.ranked()
+        # 라우터 풀 스레드로 넘어가기 전에 호출한 쪽의 취소 범위(작업 id)를 잡아 둠
+        scope = current_scope()
+        pending, errors, hedged = {}, [], False
+
+        def launch():
+            backend = queue.pop(0)
+            pending[self._pool.submit(self._call, backend, call, temperature, tokens, scope, bool(queue))] = backend
+
+        launch()
+        while pending:
+            timeout = None
+            if hedge and not hedged and queue and len(pending) == 1:
+                timeout = self.hedge_delay(next(iter(pending.values())))
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                hedged = True
+                metrics.LLM_HEDGES.inc(backend=queue[0].name)
+                launch()
+                continue
+            for fut in done:
+                backend = pending.pop(fut)
+                try:
+                    # 늦게 끝나는 쪽은 그대로 두고(통계만 기록됨) 먼저 성공한 응답 사용
+                    return fut.result(), backend
+                except CancelledError:
+                    # 작업 취소 → 다른 백엔드로 넘기지 않음
+                    raise
+                except Exception as e:
+                    errors.append(f"{backend.name}: {e}")
+            if not pending and queue:
+                metrics.LLM_FALLBACKS.inc(backend=queue[0].name)
+                launch()
+        raise RuntimeError("❌ 모든 LLM 백엔드 호출 실패 — " + " / ".join(errors))
+
+    def status(self) -> dict:
+        return {"hedge": HEDGE_ENABLED, "order": [b.name for b in self.ranked()],
+                "backends": [b.to_dict() for b in self.backends], "limits": client.status()}
+
+
+# ===================== chat 모델 호환 래퍼 =====================
+class RoutedChat:
+    """ChatOpenAI 자리에 그대로 쓰는 래퍼 (invoke / with_structured_output → 라우터 경유)"""
+
+    def __init__(self, temperature: float = 0.2, router_: "LLMRouter" = None):
+        self.router = router_ or router
+        self.temperature = temperature
+        # 캐시 키 / 지표 라벨용 = 1순위 백엔드 모델 (실제 응답한 백엔드는 last_backend)
+        self.model_name = self.router.primary.model
+        self.last_backend = None
+
+    @staticmethod
+    def _tokens(prompt) -> int:
+        from long_summary import estimate_tokens
+        return estimate_tokens(prompt if isinstance(prompt, str) else str(prompt))
+
+    def invoke(self, prompt):
+        out, self.last_backend = self.router.invoke(lambda llm: llm.invoke(prompt), self.temperature,
+                                                    tokens=self._tokens(prompt))
+        return out
+
+    def with_structured_output(self, schema, include_raw: bool = False):
+        chat = self
+
+        class _Structured:
+            def invoke(self, prompt):
+                out, chat.last_backend = chat.router.invoke(
+                    lambda llm: llm.with_structured_output(schema, include_raw=include_raw).invoke(prompt),
+                    chat.temperature, tokens=chat._tokens(prompt))
+                return out
+        return _Structured()
+
+
+router = LLMRouter()
+
+
+# ===================== 로컬 스텁 서버 (테스트용) =====================
+def stub_server(port: int = 0, latency: float = 0.5, jitter: float = 0.2, fail_rate: float = 0.0,
+                status: int = 500, retry_after_sec: float = 5):
+    """OpenAI(/v1/chat/completions) · Ollama(/api/chat) 형식으로 결정적 요약 JSON을 돌려주는 HTTP 서버
+    (지연/실패율/실패 코드를 조절해 라우터의 fallback·hedge 동작 확인). port=0 이면 빈 포트 사용"""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    from fake_llm import fake_payload
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def _send(self, code: int, body: dict):
+            data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            if code == 429:
+                self.send_header("Retry-After", f"{retry_after_sec:g}")
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            req = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+            if random.random() < fail_rate:
+                return self._send(status, {"error": {"message": "stub failure", "code": status}})
+            prompt = "\n".join(str(m.get("content", "")) for m in req.get("messages", []))
+            content = json.dumps(fake_payload(prompt), ensure_ascii=False)
+            tools = req.get("tools") or []
+            tool_calls = [{"id": "call_stub", "type": "function",
+                           "function": {"name": tools[0]["function"]["name"], "arguments": content}}] if tools else None
+            usage = {"prompt_tokens": len(prompt) // 2, "completion_tokens": len(content) // 2}
+            if self.path.startswith("/api/chat"):
+                message = {"role": "assistant", "content": "" if tool_calls else content}
+                if tool_calls:
+                    message["tool_calls"] = [{"function": {"name": t["function"]["name"],
+                                                           "arguments": json.loads(content)}} for t in tool_calls]
+                return self._send(200, {"model": req.get("model"), "message": message, "done": True,
+                                        "prompt_eval_count": usage["prompt_tokens"],
+                                        "eval_count": usage["completion_tokens"]})
+            message = {"role": "assistant", "content": None if tool_calls else content}
+            if tool_calls:
+                message["tool_calls"] = tool_calls
+            self._send(200, {
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                "model": req.get("model"),
+                "choices": [{"index": 0, "message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+                "usage": {**usage, "total_tokens": sum(usage.values())},
+            })
+
+    return ThreadingHTTPServer(("127.0.0.1", port), Handler)
+
+
+def serve_stub(port: int, latency: float = 0.5, jitter: float = 0.2, fail_rate: float = 0.0, status: int = 500):
+    server = stub_server(port, latency, jitter, fail_rate, status)
+    print(f"🧪 LLM 스텁 서버 http://127.0.0.1:{port} (지연 {latency}s, 실패율 {fail_rate}, 코드 {status})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="LLM 라우터 상태 확인 / 스텁 서버")
+    parser.add_argument("--stub", type=int, default=None, metavar="PORT", help="스텁 서버 실행")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--status", type=int, default=500, help="실패 시 HTTP 코드 (429면 rate limit)")
+    parser.add_argument("--probe", type=int, default=0, help="라우터로 N번 호출 후 백엔드별 통계 출력")
+    args = parser.parse_args()
+
+    if args.stub:
+        serve_stub(args.stub, args.latency, fail_rate=args.fail_rate, status=args.status)
+    for i in range(args.probe):
+        try:
+            _, used = router.invoke(lambda llm: llm.invoke(f"철우: 2025년 10월 2{i % 9}일 회의입니다. 소라는 금요일까지 정리해주세요."))
+            print(f"  {i + 1:>3}: {used.name}")
+        except Exception as e:
+            print(f"  {i + 1:>3}: ❌ {e}")
+    print(json.dumps(router.status(), ensure_ascii=False, indent=2))
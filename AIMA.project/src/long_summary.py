@@ -0,0 +1,117 @@
+import os, re, json
+from datetime import datetime
+from difflib import SequenceMatcher
+from concurrent.futures import ThreadPoolExecutor
+
+from schemas import MeetingExtraction, SummaryOverview
+from llm_calls import structured_llm_call
+from llm_client import client as llm_client, current_scope
+from result_cache import prompt_version
+from prompts.meeting_summary_prompt import meeting_map_prompt, meeting_reduce_prompt
+
+# ===================== 설정 =====================
+# 프롬프트 토큰 추정치가 이 값을 넘으면 map-reduce 요약으로 전환
+DIRECT_TOKEN_LIMIT = int(os.getenv("SUMMARY_DIRECT_TOKEN_LIMIT", "12000"))
+# map 단계 구간당 토큰 예산 / 동시 호출 수
+WINDOW_TOKENS = int(os.getenv("SUMMARY_WINDOW_TOKENS", "3000"))
+MAP_CONCURRENCY = int(os.getenv("SUMMARY_MAP_CONCURRENCY", "4"))
+# 액션아이템 중복 판정 기준 (같은 담당자 + 작업 문장 유사도)
+DEDUP_SIMILARITY = 0.75
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("o200k_base")
+except Exception:
+    _encoding = None
+
+
+# ===================== 토큰 추정 =====================
+def estimate_tokens(text: str) -> int:
+    """tiktoken이 있으면 정확히 세고, 없으면 한국어 기준 대략 1.5자당 1토큰으로 추정"""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, int(len(text) / 1.5))
+
+
+# ===================== 구간 분할 =====================
+SPEAKER_TURN = re.compile(r"(?=^\S{1,10}: )", re.M)
+SENTENCE_END = re.compile(r"(?<=[.?!])\s+")
+
+
+def split_units(text: str) -> list:
+    """화자 표기(이름: ...)가 있으면 발화 단위로, 없으면(Whisper 원문) 문장 단위로 분할"""
+    turns = [t.strip() for t in SPEAKER_TURN.split(text) if t.strip()]
+    if len(turns) > 1:
+        return turns
+    return [u.strip() for u in SENTENCE_END.split(text) if u.strip()]
+
+
+def split_windows(text: str, budget: int = WINDOW_TOKENS) -> list:
+    """발화/문장을 토큰 예산 안에서 순서대로 묶어 구간 생성 (발화 중간에서 자르지 않음)"""
+    windows, current, used = [], [], 0
+    for unit in split_units(text):
+        cost = estimate_tokens(unit)
+        if current and used + cost > budget:
+            windows.append("\n".join(current))
+            current, used = [], 0
+        current.append(unit)
+        used += cost
+    if current:
+        windows.append("\n".join(current))
+    return windows
+
+
+# ===================== 액션아이템 병합 =====================
+def _norm(text: str) -> str:
+    return re.sub(r"\s+", "", text or "")
+
+
+def dedupe_action_items(items: list) -> list:
+    """구간 경계/마무리 발언에서 반복된 액션아이템을 하나로 (기한 정보가 있는 쪽을 유지)"""
+    merged = []
+    for item in items:
+        for kept in merged:
+            same_person = _norm(kept["name"]) == _norm(item["name"])
+            similar = SequenceMatcher(None, _norm(kept["task"]), _norm(item["task"])).ratio() >= DEDUP_SIMILARITY
+            if same_person and similar:
+                if kept.get("due") in (None, "", "미정") and item.get("due") not in (None, "", "미정"):
+                    kept["due"] = item["due"]
+                break
+        else:
+            merged.append(dict(item))
+    return merged
+
+
+# ===================== map-reduce 요약 =====================
+def map_reduce_extract(full_text: str) -> dict:
+    """긴 회의록: 구간별 병렬 요약(map) → 통합 요약(reduce) → MeetingExtraction 형태 dict"""
+    windows = split_windows(full_text)
+    current_year = datetime.now().year
+    map_version = prompt_version(meeting_map_prompt)
+    print(f"🧩 긴 회의록 map-reduce 요약: {len(windows)}개 구간")
+    # 풀 스레드에는 호출한 쪽의 취소 범위(작업 id)가 넘어가지 않으므로 직접 이어줌
+    scope = current_scope()
+
+    def summarize_window(args):
+        index, window = args
+        prompt_text = meeting_map_prompt.format(index=index + 1, total=len(windows),
+                                                current_year=current_year, text=window)
+        with llm_client.scope(scope):
+            return structured_llm_call(prompt_text, MeetingExtraction, map_version)
+
+    with ThreadPoolExecutor(max_workers=MAP_CONCURRENCY) as pool:
+        partials = list(pool.map(summarize_window, enumerate(windows)))
+
+    overview_input = [
+        {"topic_summary": p["topic_summary"], "content_summary": p["content_summary"], "decisions": p["decisions"]}
+        for p in partials
+    ]
+    reduce_text = meeting_reduce_prompt.format(partials=json.dumps(overview_input, ensure_ascii=False, indent=1))
+    overview = structured_llm_call(reduce_text, SummaryOverview, prompt_version(meeting_reduce_prompt))
+
+    return {
+        **overview,
+        # 회의 날짜는 보통 도입부에서 언급되므로 앞 구간부터 처음 나온 값 사용
+        "meeting_date": next((p["meeting_date"] for p in partials if p.get("meeting_date")), None),
+        "action_items": dedupe_action_items([a for p in partials for a in p["action_items"]]),
+    }
@@ -1,10 +1,19 @@
-from fastapi import FastAPI, Request
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, FileResponse, Response, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-import os
-from meeting_api import run_meeting_pipeline
-import pymysql, json
+import os, sys, json, asyncio
+from datetime import date
+import stt_registry, db_store, docx_render, metrics, readiness
+from llm_router import router as llm_router
+from outbox import outbox
+from meeting_catalog import catalog, etag_for, meeting_name
+from meeting_search import search_index
+import action_items, live_meeting
+from result_cache import cache_stats
+from stt_backend import BACKENDS
+from job_queue import job_manager, QueueFullError
+from progress import sse_stream
 import uvicorn
 
 
@@ -13,53 +22,300 @@ app = FastAPI()
 app.mount("/static", StaticFiles(directory="static"), name="static")
 templates = Jinja2Templates(directory="templates")
 
+# ✅ 목록/조회에 필요한 저장소만 바로 준비하고, LLM 스택·dateparser·Whisper 모델은 백그라운드에서 로드
+# (import main 에서는 torch/langchain 등을 불러오지 않음 → `python readiness.py` 로 import 시간 검사)
+@app.on_event("startup")
+def preload_models():
+    with readiness.track("db"):
+        db_store.bootstrap()
+        outbox.start()
+    with readiness.track("catalog"):
+        catalog.sync_from_disk()
+        search_index.sync_from_catalog(catalog)
+    readiness.start_warmup(preload_stt=os.getenv("WHISPER_PRELOAD", "1") == "1")
+
+# ✅ 하위 시스템 준비 상태 (필수 항목이 다 올라오기 전에는 503 → 로드밸런서/배포 스크립트가 대기)
+@app.get("/ready")
+def get_ready():
+    state = readiness.status()
+    return JSONResponse(state, status_code=200 if state["ready"] else 503)
+
+@app.get("/api/models")
+def get_models():
+    return {"models": stt_registry.resident_models()}
+
+# LLM 백엔드별 최근 지연(p50/p95)·실패율·쉬는 중 여부와 현재 라우팅 순서
+@app.get("/api/llm/backends")
+def get_llm_backends():
+    return llm_router.status()
+
+@app.get("/api/cache/stats")
+def get_cache_stats():
+    return {"caches": cache_stats()}
+
 @app.get("/", response_class=HTMLResponse)
 def index(request: Request):
     return templates.TemplateResponse("index.html", {"request": request})
 
+# ✅ wav.file 목록은 폴더가 바뀔 때만 다시 읽고, 분석 완료 여부는 카탈로그에서 확인
 @app.get("/api/wav_list")
 def get_wav_list():
-    files = [f for f in os.listdir("wav.file") if f.endswith(".wav")]
-    return {"files": files}
+    files = catalog.wav_files()
+    analyzed = catalog.names()
+    return {"files": files, "analyzed": [f for f in files if meeting_name(f) in analyzed]}
+
+def _conditional(request: Request, etag: str, build):
+    # 클라이언트 캐시가 최신이면 조회 없이 본문 없는 304
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(build(), headers=headers)
+
+# ✅ 분석된 회의 목록 (인덱스 조회 + 페이지 단위, 카탈로그 버전 기반 ETag)
+@app.get("/api/meetings")
+def list_meetings(request: Request, page: int = 1, size: int = 20,
+                  date_from: str = None, date_to: str = None, participant: str = None,
+                  due_from: str = None, due_to: str = None):
+    filters = dict(date_from=date_from, date_to=date_to, participant=participant, due_from=due_from, due_to=due_to)
+    etag = etag_for(catalog.version, page, size, filters)
+    return _conditional(request, etag, lambda: catalog.list(page, size, **filters))
+
+# ✅ 전사문/요약/결정사항/액션아이템 전문 검색 (bigram 역색인 + BM25)
+@app.get("/api/search")
+def search_meetings(q: str = "", limit: int = 20, offset: int = 0):
+    result = search_index.search(q, max(1, min(limit, 100)), max(0, offset))
+    for r in result["results"]:
+        meeting = catalog.get(r["name"])
+        r["meeting_date"] = meeting["meeting_date"] if meeting else None
+    return result
+
+@app.get("/api/meetings/{name}")
+def get_meeting(request: Request, name: str):
+    meeting = catalog.get(meeting_name(name))
+    if meeting is None:
+        return JSONResponse({"error": "요약본을 찾을 수 없습니다."}, status_code=404)
+    return _conditional(request, etag_for(meeting["name"], meeting["version"]), lambda: meeting)
+
+def _resolve_audio(filename):
+    audio_path = os.path.join("wav.file", filename or "")
+    if not filename or not os.path.exists(audio_path):
+        return None
+    return audio_path
+
+# ✅ 분석 작업 큐 (이벤트 루프를 막지 않도록 STT/LLM 워커 풀에서 실행)
+@app.post("/api/jobs")
+async def submit_job(request: Request):
+    data = await request.json()
+    filename = data.get("filename")
+    audio_path = _resolve_audio(filename)
+    if audio_path is None:
+        return JSONResponse({"error": "파일을 찾을 수 없습니다."}, status_code=404)
+    # STT 백엔드/모델은 요청별로 선택 가능 (없으면 배포 설정값)
+    backend, model_size = data.get("backend"), data.get("model")
+    if backend and backend not in BACKENDS:
+        return JSONResponse({"error": f"지원하지 않는 STT 백엔드: {backend}"}, status_code=400)
+    try:
+        job, created = job_manager.submit(filename, audio_path, backend, model_size)
+    except QueueFullError as e:
+        return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "10"})
+    return JSONResponse({**job.to_dict(), "deduplicated": not created}, status_code=202)
+
+@app.get("/api/jobs/{job_id}")
+def get_job(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    return job.to_dict()
+
+# ✅ 단계별 실제 진행 상황 스트리밍 (Server-Sent Events)
+@app.get("/api/jobs/{job_id}/events")
+def stream_job_events(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    return StreamingResponse(
+        sse_stream(job.progress),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.get("/api/jobs/{job_id}/result")
+def get_job_result(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        return JSONResponse({"error": "작업을 찾을 수 없습니다."}, status_code=404)
+    if job.status == "done":
+        return JSONResponse(job.result)
+    if job.status in ("failed", "cancelled"):
+        return JSONResponse(job.to_dict(), status_code=409)
+    return JSONResponse(job.to_dict(), status_code=202)
+
+@app.delete("/api/jobs/{job_id}")
+def cancel_job(job_id: str):
+    if not job_manager.cancel(job_id):
+        return JSONResponse({"error": "취소할 수 없는 작업입니다."}, status_code=409)
+    return job_manager.get(job_id).to_dict()
+
+@app.get("/api/jobs")
+def get_job_stats():
+    return job_manager.stats()
+
+# ✅ 실시간 회의: 바이너리 프레임(16kHz mono PCM16)을 받는 동안 증분 전사 + 누적 요약을 푸시,
+#    {"type": "stop"} 또는 연결 종료 시 남은 구간만 처리하고 일반 저장 경로로 마무리
+@app.websocket("/ws/live")
+async def live_meeting_ws(websocket: WebSocket, name: str = None, backend: str = None, model: str = None):
+    await websocket.accept()
+    if backend and backend not in BACKENDS:
+        await websocket.send_json({"type": "error", "error": f"지원하지 않는 STT 백엔드: {backend}"})
+        return await websocket.close()
+    loop = asyncio.get_running_loop()
+    events = asyncio.Queue()
+    try:
+        session = live_meeting.start_session(
+            name, on_event=lambda e: loop.call_soon_threadsafe(events.put_nowait, e), backend=backend, model_size=model)
+    except ValueError as e:
+        await websocket.send_json({"type": "error", "error": str(e)})
+        return await websocket.close()
+
+    async def push_events():
+        # 클라이언트가 먼저 끊어도 세션 마무리(저장)는 계속 진행
+        try:
+            while True:
+                event = await events.get()
+                await websocket.send_json(event)
+                if event["type"] == "final":
+                    break
+        except Exception:
+            pass
+
+    sender = asyncio.create_task(push_events())
+    await websocket.send_json({"type": "started", "name": session.name})
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("bytes"):
+                session.feed(message["bytes"])
+            elif message.get("text"):
+                # 제어 프레임은 {"type": "stop"} 만 의미 있음 → JSON이 아니거나 모르는 형식이면 무시
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    continue
+                if isinstance(control, dict) and control.get("type") == "stop":
+                    break
+    finally:
+        try:
+            await asyncio.to_thread(session.finalize)
+        except Exception as e:
+            print(f"❌ 실시간 회의 마무리 실패 ({session.name}): {e}")
+            sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+    try:
+        await websocket.close()
+    except Exception:
+        pass
 
+@app.get("/api/live")
+def get_live_sessions():
+    return {"sessions": live_meeting.sessions()}
+
+# 기존 동기식 API 호환: 작업 큐에 넣고 완료될 때까지 (루프를 막지 않고) 대기
 @app.post("/analyze_meeting")
 async def analyze_meeting(request: Request):
     data = await request.json()
     filename = data.get("filename")
-    audio_path = os.path.join("wav.file", filename)
-    if not os.path.exists(audio_path):
+    audio_path = _resolve_audio(filename)
+    if audio_path is None:
         return JSONResponse({"error": "파일을 찾을 수 없습니다."}, status_code=404)
 
-    result = run_meeting_pipeline(audio_path)
+    try:
+        job, _ = job_manager.submit(filename, audio_path)
+    except QueueFullError as e:
+        return JSONResponse({"error": str(e)}, status_code=429, headers={"Retry-After": "10"})
+    try:
+        result = await asyncio.wrap_future(job.completion)
+    except asyncio.CancelledError:
+        return JSONResponse({"error": "작업이 취소되었습니다."}, status_code=409)
+    except Exception as e:
+        return JSONResponse({"error": str(e)}, status_code=500)
     return JSONResponse(result)
 
-# ✅ 담당자/기한 수정 반영용 엔드포인트
+# ✅ 담당자/기한 수정 (기존 방식: 배열 전체 전송 → 바뀐 항목만 반영)
 @app.post("/api/update_action_item")
-async def update_action_item(request: Request):
-    item = await request.json()
+def update_action_item(item: dict):
     try:
-        conn = pymysql.connect(
-            host="112.175.29.231",
-            user="cheolwoo",
-            password="1234",
-            database="meeting_summary2",
-            port=33067,
-            charset="utf8mb4"
-        )
-        cur = conn.cursor()
-        cur.execute("""
-        UPDATE meeting_summary
-        SET action_items = %s
-        WHERE meeting_file = %s
-        """, (
-            json.dumps(item.get("updated_items"), ensure_ascii=False),
-            item.get("meeting_file")
-        ))
-        conn.commit()
-        return {"status": "ok"}
+        name = meeting_name(item.get("meeting_file") or "")
+        version = action_items.replace_items(name, item.get("updated_items") or [])
+        if version is None:
+            return JSONResponse({"error": "요약본을 찾을 수 없습니다."}, status_code=404)
+        return {"status": "ok", "version": version}
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        conn.close()
+
+# ✅ 액션아이템 단건 수정 (바뀐 필드 + 클라이언트가 본 version만 전송, 버전이 다르면 409)
+@app.patch("/api/action_items/{item_id}")
+def patch_action_item(item_id: str, patch: dict):
+    if "version" not in patch:
+        return JSONResponse({"error": "version이 필요합니다."}, status_code=400)
+    try:
+        item = action_items.patch_item(item_id, patch, int(patch["version"]))
+    except action_items.ActionItemNotFound:
+        return JSONResponse({"error": "액션아이템을 찾을 수 없습니다."}, status_code=404)
+    except action_items.VersionConflict as e:
+        return JSONResponse({"error": str(e), "current": e.current}, status_code=409)
+    return {"status": "ok", "item": item}
+
+# ✅ 전체 회의의 액션아이템 조회 (기한/담당자/회의 인덱스)
+@app.get("/api/action_items")
+def get_action_items(due_from: str = None, due_to: str = None, assignee: str = None, meeting: str = None):
+    return {"items": catalog.action_items(due_from, due_to, assignee, meeting)}
+
+@app.get("/api/action_items/overdue")
+def get_overdue_action_items(assignee: str = None, today: str = None):
+    today = today or date.today().isoformat()
+    return {"today": today, "items": catalog.overdue_action_items(today, assignee)}
+
+# 캘린더 갱신용: version 토큰 이후 바뀐 항목만
+@app.get("/api/action_items/changes")
+def get_action_item_changes(since: int = 0):
+    return catalog.action_changes(since)
+
+# ✅ DOCX 회의록 다운로드 (요약 해시 기준 캐시, 없으면 그 자리에서 렌더링)
+@app.get("/api/docx/{name}")
+def download_docx(name: str):
+    base_filename = meeting_name(name)
+    loaded = docx_render.load_summary(base_filename)
+    if loaded is None:
+        return JSONResponse({"error": "요약본을 찾을 수 없습니다."}, status_code=404)
+    meeting_date, summary = loaded
+    path = docx_render.render_docx(base_filename, meeting_date, summary, publish=False)
+    return FileResponse(
+        path,
+        media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        filename=os.path.basename(docx_render.doc_path(base_filename, meeting_date)),
+    )
+
+# ✅ Prometheus 스크레이프용 지표 (단계별 지연, RTF, 토큰, 재시도, 캐시 적중률)
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/db/status")
+def get_db_status():
+    return {**db_store.status(), "outbox": outbox.status()}
+
+@app.on_event("shutdown")
+def shutdown_workers():
+    job_manager.shutdown()
+    action_items.flush()
+    # 청크 STT 프로세스 풀은 실제로 쓴 적이 있을 때만 정리
+    if "chunked_stt" in sys.modules:
+        sys.modules["chunked_stt"].shutdown()
+    outbox.stop()
+    db_store.shutdown()
+    docx_render.shutdown()
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=5883, reload=True)
@@ -1,100 +1,41 @@
-import os, re, json, pymysql, torch, whisper, dateparser
+import os, json, time
+import stt_registry, chunked_stt, docx_render, metrics
+from outbox import outbox
+from meeting_catalog import catalog
+from meeting_search import search_index
+from stt_backend import STT_BACKEND, FW_COMPUTE_TYPE, FW_BEAM_SIZE, FW_BATCH_SIZE
+from progress import ProgressTracker
+from due_dates import normalize_items
+from result_cache import transcript_cache, audio_hash, prompt_version, make_key
+from schemas import MeetingSummary, MeetingExtraction
+from llm_router import RoutedChat
+from llm_calls import cached_llm_json, structured_llm_call
+from long_summary import estimate_tokens, map_reduce_extract, DIRECT_TOKEN_LIMIT
+from transcript_compact import prepare as compact_transcript
 from datetime import datetime, timedelta
-from typing import List, Optional
-from pydantic import BaseModel
-from langchain_openai import ChatOpenAI
+from typing import Optional
 from langchain.prompts import PromptTemplate
-from prompts.meeting_summary_prompt import meeting_summary_prompt
+from prompts.meeting_summary_prompt import meeting_summary_prompt, meeting_extract_prompt
 
 # ===================== 설정 =====================
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
-DB_HOST, DB_USER, DB_PASSWORD, DB_NAME, DB_PORT = (
-    "112.175.29.231", "cheolwoo", "1234", "meeting_summary2", 33067
-)
-
-# ===================== Pydantic 구조 =====================
-class ActionItem(BaseModel):
-    name: str
-    task: str
-    due: Optional[str]
-
-class MeetingSummary(BaseModel):
-    topic_summary: str
-    content_summary: str
-    decisions: List[str]
-    action_items: List[ActionItem]
-
-
-# ===================== 날짜 정규화 함수 (강화 + 연도 보정) =====================
-def normalize_due(due_text: Optional[str], base_dt: datetime) -> Optional[str]:
-    """LLM이 반환한 due 문자열을 문맥기반 실제 날짜로 변환"""
-    if not due_text:
-        return None
-    s = str(due_text).strip()
-    if s in {"미정", "불명", "null", "없음", ""}:
-        return None
-    if s in {"오늘", "오늘 중"}:
-        return base_dt.strftime("%Y-%m-%d")
-    if s.startswith("내일"):
-        return (base_dt + timedelta(days=1)).strftime("%Y-%m-%d")
-    if s.startswith("모레"):
-        return (base_dt + timedelta(days=2)).strftime("%Y-%m-%d")
-
-    # 직접 YYYY-MM-DD 형식인 경우
-    if re.match(r"\d{4}-\d{2}-\d{2}", s):
-        # 🔹 과거 연도면 자동으로 올해로 교체
-        y, m, d = map(int, s.split("-"))
-        if y < base_dt.year:
-            s = f"{base_dt.year}-{m:02d}-{d:02d}"
-        return s
-
-    # 이번주 / 다음주 패턴
-    week_map = {
-        "이번주 월요일": 0, "이번주 화요일": 1, "이번주 수요일": 2,
-        "이번주 목요일": 3, "이번주 금요일": 4,
-        "다음주 월요일": 7, "다음주 화요일": 8, "다음주 수요일": 9,
-        "다음주 목요일": 10, "다음주 금요일": 11,
-    }
-    for k, d in week_map.items():
-        if k in s:
-            return (base_dt + timedelta(days=d)).strftime("%Y-%m-%d")
-
-    # 일반 자연어 날짜 파싱 (연도 보정)
-    parsed = dateparser.parse(
-        s,
-        languages=["ko"],
-        settings={
-            "RELATIVE_BASE": base_dt,
-            "PREFER_DATES_FROM": "future"  # ✅ 미래 날짜 우선
-        },
-    )
-    if parsed:
-        # 🔹 연도 보정: 과거 연도면 올해로 덮어쓰기
-        if parsed.year < base_dt.year:
-            parsed = parsed.replace(year=base_dt.year)
-        return parsed.strftime("%Y-%m-%d")
-
-    return None
-
-
-# ===================== 안전한 JSON 파싱 =====================
-def safe_llm_json(llm, prompt_text, retries=2):
-    for i in range(retries + 1):
-        resp = llm.invoke(prompt_text)
-        text = resp.content.strip()
-        json_part = re.search(r'\{[\s\S]*\}', text)
-        if not json_part:
-            continue
-        try:
-            return json.loads(json_part.group(0))
-        except json.JSONDecodeError:
-            prompt_text += "\n\nJSON 형식만 정확히 출력해주세요."
-    raise ValueError("❌ LLM이 올바른 JSON을 반환하지 못했습니다.")
+# 추출 모드: "single" = 회의일자까지 한 번의 structured output 호출로 추출
+#            "two_call" = 기존 방식 (회의일자 추정 + 요약 두 번 호출, A/B 비교용)
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "single")
+
+# ===================== 단일 호출 구조화 추출 =====================
+def extract_meeting(full_text: str) -> dict:
+    """회의일자 + 요약 + 결정사항 + 액션아이템을 한 번에 추출
+    (길이가 모델 컨텍스트 예산을 넘으면 map-reduce 요약으로 자동 전환)"""
+    prompt_text = meeting_extract_prompt.format(text=full_text, current_year=datetime.now().year)
+    if estimate_tokens(prompt_text) > DIRECT_TOKEN_LIMIT:
+        return map_reduce_extract(full_text)
+    return structured_llm_call(prompt_text, MeetingExtraction, prompt_version(meeting_extract_prompt))
+
 
 # ===================== 회의 일자 추정 프롬프트 =====================
 meeting_date_prompt = PromptTemplate.from_template("""
@@ -109,205 +50,197 @@ meeting_date_prompt = PromptTemplate.from_template("""
 """)
 
 # ===================== 핵심 파이프라인 =====================
-def run_meeting_pipeline(audio_path: str) -> dict:
+def run_meeting_pipeline(audio_path: str, progress: Optional[ProgressTracker] = None,
+                         backend: Optional[str] = None, model_size: Optional[str] = None) -> dict:
     if not os.path.exists(audio_path):
         raise FileNotFoundError(f"❌ 파일 없음: {audio_path}")
 
-    # === 1️⃣ Whisper STT 변환 ===
-    model = whisper.load_model("small")
-    print(f"🎙️ Whisper 변환 중... {audio_path}")
-    result = model.transcribe(audio_path, language="ko")
-    full_text = result["text"].strip()
+    progress = progress or ProgressTracker()
+    full_text = transcribe_audio(audio_path, progress, backend, model_size)
+    return analyze_transcript(audio_path, full_text, progress)
+
+
+# === 1️⃣ STT 변환 (CPU 바운드 단계) ===
+def transcribe_audio(audio_path: str, progress: Optional[ProgressTracker] = None,
+                     backend: Optional[str] = None, model_size: Optional[str] = None) -> str:
+    """레지스트리의 상주 모델을 재사용해 음성을 텍스트로 변환 (backend/model_size는 요청별 선택)"""
+    progress = progress or ProgressTracker()
+    backend = backend or STT_BACKEND
+    model_size = model_size or stt_registry.DEFAULT_MODEL_SIZE
+    with progress.stage("stt") as st:
+        # 같은 음성(내용 해시) + 같은 백엔드/모델/옵션이면 캐시된 전사 결과 재사용
+        options = {"language": "ko"}
+        chunked = chunked_stt.CHUNK_WORKERS > 1
+        engine = stt_engine_key(backend, chunked)
+        key = make_key("stt", audio_hash(audio_path), engine, model_size, options)
+        cached = transcript_cache.get(key)
+        if cached is not None:
+            st.update(cache="hit", backend=backend, audio_seconds=cached.get("audio_seconds", 0))
+            return cached["text"]
+
+        print(f"🎙️ STT 변환 중... ({backend}:{model_size}) {audio_path}")
+        t0 = time.perf_counter()
+        # 긴 회의는 무음 기준으로 잘라 프로세스 풀에서 병렬 변환
+        chunks = chunked_stt.plan_chunks(audio_path) if chunked else []
+        if len(chunks) > 1:
+            result = chunked_stt.transcribe_chunked(
+                audio_path, backend, model_size, chunks,
+                on_progress=lambda done, total: st.update(fraction=done / total, chunks_done=done, chunks=total),
+                **options,
+            )
+        else:
+            result = stt_registry.transcribe(audio_path, size=model_size, backend=backend, **options)
+        elapsed = time.perf_counter() - t0
+        segments = result["segments"]
+        audio_seconds = round(segments[-1]["end"], 1) if segments else 0
+        # 실시간 배율(RTF) = 전사 시간 / 음성 길이
+        metrics.observe_stt(backend, audio_seconds, elapsed)
+        st.update(cache="miss", backend=backend, segments=len(segments), audio_seconds=audio_seconds,
+                  rtf=round(elapsed / audio_seconds, 3) if audio_seconds else None)
+        transcript_cache.put(key, {
+            "text": result["text"],
+            "segments": segments,
+            "audio_seconds": audio_seconds,
+        }, audio_path=audio_path, backend=backend, model=model_size)
+    return result["text"]
+
+
+def stt_engine_key(backend: str, chunked: bool) -> dict:
+    """전사 캐시 키에 들어갈 엔진 설정 (양자화/빔 크기 등이 바뀌면 다른 결과로 취급)"""
+    engine = {"backend": backend, "chunked": chunked}
+    if backend == "faster-whisper":
+        engine.update(compute_type=FW_COMPUTE_TYPE, beam_size=FW_BEAM_SIZE, batch_size=FW_BATCH_SIZE)
+    return engine
+
+
+# === 2️⃣ ~ 🔟 LLM 분석 + 저장 (I/O 바운드 단계) ===
+def analyze_transcript(audio_path: str, full_text: str, progress: Optional[ProgressTracker] = None,
+                       mode: Optional[str] = None) -> dict:
+    progress = progress or ProgressTracker()
+    mode = mode or EXTRACTION_MODE
+
+    # === 1️⃣+ 프롬프트용 전사문 압축 (인사/군말·STT 잡음·반복 문장 제거, 검색 색인에는 원문 사용) ===
+    with progress.stage("compact") as st:
+        prompt_source, stats = compact_transcript(full_text)
+        st.update(enabled=stats["enabled"], tokens_before=stats["tokens_before"],
+                  tokens_after=stats["tokens_after"], reduction=stats["reduction"])
+
+    if mode == "single":
+        # === 2️⃣+3️⃣ 회의일자 + 요약 / 결정사항 / 액션아이템 한 번에 추출 ===
+        with progress.stage("summary") as st:
+            parsed_json = extract_meeting(prompt_source)
+            base_dt = parse_meeting_date(parsed_json.pop("meeting_date", None))
+            st.update(mode=mode, meeting_date=base_dt.strftime("%Y-%m-%d"))
+    else:
+        # === 2️⃣ 회의일자 추정 ===
+        with progress.stage("date") as st:
+            base_dt = estimate_meeting_date(prompt_source)
+            st.update(meeting_date=base_dt.strftime("%Y-%m-%d"))
+
+        # === 3️⃣ 회의 요약 / 결정사항 / 액션아이템 추출 ===
+        with progress.stage("summary") as st:
+            llm = RoutedChat(temperature=0.2)
+            prompt_text = meeting_summary_prompt.format(text=prompt_source)
+            parsed_json = cached_llm_json(llm, prompt_text, prompt_version(meeting_summary_prompt))
+            st.update(mode=mode)
+
+    return persist_summary(audio_path, parsed_json, base_dt, full_text, progress, mode)
+
+
+def persist_summary(audio_path: str, parsed_json: dict, base_dt: datetime, full_text: str,
+                    progress: Optional[ProgressTracker] = None, mode: Optional[str] = None) -> dict:
+    """LLM이 뽑은 요약 dict → due 정규화 / 검증 / outbox·JSON·카탈로그·검색 색인·DOCX 저장
+    (파일 분석과 실시간 회의 마무리가 같은 경로를 탐)"""
+    progress = progress or ProgressTracker()
+    mode = mode or EXTRACTION_MODE
+
+    with progress.stage("due") as st:
+        # === 4️⃣ due 날짜 정규화 (문맥 기반 변환) ===
+        normalize_items(parsed_json.get("action_items", []), base_dt)
+
+        # === 5️⃣ fallback: due가 전부 None이면 순차 배정 ===
+        for idx, item in enumerate(parsed_json.get("action_items", [])):
+            if not item.get("due"):
+                item["due"] = (base_dt + timedelta(days=idx)).strftime("%Y-%m-%d")
+
+        # === 6️⃣ Pydantic 검증 ===
+        validated = MeetingSummary(**parsed_json)
+        st.update(action_items=len(validated.action_items))
+
+    # === 7️⃣ DB 저장 (로컬 outbox에 먼저 커밋 → 내 DB + 팀원 DB는 백그라운드 전달) ===
+    base_filename = os.path.splitext(os.path.basename(audio_path))[0]  # 확장자 제거
+
+    meeting_date = base_dt.strftime("%Y-%m-%d")
 
-    # === 2️⃣ 회의일자 추정 ===
-    llm_date = ChatOpenAI(model_name="gpt-4o-mini", temperature=0)
-    try:
-        date_json = safe_llm_json(llm_date, meeting_date_prompt.format(text=full_text))
-        base_dt = dateparser.parse(date_json.get("meeting_date", ""), languages=["ko"]) or datetime.now()
+    with progress.stage("db") as st:
+        summary = summary_dict(validated)
+        # 액션아이템 ID + 버전은 카탈로그가 이전 분석 결과와 맞춰 부여 (재분석해도 ID가 다른 항목을 가리키지 않게)
+        st.update(catalog_version=catalog.upsert(base_filename, meeting_date, summary, audio_path))
+        seq = outbox.enqueue(audio_path, summary)
+        st.update(outbox_seq=seq)
 
-        # 🔧 연도 보정 (LLM이 과거 연도 추정할 경우)
-        if base_dt.year < datetime.now().year:
-            base_dt = base_dt.replace(year=datetime.now().year)
+    # === 8️⃣ JSON 파일도 자동 저장 + 검색 색인 갱신 ===
+    with progress.stage("json"):
+        write_json(base_filename, meeting_date, summary)
+        search_index.index_meeting(base_filename, summary, transcript=full_text)
 
-    except Exception:
-        base_dt = datetime.now()
+    # === 9️⃣ DOCX는 백그라운드 워커에서 렌더링 (응답을 기다리게 하지 않음) ===
+    with progress.stage("docx"):
+        docx_render.submit(base_filename, meeting_date, summary)
 
+    # 작업별 trace (METRICS_TRACE=1 일 때만)
+    metrics.write_trace(base_filename, progress, audio_path=audio_path, meeting_date=meeting_date, mode=mode)
 
-    # === 3️⃣ 회의 요약 / 결정사항 / 액션아이템 추출 ===
-    llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.2)
-    prompt_text = meeting_summary_prompt.format(text=full_text)
-    parsed_json = safe_llm_json(llm, prompt_text)
+    # === 🔟 결과 반환 ===
+    return {
+        **summary,
+        "meeting_date": meeting_date,
+        "docx_path": docx_render.doc_path(base_filename, meeting_date),
+        "docx_url": f"/api/docx/{base_filename}",
+    }
 
-    # === 4️⃣ due 날짜 정규화 (문맥 기반 변환) ===
-    for item in parsed_json.get("action_items", []):
-        item["due"] = normalize_due(item.get("due"), base_dt)
 
-    # === 5️⃣ fallback: due가 전부 None이면 순차 배정 ===
-    for idx, item in enumerate(parsed_json.get("action_items", [])):
-        if not item.get("due"):
-            item["due"] = (base_dt + timedelta(days=idx)).strftime("%Y-%m-%d")
+def summary_dict(validated: MeetingSummary) -> dict:
+    return {
+        "topic_summary": validated.topic_summary,
+        "content_summary": validated.content_summary,
+        "decisions": validated.decisions,
+        "action_items": [a.dict() for a in validated.action_items],
+    }
 
-    # === 6️⃣ Pydantic 검증 ===
-    validated = MeetingSummary(**parsed_json)
 
-        # === 7️⃣ DB 저장 (내 DB + 팀원 DB) ===
+def estimate_meeting_date(full_text: str) -> datetime:
+    llm_date = RoutedChat(temperature=0)
     try:
-        # ✅ 기존 개인 DB (외부 서버)
-        conn1 = pymysql.connect(
-            host=DB_HOST, user=DB_USER, password=DB_PASSWORD,
-            database=DB_NAME, port=DB_PORT, charset="utf8mb4"
-        )
-        cur1 = conn1.cursor()
-        cur1.execute("""
-        INSERT INTO meeting_summary (meeting_file, topic_summary, content_summary, decisions, action_items)
-        VALUES (%s,%s,%s,%s,%s)
-        ON DUPLICATE KEY UPDATE
-            topic_summary=VALUES(topic_summary),
-            content_summary=VALUES(content_summary),
-            decisions=VALUES(decisions),
-            action_items=VALUES(action_items),
-            created_at=CURRENT_TIMESTAMP;
-        """, (
-            audio_path,
-            validated.topic_summary,
-            validated.content_summary,
-            json.dumps(validated.decisions, ensure_ascii=False),
-            json.dumps([a.dict() for a in validated.action_items], ensure_ascii=False)
-        ))
-        conn1.commit()
-        print("✅ 개인 DB 저장 완료")
-
-    except Exception as e:
-        print("❌ 개인 DB 오류:", e)
-    finally:
-        conn1.close()
-
-    # === 🧩 팀원 DB에도 추가 저장 ===
-    DB_CONFIG = {
-        'host': 'localhost',
-        'user': 'admin',
-        'password': '1qazZAQ!',
-        'db': 'final',
-        'charset': 'utf8mb4'
-    }
+        date_json = cached_llm_json(llm_date, meeting_date_prompt.format(text=full_text),
+                                    prompt_version(meeting_date_prompt))
+        return parse_meeting_date(date_json.get("meeting_date"))
+    except Exception:
+        return datetime.now()
+
 
+def parse_meeting_date(date_text: Optional[str]) -> datetime:
+    """LLM이 추정한 회의일자 문자열 → datetime (없거나 못 읽으면 오늘)"""
+    import dateparser  # 언어 데이터 로드가 무거워 실제로 쓸 때 import
     try:
-        conn2 = pymysql.connect(**DB_CONFIG)
-        cur2 = conn2.cursor()
-
-        # ⚙️ 테이블 자동 생성 (없을 시)
-        cur2.execute("""
-        CREATE TABLE IF NOT EXISTS team_meeting_summary (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            meeting_file VARCHAR(255) UNIQUE,
-            topic_summary TEXT,
-            content_summary TEXT,
-            decisions JSON,
-            action_items JSON,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        ) CHARACTER SET utf8mb4;
-        """)
-
-        # 💾 데이터 삽입 (중복 방지)
-        cur2.execute("""
-        INSERT INTO team_meeting_summary (meeting_file, topic_summary, content_summary, decisions, action_items)
-        VALUES (%s,%s,%s,%s,%s)
-        ON DUPLICATE KEY UPDATE
-            topic_summary=VALUES(topic_summary),
-            content_summary=VALUES(content_summary),
-            decisions=VALUES(decisions),
-            action_items=VALUES(action_items),
-            created_at=CURRENT_TIMESTAMP;
-        """, (
-            audio_path,
-            validated.topic_summary,
-            validated.content_summary,
-            json.dumps(validated.decisions, ensure_ascii=False),
-            json.dumps([a.dict() for a in validated.action_items], ensure_ascii=False)
-        ))
-        conn2.commit()
-        print("✅ 팀원 DB 저장 완료")
-
-    except Exception as e:
-        print("❌ 팀원 DB 오류:", e)
-    finally:
-        conn2.close()
-
-    # === 9️⃣ DOCX 파일 자동 생성 ===
-    from docx import Document
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.shared import Pt
-    from docx.oxml.ns import qn   # ✅ 이 줄 추가
-
-
-    doc_dir = "static/docs"
-    os.makedirs(doc_dir, exist_ok=True)
-    base_filename = os.path.splitext(os.path.basename(audio_path))[0]  # 확장자 제거
-    doc_path = os.path.join(
-        doc_dir,
-        f"회의록_{base_dt.strftime('%Y-%m-%d')}_{base_filename}.docx"
-    )
-
-    doc = Document()
-    # 스타일 지정
-    style = doc.styles['Normal']
-    style.font.name = 'Malgun Gothic'  # 🔹 윈도우에서 존재하는 한글 폰트
-    style._element.rPr.rFonts.set(qn('w:eastAsia'), 'Malgun Gothic')
-    style.font.size = Pt(12)
-
-    # --- 제목 ---
-    title = doc.add_heading("회의 요약 보고서", level=1)
-    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-
-    # --- 기본 정보 ---
-    doc.add_paragraph(f"📅 회의일자: {base_dt.strftime('%Y-%m-%d')}")
-    doc.add_paragraph(f"🎧 파일명: {base_filename}")
-    doc.add_paragraph("")
-
-    # --- 주제 요약 ---
-    doc.add_heading("1. 주제 요약", level=2)
-    doc.add_paragraph(validated.topic_summary)
-
-    # --- 내용 요약 ---
-    doc.add_heading("2. 내용 요약", level=2)
-    doc.add_paragraph(validated.content_summary)
-
-    # --- 결정사항 ---
-    doc.add_heading("3. 결정사항", level=2)
-    for d in validated.decisions:
-        doc.add_paragraph(f"• {d}", style="List Bullet")
-
-    # --- 액션 아이템 ---
-    doc.add_heading("4. 액션 아이템", level=2)
-    for item in validated.action_items:
-        p = doc.add_paragraph(style="List Number")
-        p.add_run(f"담당자: {item.name}\n").bold = True
-        p.add_run(f"작업내용: {item.task}\n")
-        p.add_run(f"기한: {item.due if item.due else '미정'}")
-        
-        # === 8️⃣ JSON 파일도 자동 저장 (프론트에서 보기용) ===
+        base_dt = dateparser.parse(date_text or "", languages=["ko"]) or datetime.now()
+    except Exception:
+        return datetime.now()
+
+    # 🔧 연도 보정 (LLM이 과거 연도 추정할 경우)
+    if base_dt.year < datetime.now().year:
+        base_dt = base_dt.replace(year=datetime.now().year)
+    return base_dt
+
+
+# ===================== 결과 파일 저장 =====================
+def write_json(base_filename: str, meeting_date: str, summary: dict) -> str:
     json_dir = "static/data"
     os.makedirs(json_dir, exist_ok=True)
     json_path = os.path.join(json_dir, f"{base_filename}.json")
 
     with open(json_path, "w", encoding="utf-8") as f:
-        json.dump({
-            "topic_summary": validated.topic_summary,
-            "content_summary": validated.content_summary,
-            "decisions": validated.decisions,
-            "action_items": [a.dict() for a in validated.action_items],
-        }, f, ensure_ascii=False, indent=2)
+        json.dump({**summary, "meeting_date": meeting_date}, f, ensure_ascii=False, indent=2)
 
     print(f"📄 JSON 저장 완료: {json_path}")
-
-    doc.save(doc_path)
-    print(f"📝 DOCX 저장 완료: {doc_path}")
-     # === 10️⃣ 결과 반환 ===
-    return {
-        "topic_summary": validated.topic_summary,
-        "content_summary": validated.content_summary,
-        "decisions": validated.decisions,
-        "action_items": [a.dict() for a in validated.action_items],
-        "docx_path": doc_path
-    }
-
+    return json_path
@@ -0,0 +1,406 @@
+import os, json, glob, sqlite3, hashlib, threading
+from datetime import datetime
+
+from result_cache import make_key
+
+# ===================== 설정 =====================
+CATALOG_PATH = os.getenv("CATALOG_PATH", os.path.join(os.getenv("DB_SQLITE_DIR", "db"), "catalog.db"))
+DATA_DIR = "static/data"
+WAV_DIR = "wav.file"
+MAX_PAGE_SIZE = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meetings (
+    name TEXT PRIMARY KEY,
+    meeting_file TEXT,
+    meeting_date TEXT,
+    topic_summary TEXT,
+    summary TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_meetings_date ON meetings(meeting_date);
+CREATE TABLE IF NOT EXISTS participants (
+    meeting TEXT NOT NULL,
+    person TEXT NOT NULL,
+    PRIMARY KEY (meeting, person)
+);
+CREATE INDEX IF NOT EXISTS idx_participants_person ON participants(person);
+CREATE TABLE IF NOT EXISTS action_items (
+    meeting TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    assignee TEXT,
+    task TEXT,
+    due TEXT,
+    item_id TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    deleted INTEGER NOT NULL DEFAULT 0,
+    item_version INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (meeting, idx)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS issued_ids (
+    item_id TEXT PRIMARY KEY,
+    meeting TEXT NOT NULL
+);
+"""
+ACTION_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_action_due ON action_items(due);
+CREATE INDEX IF NOT EXISTS idx_action_assignee ON action_items(assignee, due);
+CREATE INDEX IF NOT EXISTS idx_action_version ON action_items(version);
+CREATE INDEX IF NOT EXISTS idx_action_item_id ON action_items(item_id);
+"""
+
+
+# ===================== 회의 카탈로그 =====================
+class MeetingCatalog:
+    """분석된 회의 목록 인덱스 (회의명 / 회의일자 / 참석자 / 액션아이템 기한)
+    - 파이프라인이 결과를 쓸 때마다 해당 회의만 갱신 (전체 재스캔 없음)
+    - 변경될 때마다 카탈로그 버전이 올라가 목록 ETag로 사용"""
+
+    def __init__(self, path: str = CATALOG_PATH):
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        # 예전 카탈로그에는 액션아이템 ID / 변경 버전 컬럼이 없음 → 추가 후 인덱스 생성
+        columns = {r[1] for r in self._conn.execute("PRAGMA table_info(action_items)")}
+        if "item_id" not in columns:
+            self._conn.execute("ALTER TABLE action_items ADD COLUMN item_id TEXT")
+            # 다음 sync_from_disk 에서 모든 회의를 다시 읽어 ID 부여
+            self._conn.execute("UPDATE meetings SET updated_at = 0")
+        for column in ("version", "deleted"):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE action_items ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+        if "version" not in columns:
+            self._conn.execute("UPDATE action_items SET version = "
+                               "(SELECT version FROM meetings WHERE meetings.name = action_items.meeting)")
+        # version 은 변경분 조회용 카탈로그 버전, item_version 은 단건 수정(PATCH)에서 비교하는 항목별 버전
+        if "item_version" not in columns:
+            self._conn.execute("ALTER TABLE action_items ADD COLUMN item_version INTEGER NOT NULL DEFAULT 1")
+            for name, summary in self._conn.execute("SELECT name, summary FROM meetings").fetchall():
+                self._conn.executemany(
+                    "UPDATE action_items SET item_version = ? WHERE meeting = ? AND item_id = ?",
+                    [(a.get("version", 1), name, a["id"]) for a in json.loads(summary).get("action_items", [])
+                     if a.get("id")])
+        self._conn.executescript(ACTION_INDEXES)
+        # 한 번 발급한 ID는 항목이 사라져도 기록해 둠 (재분석 때 다른 항목에 다시 주지 않도록)
+        self._conn.execute("INSERT OR IGNORE INTO issued_ids (item_id, meeting) "
+                           "SELECT item_id, meeting FROM action_items WHERE item_id IS NOT NULL")
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._wav_cache = (None, [])
+
+    @property
+    def version(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    # ---------- 갱신 ----------
+    def upsert(self, name: str, meeting_date: str, summary: dict, meeting_file: str = None) -> int:
+        """회의 하나의 인덱스를 갱신 → 새 카탈로그 버전
+        (summary 의 액션아이템에 ID/버전을 채워 넣음 → 호출한 쪽은 이 summary 를 JSON/DB에 저장)"""
+        with self._lock:
+            conn = self._conn
+            # 삭제된 항목의 ID도 다시 쓰지 않음 (변경분을 받는 클라이언트가 헷갈리지 않게)
+            issued = {r[0] for r in conn.execute("SELECT item_id FROM issued_ids WHERE meeting = ?", (name,))}
+            row = conn.execute("SELECT summary FROM meetings WHERE name = ?", (name,)).fetchone()
+            previous = json.loads(row[0]).get("action_items", []) if row else []
+            items = assign_item_ids(name, summary.setdefault("action_items", []), previous, reserved=issued)
+            conn.executemany("INSERT OR IGNORE INTO issued_ids (item_id, meeting) VALUES (?, ?)",
+                             [(a["id"], name) for a in items])
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            (version,) = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO meetings (name, meeting_file, meeting_date, topic_summary, summary, version, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, meeting_file, meeting_date, summary.get("topic_summary"),
+                 json.dumps(summary, ensure_ascii=False), version, datetime.now().timestamp()),
+            )
+            conn.execute("DELETE FROM participants WHERE meeting = ?", (name,))
+            conn.executemany("INSERT OR IGNORE INTO participants (meeting, person) VALUES (?, ?)",
+                             [(name, a.get("name")) for a in items if a.get("name")])
+            self._sync_action_items(name, items, version)
+            conn.commit()
+            return version
+
+    def update_action_item(self, name: str, item: dict) -> int:
+        """액션아이템 하나만 갱신 (해당 행 1개 + 회의 버전) → 새 카탈로그 버전"""
+        with self._lock:
+            conn = self._conn
+            row = conn.execute("SELECT summary FROM meetings WHERE name = ?", (name,)).fetchone()
+            if row is None:
+                raise KeyError(name)
+            summary = json.loads(row[0])
+            items = summary.get("action_items", [])
+            idx = next((i for i, a in enumerate(items) if a.get("id") == item["id"]), None)
+            if idx is None:
+                raise KeyError(item["id"])
+            items[idx] = item
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            (version,) = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            conn.execute(
+                "UPDATE action_items SET assignee = ?, task = ?, due = ?, version = ?, item_version = ? "
+                "WHERE meeting = ? AND idx = ?",
+                (item.get("name"), item.get("task"), item.get("due"), version, item.get("version", 1), name, idx),
+            )
+            conn.execute("UPDATE meetings SET summary = ?, version = ?, updated_at = ? WHERE name = ?",
+                         (json.dumps(summary, ensure_ascii=False), version, datetime.now().timestamp(), name))
+            conn.execute("DELETE FROM participants WHERE meeting = ?", (name,))
+            conn.executemany("INSERT OR IGNORE INTO participants (meeting, person) VALUES (?, ?)",
+                             [(name, a.get("name")) for a in items if a.get("name")])
+            conn.commit()
+            return version
+
+    def _sync_action_items(self, name: str, items: list, version: int):
+        """바뀐 액션아이템만 새 버전으로 기록, 사라진 항목은 삭제 표시 (변경분 조회용)"""
+        conn = self._conn
+        existing = {
+            idx: (assignee, task, due, item_id, item_version, deleted)
+            for idx, assignee, task, due, item_id, item_version, deleted in conn.execute(
+                "SELECT idx, assignee, task, due, item_id, item_version, deleted FROM action_items WHERE meeting = ?",
+                (name,))
+        }
+        changed = [
+            (name, i, a.get("name"), a.get("task"), a.get("due"), a["id"], version, a.get("version", 1))
+            for i, a in enumerate(items)
+            if existing.get(i) != (a.get("name"), a.get("task"), a.get("due"), a["id"], a.get("version", 1), 0)
+        ]
+        conn.executemany(
+            "INSERT OR REPLACE INTO action_items (meeting, idx, assignee, task, due, item_id, version, item_version, "
+            "deleted) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+            changed,
+        )
+        conn.execute(
+            "UPDATE action_items SET deleted = 1, version = ? WHERE meeting = ? AND idx >= ? AND deleted = 0",
+            (version, name, len(items)),
+        )
+
+    def sync_from_disk(self, data_dir: str = DATA_DIR) -> int:
+        """static/data 중 인덱스보다 새로운 JSON만 반영 (서버 시작 시 1회)"""
+        with self._lock:
+            indexed = dict(self._conn.execute("SELECT name, updated_at FROM meetings").fetchall())
+        # 예전 파이프라인은 "{이름}.wav.json" 으로 저장 → 이름에서 .wav 를 떼고, 새 "{이름}.json" 이 있으면 그쪽만 사용
+        paths = {}
+        for path in sorted(glob.glob(os.path.join(data_dir, "*.json"))):
+            name = meeting_name(path)
+            if name not in paths or path == os.path.join(data_dir, f"{name}.json"):
+                paths[name] = path
+        for legacy in [n for n in indexed if n.endswith(".wav")]:
+            self.forget(legacy)
+
+        added = 0
+        for name, path in paths.items():
+            mtime = os.path.getmtime(path)
+            if name in indexed and indexed[name] >= mtime:
+                continue
+            try:
+                with open(path, encoding="utf-8") as f:
+                    summary = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"⚠️ 카탈로그 색인 실패 ({path}):", e)
+                continue
+            meeting_date = summary.get("meeting_date") or datetime.fromtimestamp(mtime).strftime("%Y-%m-%d")
+            # 파이프라인은 wav.file/{이름}.wav 경로를 DB의 meeting_file 로 사용
+            self.upsert(name, meeting_date, summary, os.path.join(WAV_DIR, f"{name}.wav"))
+            added += 1
+        if added:
+            print(f"📚 카탈로그 색인 {added}건 갱신")
+        return added
+
+    def forget(self, name: str) -> int:
+        """회의 하나를 카탈로그에서 제거 (액션아이템은 삭제 표시로 남겨 변경분 조회에 반영)"""
+        with self._lock:
+            conn = self._conn
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+            (version,) = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            self._sync_action_items(name, [], version)
+            conn.execute("DELETE FROM participants WHERE meeting = ?", (name,))
+            conn.execute("DELETE FROM meetings WHERE name = ?", (name,))
+            conn.commit()
+            return version
+
+    # ---------- 조회 ----------
+    def get(self, name: str):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, meeting_file, meeting_date, summary, version FROM meetings WHERE name = ?", (name,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"name": row[0], "meeting_file": row[1], "meeting_date": row[2],
+                **json.loads(row[3]), "version": row[4]}
+
+    def list(self, page: int = 1, size: int = 20, date_from: str = None, date_to: str = None,
+             participant: str = None, due_from: str = None, due_to: str = None) -> dict:
+        """필터 + 페이지 단위 목록 (회의일자 내림차순). 페이지당 인덱스 조회만 수행"""
+        size = max(1, min(size, MAX_PAGE_SIZE))
+        page = max(1, page)
+        where, params = [], []
+        if date_from:
+            where.append("m.meeting_date >= ?"); params.append(date_from)
+        if date_to:
+            where.append("m.meeting_date <= ?"); params.append(date_to)
+        if participant:
+            where.append("m.name IN (SELECT meeting FROM participants WHERE person = ?)"); params.append(participant)
+        if due_from or due_to:
+            cond, sub = [], []
+            if due_from:
+                cond.append("due >= ?"); sub.append(due_from)
+            if due_to:
+                cond.append("due <= ?"); sub.append(due_to)
+            where.append(f"m.name IN (SELECT meeting FROM action_items WHERE deleted = 0 AND {' AND '.join(cond)})")
+            params += sub
+        clause = f"WHERE {' AND '.join(where)}" if where else ""
+
+        with self._lock:
+            (total,) = self._conn.execute(f"SELECT COUNT(*) FROM meetings m {clause}", params).fetchone()
+            rows = self._conn.execute(
+                f"SELECT m.name, m.meeting_date, m.topic_summary, m.version, "
+                f"(SELECT COUNT(*) FROM action_items a WHERE a.meeting = m.name AND a.deleted = 0) "
+                f"FROM meetings m {clause} ORDER BY m.meeting_date DESC, m.name LIMIT ? OFFSET ?",
+                params + [size, (page - 1) * size],
+            ).fetchall()
+        return {
+            "page": page,
+            "size": size,
+            "total": total,
+            "items": [
+                {"name": r[0], "meeting_date": r[1], "topic_summary": r[2], "version": r[3], "action_items": r[4]}
+                for r in rows
+            ],
+        }
+
+    # ---------- 액션아이템 (기한/담당자/회의 인덱스) ----------
+    def find_action_item(self, item_id: str):
+        """액션아이템 ID → 회의 이름 (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT meeting FROM action_items WHERE item_id = ? AND deleted = 0", (item_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def action_items(self, due_from: str = None, due_to: str = None, assignee: str = None,
+                     meeting: str = None, overdue_before: str = None) -> list:
+        """기한 범위 / 담당자 / 회의 조건으로 액션아이템 조회 (기한순)"""
+        where, params = ["deleted = 0"], []
+        for clause, value in (("due >= ?", due_from), ("due <= ?", due_to), ("due < ?", overdue_before),
+                              ("assignee = ?", assignee), ("meeting = ?", meeting)):
+            if value:
+                where.append(clause); params.append(value)
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT meeting, idx, assignee, task, due, version, item_id, item_version FROM action_items "
+                f"WHERE {' AND '.join(where)} ORDER BY due IS NULL, due, meeting, idx",
+                params,
+            ).fetchall()
+        return [_action_row(r) for r in rows]
+
+    def overdue_action_items(self, today: str, assignee: str = None) -> list:
+        return self.action_items(assignee=assignee, overdue_before=today)
+
+    def action_changes(self, since: int = 0) -> dict:
+        """버전 토큰(since) 이후 바뀐 액션아이템만 반환. 다음 요청에는 응답의 version을 그대로 사용"""
+        with self._lock:
+            (version,) = self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            rows = self._conn.execute(
+                "SELECT meeting, idx, assignee, task, due, version, item_id, item_version, deleted FROM action_items "
+                "WHERE version > ? ORDER BY version, meeting, idx",
+                (since,),
+            ).fetchall()
+        return {
+            "since": since,
+            "version": version,
+            "items": [_action_row(r) for r in rows if not r[8]],
+            "deleted": [{"meeting": r[0], "idx": r[1], "id": r[6]} for r in rows if r[8]],
+        }
+
+    def names(self) -> set:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT name FROM meetings")}
+
+    # ---------- wav.file 목록 ----------
+    def wav_files(self, wav_dir: str = WAV_DIR) -> list:
+        """폴더 수정시각이 바뀌었을 때만 다시 listdir"""
+        mtime = os.stat(wav_dir).st_mtime_ns
+        if self._wav_cache[0] != mtime:
+            self._wav_cache = (mtime, sorted(f for f in os.listdir(wav_dir) if f.endswith(".wav")))
+        return self._wav_cache[1]
+
+
+def _action_row(row) -> dict:
+    """version = 항목별 버전 (PATCH 에 그대로 보냄), row_version = 이 행이 마지막으로 바뀐 카탈로그 버전"""
+    return {"meeting": row[0], "idx": row[1], "name": row[2], "task": row[3], "due": row[4],
+            "version": row[7], "row_version": row[5], "id": row[6]}
+
+
+# ===================== 회의 이름 / JSON 경로 =====================
+def meeting_name(path: str) -> str:
+    """static/data 파일 / wav 경로 → 회의 이름 ("X.json", 예전 형식 "X.wav.json", "X.wav" 모두 "X")"""
+    name = os.path.basename(path)
+    if name.endswith(".json"):
+        name = name[:-len(".json")]
+    while name.endswith(".wav"):  # 예전 meeting_file 에는 "X.wav.wav" 도 있음
+        name = name[:-len(".wav")]
+    return name
+
+
+def data_path(name: str, data_dir: str = DATA_DIR) -> str:
+    """회의 이름 → 요약 JSON 경로 ("{이름}.json" 우선, 없으면 예전 "{이름}.wav.json")"""
+    path = os.path.join(data_dir, f"{name}.json")
+    legacy = os.path.join(data_dir, f"{name}.wav.json")
+    if not os.path.exists(path) and os.path.exists(legacy):
+        return legacy
+    return path
+
+
+# ===================== 액션아이템 ID =====================
+def item_id(meeting: str, idx: int) -> str:
+    """회의 이름 + 발급 순번으로 만든 ID"""
+    return make_key("action_item", meeting, idx)[:12]
+
+
+def assign_item_ids(meeting: str, items: list, previous=(), reserved=()) -> list:
+    """ID 없는 항목에 ID를 채우고 버전을 맞춤 (이미 있는 ID는 절대 바꾸지 않음)
+    - 재분석 결과는 이전 항목 중 (담당자, 작업)이 같은 것의 ID를 이어 쓰고, 나머지는 새 ID
+    - reserved(이 회의에 한 번이라도 발급된 ID)는 다른 항목에 다시 주지 않음
+    - 같은 ID의 버전은 내려가지 않음 (내용이 바뀌었으면 이전 버전 + 1)"""
+    before = {p["id"]: p for p in previous if p.get("id")}
+    by_content = {}
+    for p in before.values():
+        by_content.setdefault((p.get("name"), p.get("task")), []).append(p["id"])
+    claimed = {item["id"] for item in items if item.get("id")}
+    used = set(reserved) | set(before) | claimed
+    for idx, item in enumerate(items):
+        if not item.get("id"):
+            same = [i for i in by_content.get((item.get("name"), item.get("task")), []) if i not in claimed]
+            if same:
+                item["id"] = same[0]
+            else:
+                n = idx
+                while item_id(meeting, n) in used:
+                    n += 1
+                item["id"] = item_id(meeting, n)
+                used.add(item["id"])
+            claimed.add(item["id"])
+        old = before.get(item["id"])
+        if old is None:
+            item["version"] = item.get("version") or 1
+        else:
+            changed = any(old.get(k) != item.get(k) for k in ("name", "task", "due"))
+            item["version"] = max(item.get("version") or 1, old.get("version", 1) + changed)
+    return items
+
+
+def etag_for(*parts) -> str:
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return f'W/"{hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]}"'
+
+
+catalog = MeetingCatalog()
@@ -0,0 +1,225 @@
+import os, re, json, math, time, sqlite3, threading, unicodedata
+from collections import Counter, defaultdict
+
+# ===================== 설정 =====================
+SEARCH_PATH = os.getenv("SEARCH_PATH", os.path.join(os.getenv("DB_SQLITE_DIR", "db"), "search.db"))
+BM25_K1 = 1.2
+BM25_B = 0.75
+SNIPPET_CHARS = 40
+# 질의에서 쓰는 서로 다른 bigram 최대 개수 (긴 질의가 점수 계산을 무한정 키우지 않도록)
+MAX_QUERY_GRAMS = int(os.getenv("SEARCH_MAX_QUERY_GRAMS", "64"))
+
+# 필드별 가중치 (주제/결정사항에서 맞은 회의를 전사문에서만 맞은 회의보다 위로)
+FIELD_WEIGHTS = {
+    "topic_summary": 3.0,
+    "decisions": 2.5,
+    "action_items": 2.0,
+    "content_summary": 1.5,
+    "transcript": 1.0,
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    meeting TEXT NOT NULL,
+    field TEXT NOT NULL,
+    length INTEGER NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (meeting, field)
+);
+CREATE TABLE IF NOT EXISTS postings (
+    gram TEXT NOT NULL,
+    meeting TEXT NOT NULL,
+    field TEXT NOT NULL,
+    tf INTEGER NOT NULL,
+    dl INTEGER NOT NULL,
+    PRIMARY KEY (gram, meeting, field)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_postings_meeting ON postings(meeting, field);
+"""
+
+_WORD = re.compile(r"[0-9a-z가-힣]+")
+
+
+# ===================== 토크나이저 (한글 문자 bigram) =====================
+def tokenize(text: str) -> list:
+    """형태소 분석기 없이 조사/어미 변화에 강하도록 단어를 문자 2-gram으로 쪼갬
+    ("회의록을" → 회의, 의록, 록을). 한 글자 단어는 그대로 유지"""
+    grams = []
+    for word in _WORD.findall(unicodedata.normalize("NFKC", text or "").lower()):
+        if len(word) == 1:
+            grams.append(word)
+        else:
+            grams.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return grams
+
+
+def summary_fields(summary: dict, transcript: str = None) -> dict:
+    fields = {
+        "topic_summary": summary.get("topic_summary") or "",
+        "content_summary": summary.get("content_summary") or "",
+        "decisions": "\n".join(summary.get("decisions") or []),
+        "action_items": action_items_text(summary.get("action_items") or []),
+    }
+    if transcript is not None:
+        fields["transcript"] = transcript
+    return fields
+
+
+def action_items_text(items: list) -> str:
+    return "\n".join(f"{a.get('name') or ''} {a.get('task') or ''}".strip() for a in items)
+
+
+# ===================== 역색인 =====================
+class SearchIndex:
+    """회의별·필드별 bigram 역색인 + BM25 랭킹
+    - 회의 하나가 바뀌면 그 회의의 posting만 지우고 다시 넣음 (전체 재색인 없음)
+    - 필드별 문서 수/평균 길이는 메모리에 두고 쓰기마다 증분 갱신"""
+
+    def __init__(self, path: str = SEARCH_PATH):
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        # field → [문서 수, 총 길이]
+        self._field_stats = defaultdict(lambda: [0, 0])
+        for field, count, total in self._conn.execute("SELECT field, COUNT(*), SUM(length) FROM docs GROUP BY field"):
+            self._field_stats[field] = [count, total or 0]
+
+    # ---------- 쓰기 ----------
+    def _replace_field(self, meeting: str, field: str, text: str):
+        conn = self._conn
+        old = conn.execute("SELECT length FROM docs WHERE meeting = ? AND field = ?", (meeting, field)).fetchone()
+        if old is not None:
+            self._field_stats[field][0] -= 1
+            self._field_stats[field][1] -= old[0]
+            conn.execute("DELETE FROM postings WHERE meeting = ? AND field = ?", (meeting, field))
+            conn.execute("DELETE FROM docs WHERE meeting = ? AND field = ?", (meeting, field))
+
+        grams = tokenize(text)
+        if not grams:
+            return
+        conn.execute("INSERT INTO docs (meeting, field, length, body) VALUES (?, ?, ?, ?)",
+                     (meeting, field, len(grams), text))
+        # 문서 길이(dl)를 posting에 같이 두어 검색 시 docs 조인 없이 BM25 계산
+        conn.executemany("INSERT INTO postings (gram, meeting, field, tf, dl) VALUES (?, ?, ?, ?, ?)",
+                         [(g, meeting, field, tf, len(grams)) for g, tf in Counter(grams).items()])
+        self._field_stats[field][0] += 1
+        self._field_stats[field][1] += len(grams)
+
+    def index_meeting(self, meeting: str, summary: dict, transcript: str = None):
+        """요약 필드(+ 있으면 전사문)를 색인. transcript=None이면 기존 전사문 색인은 유지"""
+        with self._lock:
+            for field, text in summary_fields(summary, transcript).items():
+                self._replace_field(meeting, field, text)
+            self._conn.commit()
+
+    def update_field(self, meeting: str, field: str, text: str):
+        with self._lock:
+            self._replace_field(meeting, field, text)
+            self._conn.commit()
+
+    def remove(self, meeting: str):
+        with self._lock:
+            for field in FIELD_WEIGHTS:
+                self._replace_field(meeting, field, "")
+            self._conn.commit()
+
+    def indexed(self) -> set:
+        with self._lock:
+            return {r[0] for r in self._conn.execute("SELECT DISTINCT meeting FROM docs")}
+
+    def sync_from_catalog(self, catalog) -> int:
+        """카탈로그에는 있는데 아직 색인 안 된 회의만 요약 필드로 색인 (서버 시작 시 1회)
+        카탈로그에서 빠진 회의(예전 "X.wav" 이름 등)는 색인에서도 제거"""
+        names, indexed = catalog.names(), self.indexed()
+        for stale in indexed - names:
+            self.remove(stale)
+        missing = names - indexed
+        for name in missing:
+            meeting = catalog.get(name)
+            if meeting is not None:
+                self.index_meeting(name, meeting)
+        if missing:
+            print(f"🔎 검색 색인 {len(missing)}건 추가")
+        return len(missing)
+
+    # ---------- 검색 ----------
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> dict:
+        started = time.perf_counter()
+        grams = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_GRAMS]
+        if not grams:
+            return {"query": query, "total": 0, "took_ms": 0.0, "results": []}
+
+        with self._lock:
+            stats = {f: tuple(v) for f, v in self._field_stats.items() if v[0] > 0}
+            # bigram·가중치는 JSON 하나로 바인딩 (질의 길이와 무관하게 파라미터 수 고정 → SQLITE_MAX_VARIABLE_NUMBER 초과 방지)
+            df = self._conn.execute(
+                "SELECT gram, field, COUNT(*) FROM postings WHERE gram IN (SELECT value FROM json_each(?)) "
+                "GROUP BY gram, field", (json.dumps(grams),)
+            ).fetchall()
+            if not df:
+                return {"query": query, "total": 0, "took_ms": 0.0, "results": []}
+
+            # (gram, field)별 가중치·평균 길이는 파이썬에서 한 번만 계산하고, 회의별 합산/정렬은 SQLite가 수행
+            weights = []
+            for gram, field, n in df:
+                n_docs, total_len = stats.get(field, (0, 0))
+                if not n_docs:
+                    continue
+                idf = math.log(1 + (n_docs - n + 0.5) / (n + 0.5))
+                weights.append([gram, field, FIELD_WEIGHTS.get(field, 1.0) * idf * (BM25_K1 + 1), total_len / n_docs])
+            scored = (
+                "WITH w(gram, field, weight, avgdl) AS (SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), "
+                "json_extract(value, '$[2]'), json_extract(value, '$[3]') FROM json_each(?)), "
+                f"s AS (SELECT p.meeting, "
+                f"SUM(w.weight * p.tf / (p.tf + {BM25_K1} * (1 - {BM25_B} + {BM25_B} * p.dl / w.avgdl))) AS score, "
+                f"COUNT(DISTINCT p.gram) AS hits "
+                f"FROM postings p JOIN w ON p.gram = w.gram AND p.field = w.field GROUP BY p.meeting) "
+            )
+            # 질의 bigram을 더 많이 포함한 회의를 우선 (부분 일치만 한 회의는 감점)
+            rows = self._conn.execute(
+                scored + f"SELECT meeting, score * hits / {len(grams)}.0 AS rank, COUNT(*) OVER () FROM s "
+                f"ORDER BY rank DESC LIMIT ? OFFSET ?",
+                (json.dumps(weights), limit, offset),
+            ).fetchall()
+
+        results = [
+            {"name": m, "score": round(score, 4), **self._best_field(m, grams, query)}
+            for m, score, _ in rows
+        ]
+        return {
+            "query": query,
+            "total": rows[0][2] if rows else 0,
+            "took_ms": round((time.perf_counter() - started) * 1000, 2),
+            "results": results,
+        }
+
+    def _best_field(self, meeting: str, grams: list, query: str) -> dict:
+        """가중치가 가장 큰 일치 필드와 그 필드의 일치 위치 주변 문구"""
+        with self._lock:
+            fields = [r[0] for r in self._conn.execute(
+                "SELECT DISTINCT field FROM postings WHERE meeting = ? AND gram IN (SELECT value FROM json_each(?))",
+                (meeting, json.dumps(grams)))]
+        if not fields:  # 점수 계산과 이 조회 사이에 재색인/삭제된 경우
+            return {"field": None, "snippet": ""}
+        field = max(fields, key=lambda f: FIELD_WEIGHTS.get(f, 1.0))
+        return {"field": field, "snippet": self._snippet(meeting, field, query, grams)}
+
+    def _snippet(self, meeting: str, field: str, query: str, grams: list) -> str:
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM docs WHERE meeting = ? AND field = ?", (meeting, field)).fetchone()
+        if row is None:
+            return ""
+        body, lowered = row[0], row[0].lower()
+        pos = lowered.find(query.strip().lower())
+        if pos < 0:
+            pos = min((p for p in (lowered.find(g) for g in grams) if p >= 0), default=0)
+        start = max(0, pos - SNIPPET_CHARS)
+        end = min(len(body), pos + SNIPPET_CHARS * 2)
+        return ("…" if start else "") + body[start:end].replace("\n", " ") + ("…" if end < len(body) else "")
+
+
+search_index = SearchIndex()
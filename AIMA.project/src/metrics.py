@@ -0,0 +1,171 @@
+import os, json, time, threading
+from contextlib import contextmanager
+
+# ===================== 설정 =====================
+# METRICS_TRACE=1 이면 작업마다 단계 이벤트/소요시간을 static/data/traces/{이름}.json 으로 저장
+TRACE_ENABLED = os.getenv("METRICS_TRACE", "0") == "1"
+TRACE_DIR = os.path.join("static/data", "traces")
+
+SECONDS_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+RTF_BUCKETS = (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1, 1.5, 2, 4)
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    escaped = (
+        (k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+        for k, v in sorted(labels.items())
+    )
+    return "{" + ",".join(f'{k}="{v}"' for k, v in escaped) + "}"
+
+
+# ===================== 지표 타입 (Prometheus 텍스트 포맷) =====================
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name, self.help = name, help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{_labels(dict(k))} {v}" for k, v in self._values.items()]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets=SECONDS_BUCKETS):
+        self.name, self.help = name, help_text
+        self.buckets = tuple(buckets)
+        self._series = {}  # labels → [버킷별 개수, 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in self._series.items():
+                labels = dict(key)
+                for bound, n in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_labels({**labels, 'le': bound})} {n}")
+                lines.append(f"{self.name}_bucket{_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_labels(labels)} {round(total, 6)}")
+                lines.append(f"{self.name}_count{_labels(labels)} {count}")
+        return lines
+
+
+# ===================== 지표 정의 =====================
+STAGE_SECONDS = Histogram("aima_stage_seconds", "파이프라인 단계별 소요 시간 (초)")
+JOB_SECONDS = Histogram("aima_job_seconds", "작업 전체 소요 시간 (초)")
+JOBS = Counter("aima_jobs_total", "종료된 작업 수")
+
+STT_AUDIO_SECONDS = Counter("aima_stt_audio_seconds_total", "전사한 음성 길이 합계 (초)")
+STT_SECONDS = Counter("aima_stt_transcribe_seconds_total", "전사에 걸린 시간 합계 (초)")
+STT_RTF = Histogram("aima_stt_real_time_factor", "전사 시간 / 음성 길이", RTF_BUCKETS)
+
+LLM_SECONDS = Histogram("aima_llm_call_seconds", "LLM 호출 지연 (초)")
+LLM_CALLS = Counter("aima_llm_calls_total", "LLM 호출 수")
+LLM_TOKENS = Counter("aima_llm_tokens_total", "LLM 토큰 사용량")
+LLM_RETRIES = Counter("aima_llm_retries_total", "JSON 파싱 실패로 인한 LLM 재호출 수")
+LLM_BACKEND_SECONDS = Histogram("aima_llm_backend_seconds", "라우터가 본 백엔드별 호출 지연 (초, 실패 포함)")
+LLM_ROUTED = Counter("aima_llm_routed_total", "라우터 백엔드별 호출 결과 (ok / error / rate_limited)")
+LLM_HEDGES = Counter("aima_llm_hedges_total", "p95 초과로 두 번째 백엔드에 보낸 hedge 요청 수")
+LLM_FALLBACKS = Counter("aima_llm_fallbacks_total", "실패 후 다음 백엔드로 넘긴 횟수")
+LLM_THROTTLE_SECONDS = Counter("aima_llm_throttle_seconds_total", "RPM/TPM 한도로 호출 전 대기한 시간 합계 (초)")
+LLM_BACKOFFS = Counter("aima_llm_backoffs_total", "일시적 오류 / rate limit 후 백오프 재시도 수")
+
+TRANSCRIPT_TOKENS = Counter("aima_transcript_tokens_total", "LLM에 넣기 전 전사문 토큰 수 (form=raw / compact)")
+
+DB_WRITE_SECONDS = Histogram("aima_db_write_seconds", "DB 배치 upsert 지연 (초)")
+DB_WRITE_RETRIES = Counter("aima_db_write_retries_total", "DB 쓰기 재시도 수")
+DB_ROWS = Counter("aima_db_rows_written_total", "DB에 기록한 회의 요약 행 수")
+OUTBOX_DEAD_LETTERS = Counter("aima_outbox_dead_letters_total", "반복 실패로 dead-letter로 옮긴 outbox 기록 수")
+
+DOCX_SECONDS = Histogram("aima_docx_render_seconds", "DOCX 렌더링 요청 → 완료 (초)")
+
+_METRICS = [
+    STAGE_SECONDS, JOB_SECONDS, JOBS,
+    STT_AUDIO_SECONDS, STT_SECONDS, STT_RTF,
+    LLM_SECONDS, LLM_CALLS, LLM_TOKENS, LLM_RETRIES,
+    LLM_BACKEND_SECONDS, LLM_ROUTED, LLM_HEDGES, LLM_FALLBACKS, LLM_THROTTLE_SECONDS, LLM_BACKOFFS,
+    TRANSCRIPT_TOKENS,
+    DB_WRITE_SECONDS, DB_WRITE_RETRIES, DB_ROWS, OUTBOX_DEAD_LETTERS,
+    DOCX_SECONDS,
+]
+
+
+# ===================== 기록 헬퍼 =====================
+def observe_stt(backend: str, audio_seconds: float, elapsed: float):
+    STT_SECONDS.inc(elapsed, backend=backend)
+    if audio_seconds:
+        STT_AUDIO_SECONDS.inc(audio_seconds, backend=backend)
+        STT_RTF.observe(elapsed / audio_seconds, backend=backend)
+
+
+def record_llm_usage(message, model: str, fn: str):
+    """AIMessage의 usage_metadata(입력/출력 토큰)를 누적"""
+    usage = getattr(message, "usage_metadata", None) or {}
+    if not usage:
+        usage = (getattr(message, "response_metadata", None) or {}).get("token_usage") or {}
+        usage = {"input_tokens": usage.get("prompt_tokens", 0), "output_tokens": usage.get("completion_tokens", 0)}
+    LLM_TOKENS.inc(usage.get("input_tokens", 0), model=model, kind="prompt", fn=fn)
+    LLM_TOKENS.inc(usage.get("output_tokens", 0), model=model, kind="completion", fn=fn)
+
+
+def _cache_lines() -> list:
+    from result_cache import cache_stats
+    lines = [
+        "# HELP aima_cache_lookups_total 결과 캐시 조회 수",
+        "# TYPE aima_cache_lookups_total counter",
+    ]
+    rates = ["# HELP aima_cache_hit_ratio 결과 캐시 적중률", "# TYPE aima_cache_hit_ratio gauge"]
+    for s in cache_stats():
+        lines.append(f"aima_cache_lookups_total{_labels({'cache': s['namespace'], 'result': 'hit'})} {s['hits']}")
+        lines.append(f"aima_cache_lookups_total{_labels({'cache': s['namespace'], 'result': 'miss'})} {s['misses']}")
+        if s["hit_rate"] is not None:
+            rates.append(f"aima_cache_hit_ratio{_labels({'cache': s['namespace']})} {s['hit_rate']}")
+    return lines + rates
+
+
+def render() -> str:
+    lines = []
+    for metric in _METRICS:
+        lines += metric.render()
+    lines += _cache_lines()
+    return "\n".join(lines) + "\n"
+
+
+# ===================== 작업별 trace =====================
+def write_trace(base_filename: str, progress, **meta):
+    """작업 하나의 단계 이벤트 / 단계별 소요시간을 결과 JSON 옆(traces/)에 저장"""
+    if not TRACE_ENABLED:
+        return None
+    os.makedirs(TRACE_DIR, exist_ok=True)
+    path = os.path.join(TRACE_DIR, f"{base_filename}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({**meta, "stage_seconds": progress.stage_seconds, "events": progress.events},
+                  f, ensure_ascii=False, indent=2)
+    return path
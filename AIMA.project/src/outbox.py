@@ -0,0 +1,208 @@
+import os, json, time, random, sqlite3, threading
+
+import db_store, metrics
+from db_store import is_data_error
+
+# ===================== 설정 =====================
+OUTBOX_PATH = os.getenv("OUTBOX_PATH", os.path.join(db_store.SQLITE_DIR, "outbox.db"))
+BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+MAX_BACKOFF_SEC = float(os.getenv("OUTBOX_MAX_BACKOFF_SEC", "60"))
+# 데이터 오류(제약 위반/잘못된 payload)로 이 횟수만큼 실패한 기록은 dead-letter로 옮기고 커서를 진행
+# (연결 오류 같은 일시적 장애는 세지 않음 → DB가 죽어 있는 동안 멀쩡한 기록이 버려지지 않음)
+MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "3"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    meeting_file TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cursors (
+    target TEXT PRIMARY KEY,
+    last_seq INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS attempts (
+    target TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (target, seq)
+);
+CREATE TABLE IF NOT EXISTS dead_letters (
+    target TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    meeting_file TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    error TEXT,
+    attempts INTEGER NOT NULL,
+    failed_at REAL NOT NULL,
+    PRIMARY KEY (target, seq)
+);
+"""
+
+
+# ===================== 로컬 outbox (먼저 기록 → 나중에 전달) =====================
+class Outbox:
+    """검증된 회의 요약을 로컬 SQLite에 먼저 커밋하고, 대상 DB별 drainer가 배치로 전달
+    - 대상별 커서(last_seq)를 따로 관리 → 느린/죽은 DB가 다른 DB 전달을 막지 않음
+    - upsert가 meeting_file 기준 멱등이라 커서 갱신 전에 죽어도 재전송만 일어나고 유실은 없음"""
+
+    def __init__(self, path: str = OUTBOX_PATH, targets=None):
+        self.path = path
+        self.targets = list(targets or db_store.TARGETS)
+        self._local = threading.local()
+        self._wakeups = {t: threading.Event() for t in self.targets}
+        self._stop = threading.Event()
+        self._threads = []
+        self._errors = {t: None for t in self.targets}
+
+        dirname = os.path.dirname(path)
+        if dirname:
+            os.makedirs(dirname, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        conn.executemany("INSERT OR IGNORE INTO cursors (target, last_seq) VALUES (?, 0)",
+                         [(t,) for t in self.targets])
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        # 스레드별 커넥션 (WAL 모드라 쓰기 1개 + 읽기 여러 개 동시 가능)
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=FULL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- 기록 ----------
+    def enqueue(self, meeting_file: str, summary: dict) -> int:
+        """로컬 커밋만 하고 바로 반환 (요청 지연이 원격 DB 상태와 무관)"""
+        conn = self._conn()
+        cur = conn.execute(
+            "INSERT INTO outbox (meeting_file, payload, created_at) VALUES (?, ?, ?)",
+            (meeting_file, json.dumps(summary, ensure_ascii=False), time.time()),
+        )
+        conn.commit()
+        for event in self._wakeups.values():
+            event.set()
+        return cur.lastrowid
+
+    # ---------- 전달 ----------
+    def drain_once(self, target: str) -> int:
+        """대상 하나에 대해 커서 이후 기록을 최대 BATCH_SIZE건 전달 → 전달 건수"""
+        conn = self._conn()
+        (last_seq,) = conn.execute("SELECT last_seq FROM cursors WHERE target = ?", (target,)).fetchone()
+        rows = conn.execute(
+            "SELECT seq, meeting_file, payload FROM outbox WHERE seq > ? ORDER BY seq LIMIT ?",
+            (last_seq, BATCH_SIZE),
+        ).fetchall()
+        if not rows:
+            return 0
+
+        # 같은 회의가 배치 안에 여러 번 있으면 마지막 것만 보냄
+        latest = {}
+        for seq, meeting_file, payload in rows:
+            latest.pop(meeting_file, None)
+            latest[meeting_file] = (seq, payload)
+        try:
+            db_store.upsert_batch(target, [db_store.summary_row(f, json.loads(p)) for f, (_, p) in latest.items()])
+        except Exception as e:
+            if not is_data_error(e):
+                raise
+            # 배치 안 어느 기록이 문제인지 모르므로 한 건씩 보내고, 계속 실패하는 기록만 dead-letter
+            self._deliver_each(target, latest)
+
+        conn.execute("UPDATE cursors SET last_seq = ? WHERE target = ?", (rows[-1][0], target))
+        conn.execute("DELETE FROM attempts WHERE target = ? AND seq <= ?", (target, rows[-1][0]))
+        conn.commit()
+        return len(rows)
+
+    def _deliver_each(self, target: str, latest: dict):
+        """한 건씩 upsert. 데이터 오류는 시도 횟수를 남기고, MAX_ATTEMPTS 에 닿으면 dead_letters 로 옮김.
+        아직 한도 전이면 예외를 올려 커서를 멈춘 채 백오프 후 재시도 (이미 보낸 건은 멱등 upsert라 재전송해도 안전)"""
+        conn = self._conn()
+        for meeting_file, (seq, payload) in latest.items():
+            try:
+                db_store.upsert_batch(target, [db_store.summary_row(meeting_file, json.loads(payload))])
+                continue
+            except Exception as e:
+                if not is_data_error(e):
+                    raise
+                error = e
+            conn.execute("INSERT INTO attempts (target, seq, count) VALUES (?, ?, 1) "
+                         "ON CONFLICT(target, seq) DO UPDATE SET count = count + 1", (target, seq))
+            (count,) = conn.execute("SELECT count FROM attempts WHERE target = ? AND seq = ?",
+                                    (target, seq)).fetchone()
+            if count < MAX_ATTEMPTS:
+                conn.commit()
+                raise error
+            conn.execute("INSERT OR REPLACE INTO dead_letters VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (target, seq, meeting_file, payload, f"{type(error).__name__}: {error}", count, time.time()))
+            conn.commit()
+            metrics.OUTBOX_DEAD_LETTERS.inc(target=target)
+            print(f"☠️ outbox → {target} 기록 {seq} ({meeting_file}) {count}회 실패 → dead-letter: {error}")
+
+    def dead_letters(self, target: str = None) -> list:
+        conn = self._conn()
+        sql = "SELECT target, seq, meeting_file, error, attempts, failed_at FROM dead_letters"
+        rows = conn.execute(sql + (" WHERE target = ?" if target else "") + " ORDER BY seq",
+                            (target,) if target else ()).fetchall()
+        keys = ("target", "seq", "meeting_file", "error", "attempts", "failed_at")
+        return [dict(zip(keys, r)) for r in rows]
+
+    def _drain_loop(self, target: str):
+        backoff = 0.0
+        while not self._stop.is_set():
+            self._wakeups[target].clear()
+            try:
+                sent = self.drain_once(target)
+                self._errors[target] = None
+                backoff = 0.0
+            except Exception as e:
+                self._errors[target] = str(e)
+                backoff = min(MAX_BACKOFF_SEC, max(1.0, backoff * 2))
+                print(f"⚠️ outbox → {target} 전달 실패, {backoff:.0f}초 후 재시도:", e)
+                self._stop.wait(backoff + random.random())
+                continue
+            if sent < BATCH_SIZE:
+                # 밀린 게 없으면 전달 끝난 기록을 정리하고 새 기록이 들어올 때까지 대기
+                self.compact()
+                self._wakeups[target].wait(timeout=5)
+
+    def compact(self):
+        """모든 대상에 전달된 기록 삭제"""
+        conn = self._conn()
+        (min_seq,) = conn.execute("SELECT MIN(last_seq) FROM cursors").fetchone()
+        conn.execute("DELETE FROM outbox WHERE seq <= ?", (min_seq or 0,))
+        conn.commit()
+
+    def start(self):
+        for target in self.targets:
+            t = threading.Thread(target=self._drain_loop, args=(target,), name=f"outbox-{target}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        for event in self._wakeups.values():
+            event.set()
+        for t in self._threads:
+            t.join(timeout)
+        self.compact()
+
+    def status(self) -> dict:
+        conn = self._conn()
+        # 정리(compact)로 행이 지워져도 AUTOINCREMENT 최댓값은 sqlite_sequence에 남아 있음
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'outbox'").fetchone()
+        max_seq = row[0] if row else 0
+        cursors = dict(conn.execute("SELECT target, last_seq FROM cursors").fetchall())
+        dead = dict(conn.execute("SELECT target, COUNT(*) FROM dead_letters GROUP BY target").fetchall())
+        return {
+            t: {"last_seq": cursors.get(t, 0), "pending": max_seq - cursors.get(t, 0),
+                "last_error": self._errors[t], "dead_letters": dead.get(t, 0)}
+            for t in self.targets
+        }
+
+
+outbox = Outbox()
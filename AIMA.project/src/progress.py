@@ -0,0 +1,128 @@
+import time, json, asyncio, threading
+from contextlib import contextmanager
+
+import metrics
+
+# ===================== 파이프라인 단계 정의 =====================
+# stage: (UI 표시 문구, 시작 %, 종료 %)
+STAGES = {
+    "queue": ("⏳ 분석 대기 중", 0, 0),
+    "stt": ("🎧 음성 STT 변환", 0, 38),
+    "compact": ("✂️ 전사문 정리", 38, 40),
+    "date": ("📅 회의일자 추정", 40, 50),
+    "summary": ("🧠 회의 요약 생성", 50, 80),
+    "due": ("🗓 기한 정규화", 80, 84),
+    "db": ("💾 DB 저장 (outbox 기록)", 84, 92),
+    "json": ("📄 JSON 저장", 92, 95),
+    "docx": ("📝 DOCX 렌더링 요청", 95, 100),
+}
+TERMINAL_STAGE = "job"
+
+
+class _StageHandle:
+    def __init__(self, tracker, name):
+        self._tracker = tracker
+        self._name = name
+        self._t0 = time.perf_counter()
+        self.extra = {}
+
+    def update(self, fraction=None, **extra):
+        """단계 진행 중 중간 이벤트 (fraction: 0~1 단계 내부 진행률)"""
+        self.extra.update(extra)
+        self._tracker.emit(self._name, "progress", fraction=fraction,
+                           elapsed=round(time.perf_counter() - self._t0, 3), **extra)
+
+
+# ===================== 진행 상황 추적기 =====================
+class ProgressTracker:
+    """파이프라인 단계별 진행 이벤트를 모아두고 구독자(SSE)에게 실시간 전달"""
+
+    def __init__(self):
+        self.events = []
+        self.stage_seconds = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+
+    def emit(self, stage: str, status: str, fraction=None, **extra) -> dict:
+        label, start, end = STAGES.get(stage, (stage, None, None))
+        percent = None
+        if start is not None:
+            if status == "end":
+                percent = end
+            elif fraction is not None:
+                percent = round(start + (end - start) * min(max(fraction, 0), 1), 1)
+            else:
+                percent = start
+        elif status == "done":
+            percent = 100
+
+        with self._lock:
+            event = {
+                "seq": len(self.events),
+                "stage": stage,
+                "status": status,
+                "label": label,
+                "percent": percent,
+                "t": round(time.perf_counter() - self._t0, 3),
+                **extra,
+            }
+            self.events.append(event)
+            subscribers = list(self._subscribers)
+
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+        return event
+
+    @contextmanager
+    def stage(self, name: str):
+        """with progress.stage("summary"): ... → 시작/종료 이벤트 + 단계별 소요시간"""
+        handle = _StageHandle(self, name)
+        self.emit(name, "start")
+        try:
+            yield handle
+        except Exception as e:
+            elapsed = round(time.perf_counter() - handle._t0, 3)
+            metrics.STAGE_SECONDS.observe(elapsed, stage=name, status="error")
+            self.emit(name, "error", elapsed=elapsed, error=str(e))
+            raise
+        elapsed = round(time.perf_counter() - handle._t0, 3)
+        self.stage_seconds[name] = elapsed
+        metrics.STAGE_SECONDS.observe(elapsed, stage=name, status="ok")
+        self.emit(name, "end", elapsed=elapsed, **handle.extra)
+
+    def close(self, status: str, **extra):
+        """작업 종료 이벤트 (done / failed / cancelled) → 스트림 종료"""
+        self.emit(TERMINAL_STAGE, status, stage_seconds=self.stage_seconds, **extra)
+
+    @property
+    def closed(self) -> bool:
+        return bool(self.events) and self.events[-1]["stage"] == TERMINAL_STAGE
+
+    async def subscribe(self):
+        """지금까지의 이벤트를 먼저 재생하고, 이후 이벤트를 종료 시점까지 실시간으로 흘려준다"""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        with self._lock:
+            backlog = list(self.events)
+            self._subscribers.append((loop, queue))
+        try:
+            for event in backlog:
+                yield event
+            if backlog and backlog[-1]["stage"] == TERMINAL_STAGE:
+                return
+            while True:
+                event = await queue.get()
+                yield event
+                if event["stage"] == TERMINAL_STAGE:
+                    return
+        finally:
+            with self._lock:
+                self._subscribers.remove((loop, queue))
+
+
+async def sse_stream(tracker: ProgressTracker):
+    """Server-Sent Events 포맷으로 변환"""
+    async for event in tracker.subscribe():
+        yield f"event: {event['status'] if event['stage'] == TERMINAL_STAGE else 'progress'}\n" \
+              f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
@@ -0,0 +1,141 @@
+import os, re, sys, json, time, argparse, threading, subprocess
+from contextlib import contextmanager
+
+# ===================== 설정 =====================
+# /ready 가 200을 주려면 준비돼야 하는 하위 시스템 (콤마 구분)
+REQUIRED = [s.strip() for s in os.getenv("READY_REQUIRES", "db,catalog,llm").split(",") if s.strip()]
+# 서버 import 시점에 올라오면 안 되는 무거운 모듈 (import 시간 벤치마크에서 검사)
+HEAVY_MODULES = ("torch", "whisper", "faster_whisper", "langchain", "langchain_openai", "dateparser", "numpy")
+# `import main` 허용 시간 (ms) — 넘으면 --bench 가 실패로 종료
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "800"))
+
+PENDING, LOADING, READY, SKIPPED, FAILED = "pending", "loading", "ready", "skipped", "failed"
+
+# ===================== 하위 시스템 상태 =====================
+_state = {}
+_lock = threading.Lock()
+
+
+def _set(name: str, status: str, **extra):
+    with _lock:
+        entry = _state.setdefault(name, {"status": PENDING})
+        entry.update(status=status, **extra)
+
+
+@contextmanager
+def track(name: str):
+    """블록 실행 시간을 재서 하위 시스템 상태로 기록 (예외는 failed로 남기고 다시 던짐)"""
+    _set(name, LOADING, started_at=time.time())
+    t0 = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        _set(name, FAILED, seconds=round(time.perf_counter() - t0, 3), error=str(e))
+        raise
+    _set(name, READY, seconds=round(time.perf_counter() - t0, 3))
+
+
+def status() -> dict:
+    with _lock:
+        subsystems = {k: dict(v) for k, v in _state.items()}
+    ready = all(subsystems.get(name, {}).get("status") in (READY, SKIPPED) for name in REQUIRED)
+    return {"ready": ready, "required": REQUIRED, "subsystems": subsystems}
+
+
+# ===================== 백그라운드 워밍업 =====================
+def _load_llm():
+    # langchain / dateparser / pydantic 스키마 / 프롬프트 템플릿
+    import meeting_api  # noqa: F401
+
+
+def _load_dateparser():
+    import due_dates
+    due_dates.warmup()
+
+
+def _load_stt():
+    import stt_registry
+    stt_registry.preload()
+
+
+def start_warmup(preload_stt: bool = True) -> threading.Thread:
+    """서버는 바로 요청을 받고, 무거운 스택은 별도 스레드에서 순서대로 로드 (/ready 로 진행 확인)"""
+    steps = [("llm", _load_llm), ("dateparser", _load_dateparser)]
+    if preload_stt:
+        steps.append(("stt", _load_stt))
+    else:
+        # 첫 STT 작업에서 로드
+        _set("stt", SKIPPED, reason="WHISPER_PRELOAD=0")
+    for name, _ in steps:
+        _set(name, PENDING)
+
+    def run():
+        for name, load in steps:
+            try:
+                with track(name):
+                    load()
+            except Exception as e:
+                print(f"⚠️ {name} 워밍업 실패: {e}")
+
+    thread = threading.Thread(target=run, name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+# ===================== import 시간 벤치마크 =====================
+_PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import main
+elapsed = time.perf_counter() - t0
+print(json.dumps({"ms": elapsed * 1000, "heavy": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def benchmark_import(module_dir: str, runs: int = 3) -> dict:
+    """새 인터프리터에서 `import main` 시간을 재고, -X importtime 으로 가장 오래 걸린 모듈을 뽑음"""
+    samples, heavy = [], []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", _PROBE % (HEAVY_MODULES,)], cwd=module_dir,
+                             capture_output=True, text=True, check=True)
+        probe = json.loads(out.stdout.strip().splitlines()[-1])
+        samples.append(probe["ms"])
+        heavy = probe["heavy"]
+
+    trace = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=module_dir,
+                           capture_output=True, text=True)
+    modules = []
+    for line in trace.stderr.splitlines():
+        m = re.match(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)", line)
+        if m:
+            modules.append((int(m.group(2)), m.group(4).strip()))
+    top = sorted(modules, reverse=True)[:10]
+
+    samples.sort()
+    return {
+        "runs": runs,
+        "median_ms": round(samples[len(samples) // 2], 1),
+        "max_ms": round(samples[-1], 1),
+        "heavy_loaded": heavy,
+        "top_cumulative_ms": [{"module": name, "ms": round(us / 1000, 1)} for us, name in top],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="서버 import 시간 측정 (시작 지연 회귀 검사)")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    report = benchmark_import(os.path.dirname(os.path.abspath(__file__)), args.runs)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    failed = False
+    if report["heavy_loaded"]:
+        print(f"❌ import main 시점에 무거운 모듈 로드됨: {', '.join(report['heavy_loaded'])}")
+        failed = True
+    if report["median_ms"] > args.budget_ms:
+        print(f"❌ import 시간 {report['median_ms']}ms > 허용 {args.budget_ms}ms")
+        failed = True
+    if not failed:
+        print(f"✅ import main {report['median_ms']}ms (허용 {args.budget_ms}ms)")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,165 @@
+import os, json, time, hashlib, threading
+
+# ===================== 설정 =====================
+CACHE_DIR = os.getenv("RESULT_CACHE_DIR", "cache")
+CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "2000"))
+CACHE_MAX_MB = float(os.getenv("RESULT_CACHE_MAX_MB", "512"))
+CACHE_MAX_AGE_DAYS = float(os.getenv("RESULT_CACHE_MAX_AGE_DAYS", "90"))
+# 디렉터리 전체를 훑는 정리는 한도를 넘었을 때 / 이 주기마다만 (put 마다 O(N) 스캔 방지)
+CACHE_SWEEP_SEC = float(os.getenv("RESULT_CACHE_SWEEP_SEC", "600"))
+# 한도를 넘으면 이 비율까지 줄여서 바로 다음 put 에서 또 정리하지 않도록
+EVICT_TARGET = 0.9
+
+
+# ===================== 키 생성 =====================
+_audio_hash_memo = {}
+
+
+def audio_hash(path: str) -> str:
+    """음성 파일 내용 해시 (같은 파일은 크기+수정시각이 바뀌기 전까지 다시 읽지 않음)"""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    cached = _audio_hash_memo.get(memo_key)
+    if cached:
+        return cached
+
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(block)
+    digest = h.hexdigest()
+    _audio_hash_memo[memo_key] = digest
+    return digest
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def prompt_version(template) -> str:
+    """프롬프트 템플릿 문자열 기반 버전 → 프롬프트를 고치면 LLM 캐시만 자동 무효화"""
+    raw = getattr(template, "template", template)
+    return hashlib.sha256(str(raw).encode("utf-8")).hexdigest()[:12]
+
+
+def make_key(*parts) -> str:
+    raw = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ===================== 디스크 캐시 =====================
+class ResultCache:
+    """namespace별 JSON 파일 캐시 (오래된 항목부터 개수/용량/기간 기준으로 정리)"""
+
+    def __init__(self, namespace: str, root: str = CACHE_DIR, max_entries: int = CACHE_MAX_ENTRIES,
+                 max_mb: float = CACHE_MAX_MB, max_age_days: float = CACHE_MAX_AGE_DAYS):
+        self.namespace = namespace
+        self.dir = os.path.join(root, namespace)
+        self.max_entries = max_entries
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_age = max_age_days * 86400
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # 항목 수 / 총 용량은 put 때 증분으로 관리 (None = 아직 한 번도 스캔 안 함)
+        self._count = None
+        self._bytes = 0
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.dir, key[:2], f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                raise FileNotFoundError(path)
+            with open(path, encoding="utf-8") as f:
+                value = json.load(f)["value"]
+            os.utime(path)  # LRU: 최근 사용 시각 갱신
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return value
+
+    def put(self, key: str, value, **meta):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "meta": meta, "created_at": time.time(), "value": value},
+                      f, ensure_ascii=False)
+        size = os.path.getsize(tmp)
+        try:
+            old = os.path.getsize(path)
+        except OSError:
+            old = None
+        os.replace(tmp, path)
+
+        with self._lock:
+            if self._count is not None:
+                self._count += old is None
+                self._bytes += size - (old or 0)
+            sweep = (self._count is None or self._count > self.max_entries or self._bytes > self.max_bytes
+                     or time.time() - self._last_sweep > CACHE_SWEEP_SEC)
+        if sweep:
+            self.evict()
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.dir):
+            for name in files:
+                if name.endswith(".json"):
+                    p = os.path.join(root, name)
+                    try:
+                        st = os.stat(p)
+                    except OSError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, p))
+        return entries
+
+    def evict(self):
+        """기간 초과 항목 삭제 후, 개수/용량 한도를 넘으면 가장 오래 안 쓴 것부터 한도의 90%까지 삭제"""
+        with self._lock:
+            now = time.time()
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            keep = len(entries)
+            over = keep > self.max_entries or total > self.max_bytes
+            max_entries = int(self.max_entries * EVICT_TARGET) if over else self.max_entries
+            max_bytes = int(self.max_bytes * EVICT_TARGET) if over else self.max_bytes
+            for mtime, size, p in entries:
+                expired = now - mtime > self.max_age
+                if not expired and keep <= max_entries and total <= max_bytes:
+                    break
+                try:
+                    os.remove(p)
+                    self.evictions += 1
+                except OSError:
+                    pass
+                keep -= 1
+                total -= size
+            self._count, self._bytes, self._last_sweep = keep, total, now
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+        }
+
+
+# 음성 → 전사 결과 / 프롬프트 → LLM JSON 을 따로 저장 (프롬프트만 바뀌면 전사는 재사용)
+transcript_cache = ResultCache("transcripts")
+llm_cache = ResultCache("llm")
+
+
+def cache_stats() -> list:
+    return [transcript_cache.stats(), llm_cache.stats()]
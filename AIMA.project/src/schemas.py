@@ -0,0 +1,24 @@
+from typing import List, Optional
+from pydantic import BaseModel
+
+# ===================== Pydantic 구조 =====================
+class ActionItem(BaseModel):
+    name: str
+    task: str
+    due: Optional[str]
+
+class MeetingSummary(BaseModel):
+    topic_summary: str
+    content_summary: str
+    decisions: List[str]
+    action_items: List[ActionItem]
+
+class MeetingExtraction(MeetingSummary):
+    """단일 호출 추출용 스키마 (structured output) — 회의일자 포함"""
+    meeting_date: Optional[str]
+
+class SummaryOverview(BaseModel):
+    """map-reduce 요약의 reduce 단계 출력 (액션아이템은 규칙 기반으로 병합)"""
+    topic_summary: str
+    content_summary: str
+    decisions: List[str]
@@ -0,0 +1,121 @@
+import os, threading
+from abc import ABC, abstractmethod
+
+# ===================== 설정 =====================
+# 배포 단위 기본 백엔드 (요청별로 backend 파라미터로 덮어쓸 수 있음)
+STT_BACKEND = os.getenv("STT_BACKEND", "whisper")
+# faster-whisper(CTranslate2) 옵션
+FW_DEVICE = os.getenv("FW_DEVICE", "cpu")
+FW_COMPUTE_TYPE = os.getenv("FW_COMPUTE_TYPE", "int8")      # int8 / int8_float16 / float16 / float32
+FW_CPU_THREADS = int(os.getenv("FW_CPU_THREADS", "0"))       # 0 = CTranslate2 기본값
+FW_NUM_WORKERS = int(os.getenv("FW_NUM_WORKERS", "1"))       # 동시 transcribe 가능 개수
+FW_BATCH_SIZE = int(os.getenv("FW_BATCH_SIZE", "8"))         # 0이면 배치 파이프라인 미사용
+FW_BEAM_SIZE = int(os.getenv("FW_BEAM_SIZE", "5"))
+
+
+# ===================== 백엔드 인터페이스 =====================
+class STTBackend(ABC):
+    """STT 엔진 공통 인터페이스. transcribe()는 항상 {"text", "segments"} 형태로 반환"""
+    name = "base"
+
+    def __init__(self, size: str, **options):
+        self.size = size
+        self.options = options
+
+    @abstractmethod
+    def transcribe(self, audio, language: str = "ko", **kwargs) -> dict:
+        ...
+
+    def memory_bytes(self) -> int:
+        return 0
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "size": self.size, **self.options}
+
+
+class WhisperBackend(STTBackend):
+    """openai-whisper (PyTorch) 엔진"""
+    name = "whisper"
+
+    def __init__(self, size: str, **options):
+        import torch, whisper
+        super().__init__(size, **options)
+        self._fp16 = torch.cuda.is_available()
+        self.model = whisper.load_model(size)
+        # Whisper 디코딩은 모델 모듈에 kv-cache hook을 붙였다 떼므로 같은 인스턴스 동시 추론 금지
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio, language: str = "ko", **kwargs) -> dict:
+        kwargs.setdefault("fp16", self._fp16)
+        with self._lock:
+            result = self.model.transcribe(audio, language=language, **kwargs)
+        return {
+            "text": result["text"].strip(),
+            "segments": [{"start": s["start"], "end": s["end"], "text": s["text"].strip()}
+                         for s in result.get("segments", [])],
+        }
+
+    def memory_bytes(self) -> int:
+        params = sum(p.numel() * p.element_size() for p in self.model.parameters())
+        buffers = sum(b.numel() * b.element_size() for b in self.model.buffers())
+        return params + buffers
+
+    def describe(self) -> dict:
+        return {**super().describe(), "device": str(next(self.model.parameters()).device)}
+
+
+class FasterWhisperBackend(STTBackend):
+    """faster-whisper (CTranslate2) 엔진 — CPU int8 양자화로 같은 모델 대비 지연 감소"""
+    name = "faster-whisper"
+
+    def __init__(self, size: str, device: str = FW_DEVICE, compute_type: str = FW_COMPUTE_TYPE,
+                 cpu_threads: int = FW_CPU_THREADS, num_workers: int = FW_NUM_WORKERS,
+                 batch_size: int = FW_BATCH_SIZE, beam_size: int = FW_BEAM_SIZE):
+        from faster_whisper import WhisperModel
+        super().__init__(size, device=device, compute_type=compute_type, cpu_threads=cpu_threads,
+                         num_workers=num_workers, batch_size=batch_size, beam_size=beam_size)
+        self.model = WhisperModel(size, device=device, compute_type=compute_type,
+                                  cpu_threads=cpu_threads, num_workers=num_workers)
+        self._pipeline = None
+        if batch_size > 0:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                self._pipeline = BatchedInferencePipeline(model=self.model)
+            except ImportError:
+                print("⚠️ 설치된 faster-whisper에 BatchedInferencePipeline이 없어 순차 디코딩을 사용합니다.")
+        # CTranslate2는 num_workers 개까지 동시 추론 가능
+        self._slots = threading.BoundedSemaphore(max(1, num_workers))
+
+    def transcribe(self, audio, language: str = "ko", **kwargs) -> dict:
+        kwargs.pop("fp16", None)
+        kwargs.setdefault("beam_size", self.options["beam_size"])
+        with self._slots:
+            if self._pipeline is not None:
+                segments, _ = self._pipeline.transcribe(audio, language=language,
+                                                        batch_size=self.options["batch_size"], **kwargs)
+            else:
+                segments, _ = self.model.transcribe(audio, language=language, **kwargs)
+            # segments는 generator → 여기서 끝까지 소비해야 실제 디코딩이 끝남
+            segments = [{"start": s.start, "end": s.end, "text": s.text.strip()} for s in segments]
+        return {"text": " ".join(s["text"] for s in segments).strip(), "segments": segments}
+
+    def memory_bytes(self) -> int:
+        # CTranslate2는 파라미터 크기를 노출하지 않으므로 변환된 가중치 파일 크기로 추정
+        try:
+            from faster_whisper.utils import download_model
+            model_dir = download_model(self.size, local_files_only=True)
+            return os.path.getsize(os.path.join(model_dir, "model.bin"))
+        except Exception:
+            return 0
+
+
+BACKENDS = {
+    WhisperBackend.name: WhisperBackend,
+    FasterWhisperBackend.name: FasterWhisperBackend,
+}
+
+
+def create_backend(name: str, size: str, **options) -> STTBackend:
+    if name not in BACKENDS:
+        raise ValueError(f"❌ 지원하지 않는 STT 백엔드: {name} (가능: {', '.join(BACKENDS)})")
+    return BACKENDS[name](size, **options)
@@ -0,0 +1,91 @@
+import os, time, threading
+
+from stt_backend import STT_BACKEND, create_backend
+
+# ===================== 설정 =====================
+# 서버 시작 시 미리 올려둘 모델 (콤마 구분, "backend:size" 또는 "size", 예: "small,faster-whisper:large-v3")
+PRELOAD_MODELS = [s.strip() for s in os.getenv("WHISPER_PRELOAD_MODELS", "small").split(",") if s.strip()]
+# 워밍업용 음성 파일 경로 (없으면 1초 무음으로 워밍업, "off"면 생략)
+WARMUP_AUDIO = os.getenv("WHISPER_WARMUP_AUDIO", "")
+DEFAULT_MODEL_SIZE = os.getenv("WHISPER_MODEL", "small")
+SAMPLE_RATE = 16000
+
+# ===================== 모델 레지스트리 =====================
+# 프로세스 전체에서 (백엔드, 모델 크기, 옵션)별로 한 번만 로드해서 공유한다.
+_models = {}
+_model_info = {}
+_registry_lock = threading.Lock()
+
+
+def _registry_key(size: str, backend: str, options: dict) -> tuple:
+    return (backend, size, tuple(sorted(options.items())))
+
+
+def get_model(size: str = DEFAULT_MODEL_SIZE, backend: str = None, **options):
+    """STT 백엔드 인스턴스가 이미 올라와 있으면 그대로 반환, 없으면 최초 1회만 로드"""
+    backend = backend or STT_BACKEND
+    key = _registry_key(size, backend, options)
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _registry_lock:
+        if key not in _models:
+            print(f"📦 STT 모델 로드 중... ({backend}:{size})")
+            t0 = time.perf_counter()
+            _models[key] = create_backend(backend, size, **options)
+            _model_info[key] = {
+                "load_seconds": round(time.perf_counter() - t0, 2),
+                "loaded_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "warmed_up": False,
+            }
+            print(f"✅ STT 모델 로드 완료 ({backend}:{size}, {_model_info[key]['load_seconds']}초)")
+        return _models[key]
+
+
+def transcribe(audio, size: str = DEFAULT_MODEL_SIZE, backend: str = None, backend_options: dict = None,
+               **kwargs) -> dict:
+    """공유 모델로 변환 (audio는 파일 경로 또는 16kHz float32 배열) → {"text", "segments"}"""
+    return get_model(size, backend, **(backend_options or {})).transcribe(audio, **kwargs)
+
+
+def warmup(size: str = DEFAULT_MODEL_SIZE, audio_path: str = WARMUP_AUDIO, backend: str = None) -> float:
+    """첫 요청의 커널/메모리 초기화 비용을 미리 치러두기 위한 짧은 변환"""
+    if audio_path == "off":
+        return 0.0
+    if audio_path and os.path.exists(audio_path):
+        from chunked_stt import load_segment
+        audio = load_segment(audio_path, 0, 10)
+    else:
+        import numpy as np
+        audio = np.zeros(SAMPLE_RATE, dtype=np.float32)
+
+    backend = backend or STT_BACKEND
+    t0 = time.perf_counter()
+    transcribe(audio, size=size, backend=backend, language="ko")
+    elapsed = time.perf_counter() - t0
+    info = _model_info[_registry_key(size, backend, {})]
+    info["warmed_up"] = True
+    info["warmup_seconds"] = round(elapsed, 2)
+    print(f"🔥 STT 워밍업 완료 ({backend}:{size}, {elapsed:.2f}초)")
+    return elapsed
+
+
+def preload(specs=None, warmup_audio: str = WARMUP_AUDIO):
+    """FastAPI startup 시점에 설정된 모델들을 올리고 워밍업"""
+    for spec in specs or PRELOAD_MODELS:
+        backend, _, size = spec.rpartition(":")
+        get_model(size, backend or None)
+        warmup(size, warmup_audio, backend or None)
+
+
+def resident_models() -> list:
+    """현재 메모리에 올라와 있는 모델 목록과 메모리 사용량"""
+    out = []
+    for key, model in list(_models.items()):
+        out.append({
+            **model.describe(),
+            "memory_mb": round(model.memory_bytes() / 1024 / 1024, 1),
+            **_model_info.get(key, {}),
+        })
+    return out
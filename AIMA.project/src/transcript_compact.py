@@ -0,0 +1,328 @@
+import os, re, json, time, argparse
+from difflib import SequenceMatcher
+
+import metrics
+from long_summary import estimate_tokens
+
+# ===================== 설정 =====================
+# STT 원문 → LLM 프롬프트 사이에서 인사/군말·STT 잡음·반복 문장을 덜어냄 (0이면 원문 그대로)
+# 실제 LLM으로 원문/압축본 추출 비교(`--llm`)를 확인한 뒤 켜도록 기본값은 꺼짐
+COMPACT_ENABLED = os.getenv("TRANSCRIPT_COMPACT", "0") == "1"
+# 최근 DUP_LOOKBACK개 문장과 이 유사도 이상이면 중복 문장으로 제거
+DUP_SIMILARITY = float(os.getenv("COMPACT_DUP_SIMILARITY", "0.9"))
+DUP_LOOKBACK = int(os.getenv("COMPACT_DUP_LOOKBACK", "40"))
+# 액션아이템 후보 문장 키워드 (compare_actionitem_llm.py 후보 필터와 같은 목록) — 후보 문장은 군말 규칙으로 지우지 않음
+ACTION_KEYWORDS = ("까지", "해야", "결정", "완료", "진행", "작성", "검토")
+
+TURN = re.compile(r"^(\S{1,10}): ", re.M)
+SENTENCE_END = re.compile(r"(?<=[.?!])\s+")
+# 문장 앞 군말 ("네, ", "음 ", "좋아요, " ...)
+LEADING_FILLER = re.compile(r"^(?:(?:음|어|아|에)\s+|(?:네|예|자|음|어|아|좋아요|좋습니다|좋네요|알겠습니다)[,.!]\s*)+")
+FILLER_ONLY = re.compile(r"[네예음어아에\s,.!?…~]*")
+# 정보 없는 인사/맺음말 (문장 전체가 이것뿐일 때만)
+PLEASANTRY = re.compile(r"(?:모두\s*)?(?:안녕하세요|반갑습니다|수고\s*많(?:았|으셨)습니다|수고하셨습니다|감사합니다|고맙습니다)[.!]?")
+# Whisper가 무음/잡음 구간에서 지어내는 흔한 문장
+HALLUCINATION = re.compile(r"시청해\s?주셔서 감사합니다|구독과 좋아요|자막 제공|MBC 뉴스|다음 영상에서 만나요")
+# 같은 단어/구절이 연달아 반복되는 디코딩 루프
+WORD_LOOP = re.compile(r"(\b\S+)(?:\s+\1\b){2,}")
+PHRASE_LOOP = re.compile(r"(.{4,40}?)(?:\s*\1){2,}")
+# 마무리 발언의 배정 절 ("윤성은 데이터 전처리 문서 금요일까지") / 기한 표현
+CLAUSE_SPLIT = re.compile(r",\s*")
+DUE_PHRASE = re.compile(r"(\S+?)\s*(오전|오후|저녁|밤)?\s*까지")
+
+
+# ===================== 분할 =====================
+def split_turns(text: str) -> list:
+    """화자 표기(이름: ...)가 있으면 [(화자, 발화)], 없으면(Whisper 원문) [(None, 전체)]"""
+    marks = list(TURN.finditer(text))
+    if len(marks) < 2:
+        return [(None, text)]
+    turns = []
+    for i, m in enumerate(marks):
+        end = marks[i + 1].start() if i + 1 < len(marks) else len(text)
+        turns.append((m.group(1), text[m.end():end]))
+    return turns
+
+
+def split_sentences(body: str) -> list:
+    body = re.sub(r"\s+", " ", body).strip()
+    return [s.strip() for s in SENTENCE_END.split(body) if s.strip()]
+
+
+def is_action_candidate(sentence: str) -> bool:
+    return any(k in sentence for k in ACTION_KEYWORDS)
+
+
+def action_candidates(text: str) -> list:
+    """액션아이템이 될 가능성이 있는 문장만 (키워드 필터)"""
+    return [s for _, body in split_turns(text) for s in split_sentences(body) if is_action_candidate(s)]
+
+
+# ===================== 문장 단위 정리 =====================
+def _key(sentence: str) -> str:
+    return re.sub(r"[\W_]+", "", sentence)
+
+
+def clean_sentence(sentence: str):
+    """→ (정리된 문장 또는 None, 사유). 액션 후보 문장은 앞 군말만 떼고 남김"""
+    if HALLUCINATION.search(sentence):
+        return None, "artifact"
+    fixed = PHRASE_LOOP.sub(r"\1", WORD_LOOP.sub(r"\1", sentence))
+    reason = "artifact" if fixed != sentence else None
+    fixed = LEADING_FILLER.sub("", fixed).strip()
+    if not is_action_candidate(fixed) and (FILLER_ONLY.fullmatch(fixed) or PLEASANTRY.fullmatch(fixed)):
+        return None, "filler"
+    return fixed, reason
+
+
+class _Recent:
+    """최근 문장과의 (거의) 중복 판정 — 정확히 같은 문장은 전체 범위, 유사 문장은 최근 DUP_LOOKBACK개"""
+
+    def __init__(self):
+        self.seen, self.recent = set(), []
+
+    def duplicate(self, sentence: str) -> bool:
+        key = _key(sentence)
+        if not key:
+            return False
+        if key in self.seen:
+            return True
+        for prev in self.recent:
+            matcher = SequenceMatcher(None, prev, key, autojunk=False)
+            if matcher.real_quick_ratio() >= DUP_SIMILARITY and matcher.quick_ratio() >= DUP_SIMILARITY \
+                    and matcher.ratio() >= DUP_SIMILARITY:
+                return True
+        return False
+
+    def add(self, sentence: str):
+        key = _key(sentence)
+        self.seen.add(key)
+        self.recent = (self.recent + [key])[-DUP_LOOKBACK:]
+
+
+# ===================== 마무리 발언 (배정 재확인) =====================
+def _assignment(clause: str, speakers=None):
+    """'윤성은 ... 금요일까지' → (화자, 기한 단어, 시간대, 작업 단어들) / 배정 절이 아니면 None
+    (speakers=None 이면 화자 표기 없는 원문 — 짧은 이름 + 기한이 있는 절만 인정)"""
+    m = re.match(r"(\S+?)(?:님)?(?:은|는|이|가)\s", clause)
+    if not m or (m.group(1) not in speakers if speakers is not None else len(m.group(1)) > 4):
+        return None
+    due = DUE_PHRASE.search(clause)
+    if speakers is None and due is None:
+        return None
+    words = [w for w in clause[m.end():due.start() if due else len(clause)].split() if len(w) >= 2]
+    return m.group(1), due.group(1) if due else None, due.group(2) if due else None, words
+
+
+def recap_assignments(sentence: str, speakers=None):
+    """여러 사람의 배정을 한 문장에 늘어놓은 마무리 발언이면 절별 배정 목록, 아니면 None
+    (화자 표기가 없으면 오탐을 줄이려고 배정 절 3개 이상일 때만)"""
+    parsed = [_assignment(c, speakers) for c in CLAUSE_SPLIT.split(sentence)]
+    return parsed if sum(1 for p in parsed if p) >= (2 if speakers is not None else 3) else None
+
+
+def _covered(assignment, said: list) -> bool:
+    """같은 사람이 앞서 같은 기한(+시간대)과 같은 작업 단어로 직접 말한 적이 있으면 중복"""
+    name, due, tod, words = assignment
+    if due is None:
+        return False
+    for sentence in said:
+        if "까지" in sentence and due in sentence and (tod is None or tod in sentence) \
+                and any(w[:2] in sentence for w in words):
+            return True
+    return False
+
+
+def compact_recap(sentence: str, speaker, said: dict):
+    """마무리 발언에서 본인이 앞서 말한 내용과 겹치는 배정 절만 제거
+    (기한/시간대가 바뀌었거나 새 작업이면 남김) → (문장 또는 None, 제거한 절 수).
+    화자 표기가 없으면(speaker=None) 누가 앞서 말했는지 알 수 없으므로 절을 지우지 않음"""
+    if speaker is None:
+        return sentence, 0
+    parsed = recap_assignments(sentence, set(said) - {speaker})
+    if parsed is None:
+        return sentence, 0
+    clauses = CLAUSE_SPLIT.split(sentence)
+    kept = [c for c, p in zip(clauses, parsed) if not (p and _covered(p, said[p[0]]))]
+    removed = len(clauses) - len(kept)
+    if not kept:
+        return None, removed
+    text = ", ".join(kept)
+    return (text if text[-1] in ".?!" else text + "."), removed
+
+
+# ===================== 압축 =====================
+def compact_transcript(text: str):
+    """화자 발화 단위로 나눠 군말·STT 잡음·중복 문장·되풀이된 배정 절을 제거 → (압축본, 통계)"""
+    turns = split_turns(text)
+    # 화자별로 남긴 문장 (마무리 발언 중복 판정용, 화자 표기가 없으면 None 하나에 모음)
+    said = {s: [] for s, _ in turns}
+    recent = _Recent()
+    dropped = {"filler": 0, "artifact": 0, "duplicate": 0, "recap": 0}
+    out_turns, total = [], 0
+
+    for speaker, body in turns:
+        kept = []
+        for sentence in split_sentences(body):
+            total += 1
+            cleaned, reason = clean_sentence(sentence)
+            if reason:
+                dropped[reason] += 1
+            if cleaned is None:
+                continue
+            cleaned, removed = compact_recap(cleaned, speaker, said)
+            dropped["recap"] += removed
+            if cleaned is None:
+                continue
+            if recent.duplicate(cleaned):
+                dropped["duplicate"] += 1
+                continue
+            recent.add(cleaned)
+            kept.append(cleaned)
+            said[speaker].append(cleaned)
+        if kept:
+            out_turns.append((speaker, " ".join(kept)))
+
+    compacted = "\n".join(f"{s}: {body}" if s else body for s, body in out_turns)
+    before, after = estimate_tokens(text), estimate_tokens(compacted)
+    stats = {
+        "tokens_before": before,
+        "tokens_after": after,
+        "reduction": round(1 - after / before, 3) if before else 0.0,
+        "sentences": total,
+        "turns": len(turns),
+        "dropped": dropped,
+        "action_candidates": sum(1 for _, body in out_turns for s in split_sentences(body) if is_action_candidate(s)),
+    }
+    return compacted, stats
+
+
+def prepare(text: str):
+    """파이프라인용: 설정이 켜져 있으면 압축본, 아니면 원문 → (프롬프트에 넣을 전사문, 통계)"""
+    if not COMPACT_ENABLED:
+        tokens = estimate_tokens(text)
+        return text, {"enabled": False, "tokens_before": tokens, "tokens_after": tokens, "reduction": 0.0}
+    compacted, stats = compact_transcript(text)
+    metrics.TRANSCRIPT_TOKENS.inc(stats["tokens_before"], form="raw")
+    metrics.TRANSCRIPT_TOKENS.inc(stats["tokens_after"], form="compact")
+    return compacted, {"enabled": True, **stats}
+
+
+# ===================== 평가 (원문 vs 압축본) =====================
+def strip_speakers(text: str) -> str:
+    """화자 표기를 지워 Whisper 원문처럼 만듦"""
+    return " ".join(TURN.sub("", text).split())
+
+
+def assignment_coverage(raw: str, compacted: str) -> float:
+    """원문 마무리 발언의 배정(화자+기한)이 압축본에서도 읽히는 비율 (오프라인 품질 대리 지표)"""
+    turns = split_turns(raw)
+    speakers = {s for s, _ in turns if s}
+    expected = []
+    for speaker, body in turns:
+        for sentence in split_sentences(body):
+            parsed = recap_assignments(sentence, speakers - {speaker} if speaker else None)
+            expected += [p for p in parsed or [] if p and p[1]]
+    if not expected:
+        return 1.0
+    kept = split_turns(compacted)
+    hits = 0
+    for name, due, tod, words in expected:
+        # 화자 표기가 없으면 이름과 기한이 같은 문장에 함께 남아 있어야 보존으로 봄
+        said = [s for speaker, body in kept for s in split_sentences(body)
+                if speaker == name or (speaker is None and name in s)]
+        recap = [c for _, body in kept for s in split_sentences(body) for c in CLAUSE_SPLIT.split(s)
+                 if c.startswith(name)]
+        if _covered((name, due, tod, words), said) or any(due in c for c in recap):
+            hits += 1
+    return round(hits / len(expected), 3)
+
+
+def compare_extractions(reference: dict, candidate: dict) -> dict:
+    """원문 추출(reference) 대비 압축본 추출(candidate)의 액션아이템 일치도 (담당자 + 작업 유사도 + 기한)"""
+    from long_summary import _norm, DEDUP_SIMILARITY
+    ref, cand = reference.get("action_items", []), list(candidate.get("action_items", []))
+    matched = due_same = 0
+    for item in ref:
+        for other in cand:
+            if _norm(other["name"]) == _norm(item["name"]) and SequenceMatcher(
+                    None, _norm(other["task"]), _norm(item["task"])).ratio() >= DEDUP_SIMILARITY:
+                matched += 1
+                due_same += _norm(other.get("due")) == _norm(item.get("due"))
+                cand.remove(other)
+                break
+    precision = matched / len(candidate.get("action_items", [])) if candidate.get("action_items") else 1.0
+    recall = matched / len(ref) if ref else 1.0
+    return {
+        "reference_items": len(ref),
+        "candidate_items": len(candidate.get("action_items", [])),
+        "f1": round(2 * precision * recall / (precision + recall), 3) if precision + recall else 0.0,
+        "due_agreement": round(due_same / matched, 3) if matched else None,
+        "meeting_date_same": reference.get("meeting_date") == candidate.get("meeting_date"),
+    }
+
+
+def evaluate(texts: dict, llm: bool = False) -> dict:
+    """회의별 토큰 절감 / 배정 보존율, llm=True면 원문·압축본을 실제로 요약시켜 추출 결과까지 비교"""
+    rows = {}
+    for name, raw in texts.items():
+        compacted, stats = compact_transcript(raw)
+        row = {**stats, "assignment_coverage": assignment_coverage(raw, compacted)}
+        if llm:
+            from meeting_api import extract_meeting
+            t0 = time.perf_counter()
+            reference = extract_meeting(raw)
+            t1 = time.perf_counter()
+            candidate = extract_meeting(compacted)
+            t2 = time.perf_counter()
+            row.update(llm_seconds_raw=round(t1 - t0, 2), llm_seconds_compact=round(t2 - t1, 2),
+                       **compare_extractions(reference, candidate))
+        rows[name] = row
+
+    def mean(key):
+        values = [r[key] for r in rows.values() if r.get(key) is not None]
+        return round(sum(values) / len(values), 3) if values else None
+
+    total_before = sum(r["tokens_before"] for r in rows.values())
+    total_after = sum(r["tokens_after"] for r in rows.values())
+    summary = {
+        "meetings": len(rows),
+        "tokens_before": total_before,
+        "tokens_after": total_after,
+        "reduction": round(1 - total_after / total_before, 3) if total_before else 0.0,
+        "assignment_coverage": mean("assignment_coverage"),
+    }
+    if llm:
+        summary.update(f1=mean("f1"), due_agreement=mean("due_agreement"),
+                       llm_seconds_raw=mean("llm_seconds_raw"), llm_seconds_compact=mean("llm_seconds_compact"))
+    return {"summary": summary, "meetings": rows}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="전사문 압축 평가 (토큰 절감 / 배정 보존 / LLM 추출 비교)")
+    parser.add_argument("files", nargs="*", help="전사문 텍스트 파일 (없으면 generate_mock_meetings 스크립트)")
+    parser.add_argument("--unlabeled", action="store_true", help="화자 표기를 지우고 평가 (Whisper 원문 형태)")
+    parser.add_argument("--llm", action="store_true", help="원문/압축본을 실제 LLM으로 추출해 액션아이템 비교")
+    parser.add_argument("--show", action="store_true", help="첫 회의의 압축본 출력")
+    parser.add_argument("--out", default=None, help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    if args.files:
+        texts = {}
+        for path in args.files:
+            with open(path, encoding="utf-8") as f:
+                texts[os.path.basename(path)] = f.read()
+    else:
+        import generate_mock_meetings as mock
+        texts = {f"mock_{i}": script for i, script in mock.scripts.items()}
+    if args.unlabeled:
+        texts = {name: strip_speakers(text) for name, text in texts.items()}
+
+    if args.show:
+        print(compact_transcript(next(iter(texts.values())))[0] + "\n")
+    report = evaluate(texts, llm=args.llm)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 {args.out}")
@@ -7,6 +7,9 @@ let newMeetingFiles = [],
   calendar;
 let currentMeetingFile = null,
   editIndex = null;
+// 전체 회의 액션아이템 (서버 변경분만 받아서 병합)
+let allActionItems = new Map(),
+  actionVersion = 0;
 
 // =========================
 // DOM 참조
@@ -47,6 +50,7 @@ newMeetingBtn.addEventListener("click", async () => {
   try {
     const res = await fetch("/api/wav_list");
     const data = await res.json();
+    analyzedMeetings = data.analyzed || [];
     newMeetingFiles = data.files.filter((f) => !analyzedMeetings.includes(f));
     wavList.innerHTML = "";
     newMeetingFiles.forEach((f) => {
@@ -66,11 +70,21 @@ closeModalBtn.onclick = () => (modal.style.display = "none");
 // =========================
 // 회의 목록 모달
 // =========================
-meetingListBtn.onclick = () => {
+meetingListBtn.onclick = async () => {
   listModal.style.display = "flex";
-  doneList.innerHTML = analyzedMeetings.length
-    ? analyzedMeetings.map((f) => `<li style='cursor:pointer'>📄 ${f}</li>`).join("")
-    : "<li>아직 분석 완료된 회의가 없습니다.</li>";
+  doneList.innerHTML = "<li>🔄 불러오는 중...</li>";
+  try {
+    // 서버 카탈로그에서 최신 회의 순으로 조회 (ETag로 변경 없으면 304 재사용)
+    const res = await fetch("/api/meetings?page=1&size=100");
+    const data = await res.json();
+    doneList.innerHTML = data.items.length
+      ? data.items
+          .map((m) => `<li style='cursor:pointer'>📄 ${m.name}</li>`)
+          .join("")
+      : "<li>아직 분석 완료된 회의가 없습니다.</li>";
+  } catch {
+    doneList.innerHTML = "<li>❌ 회의 목록을 불러오지 못했습니다.</li>";
+  }
 };
 closeListBtn.onclick = () => (listModal.style.display = "none");
 
@@ -79,7 +93,7 @@ doneList.addEventListener("click", async (e) => {
   if (!li) return;
   const filename = li.textContent.replace("📄", "").trim().replace(".wav", "");
   try {
-    const res = await fetch(`/static/data/${filename}.json`);
+    const res = await fetch(`/api/meetings/${encodeURIComponent(filename)}`);
     if (!res.ok) return alert("❌ 요약본을 찾을 수 없습니다.");
     const data = await res.json();
     currentMeetingFile = filename;
@@ -120,35 +134,51 @@ async function analyzeFile(filename) {
   progressPercent.textContent = "0%";
 
   try {
-    // 1️⃣ 가짜 진행률 (0~90%)
-    let progress = 0;
-    const timer = setInterval(() => {
-      progress = Math.min(progress + Math.random() * 5, 90);
-      progressBar.style.width = progress + "%";
-      progressPercent.textContent = Math.floor(progress) + "%";
-
-      if (progress < 30) progressText.textContent = "🎧 음성 STT 변환 중...";
-      else if (progress < 60) progressText.textContent = "🧠 회의 요약 생성 중...";
-      else if (progress < 90) progressText.textContent = "🗓 액션아이템 추출 중...";
-    }, 400);
-
-    // 2️⃣ 실제 API 요청
-    const res = await fetch("/analyze_meeting", {
+    // 1️⃣ 분석 작업 등록
+    const res = await fetch("/api/jobs", {
       method: "POST",
       headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ filename }),
     });
+    if (!res.ok) throw new Error("❌ 분석 요청 실패");
+    const job = await res.json();
 
-    clearInterval(timer);
-
-    if (!res.ok) throw new Error("❌ 분석 실패");
+    // 2️⃣ 서버가 보내는 실제 단계별 진행 이벤트 수신 (SSE)
+    await new Promise((resolve, reject) => {
+      const source = new EventSource(`/api/jobs/${job.job_id}/events`);
+      source.addEventListener("progress", (e) => {
+        const ev = JSON.parse(e.data);
+        if (ev.percent !== null && ev.percent !== undefined) {
+          progressBar.style.width = ev.percent + "%";
+          progressPercent.textContent = Math.floor(ev.percent) + "%";
+        }
+        const elapsed = ev.elapsed !== undefined ? ` (${ev.elapsed.toFixed(1)}초)` : "";
+        progressText.textContent =
+          ev.status === "end" ? `${ev.label} 완료${elapsed}` : `${ev.label} 중...${elapsed}`;
+      });
+      source.addEventListener("done", () => {
+        source.close();
+        resolve();
+      });
+      ["failed", "cancelled"].forEach((type) =>
+        source.addEventListener(type, (e) => {
+          source.close();
+          reject(new Error(JSON.parse(e.data).error || "❌ 분석 실패"));
+        })
+      );
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED) reject(new Error("❌ 진행 상황 연결 끊김"));
+      };
+    });
 
     // 3️⃣ 완료 단계
+    const resultRes = await fetch(`/api/jobs/${job.job_id}/result`);
+    if (!resultRes.ok) throw new Error("❌ 분석 실패");
     progressBar.style.width = "100%";
     progressPercent.textContent = "100%";
     progressText.textContent = "✅ 분석 완료!";
 
-    const data = await res.json();
+    const data = await resultRes.json();
     currentMeetingFile = filename;
     document.getElementById("topic_summary").value = data.topic_summary || "";
     document.getElementById("content_summary").value = data.content_summary || "";
@@ -156,6 +186,7 @@ async function analyzeFile(filename) {
     actionItems = data.action_items || [];
     updateCalendar();
     analyzedMeetings.push(filename);
+    refreshActionItems();
     newMeetingFiles = newMeetingFiles.filter((f) => f !== filename);
 
     // 4️⃣ 완료 후 숨기기
@@ -182,10 +213,33 @@ document.addEventListener("DOMContentLoaded", () => {
     dateClick: (info) => showTodosModal(info.dateStr),
   });
   calendar.render();
+  refreshActionItems();
   document.getElementById("closeTodoModalBtn").onclick = () =>
     (document.getElementById("todoModal").style.display = "none");
 });
 
+// =========================
+// 전체 액션아이템 변경분 동기화
+// =========================
+async function refreshActionItems() {
+  try {
+    const res = await fetch(`/api/action_items/changes?since=${actionVersion}`);
+    const data = await res.json();
+    data.items.forEach((a) => allActionItems.set(`${a.meeting}#${a.idx}`, a));
+    data.deleted.forEach((d) => allActionItems.delete(`${d.meeting}#${d.idx}`));
+    actionVersion = data.version;
+    updateCalendar();
+  } catch (err) {
+    console.error(err);
+  }
+}
+
+// 현재 회의를 제외한 다른 회의들의 액션아이템
+function otherMeetingItems() {
+  const current = (currentMeetingFile || "").replace(".wav", "");
+  return [...allActionItems.values()].filter((a) => a.meeting !== current);
+}
+
 // =========================
 // 캘린더/ToDo 갱신
 // =========================
@@ -193,6 +247,18 @@ function updateCalendar() {
   if (!calendar) return;
   calendar.removeAllEvents();
 
+  const otherItems = otherMeetingItems().filter((a) => a.due);
+  if (otherItems.length > 0) {
+    calendar.addEventSource(
+      otherItems.map((a) => ({
+        title: `${a.name || "담당자 미상"} — ${a.task}`,
+        start: a.due,
+        backgroundColor: "#b8b8c8",
+        borderColor: "#a0a0b0",
+      }))
+    );
+  }
+
   const validItems = (actionItems || []).filter((a) => a.due);
   if (validItems.length > 0) {
     calendar.addEventSource(
@@ -230,7 +296,7 @@ function updateCalendar() {
 // 날짜별 ToDo 모달
 // =========================
 function showTodosModal(dateStr) {
-  const todos = actionItems.filter((a) => a.due === dateStr);
+  const todos = [...actionItems, ...otherMeetingItems()].filter((a) => a.due === dateStr);
   const modal = document.getElementById("todoModal");
   const list = document.getElementById("todoModalList");
   const title = document.getElementById("todoModalTitle");
@@ -253,18 +319,42 @@ function showEditModal(i) {
 }
 
 closeEditBtn.onclick = () => (editModal.style.display = "none");
-saveEditBtn.onclick = () => {
-  const name = editNameEl.value.trim() || "담당자 미상";
-  const due = editDueEl.value || null;
-  actionItems[editIndex].name = name;
-  actionItems[editIndex].due = due;
+saveEditBtn.onclick = async () => {
+  const item = actionItems[editIndex];
+  const changes = {
+    name: editNameEl.value.trim() || "담당자 미상",
+    due: editDueEl.value || null,
+  };
   editModal.style.display = "none";
-  updateCalendar();
 
-  fetch("/api/update_action_item", {
-    method: "POST",
-    headers: { "Content-Type": "application/json" },
-    body: JSON.stringify({ meeting_file: currentMeetingFile, updated_items: actionItems }),
-  });
+  // 서버에 저장되지 않은 항목(결정사항에서 만든 임시 항목)은 화면에만 반영
+  if (!item.id) {
+    Object.assign(item, changes);
+    updateCalendar();
+    return;
+  }
+
+  // 바뀐 필드 + 내가 본 version만 전송 (다른 사람이 먼저 고쳤으면 409)
+  try {
+    const res = await fetch(`/api/action_items/${item.id}`, {
+      method: "PATCH",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify({ ...changes, version: item.version }),
+    });
+    const data = await res.json();
+    if (res.status === 409) {
+      Object.assign(item, data.current);
+      alert("⚠️ 다른 사용자가 먼저 수정했습니다. 최신 내용을 불러왔습니다.");
+    } else if (!res.ok) {
+      throw new Error(data.error);
+    } else {
+      Object.assign(item, data.item);
+    }
+  } catch (err) {
+    console.error(err);
+    alert("❌ 수정 내용을 저장하지 못했습니다.");
+  }
+  updateCalendar();
+  refreshActionItems();
 };
 window.showEditModal = showEditModal;
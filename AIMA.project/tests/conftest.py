@@ -0,0 +1,29 @@
+import os, sys, tempfile
+
+import pytest
+
+# 모듈 import 시점에 만들어지는 로컬 SQLite 파일(outbox 등)이 작업 디렉터리에 생기지 않도록
+_TMP = tempfile.mkdtemp(prefix="aima-test-")
+os.environ.setdefault("OUTBOX_PATH", os.path.join(_TMP, "outbox.db"))
+os.environ.setdefault("CATALOG_PATH", os.path.join(_TMP, "catalog.db"))
+os.environ.setdefault("SEARCH_PATH", os.path.join(_TMP, "search.db"))
+
+# src/ 모듈을 패키지 설치 없이 import (서버 실행 시와 같은 방식)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+import db_store  # noqa: E402  (sys.path 설정 뒤 import)
+
+
+@pytest.fixture
+def sqlite_pools(tmp_path, monkeypatch):
+    """원격 MySQL 대신 임시 디렉터리의 SQLite 파일로 대상 DB 풀 구성"""
+    monkeypatch.setattr(db_store, "SQLITE_DIR", str(tmp_path))
+    monkeypatch.setattr(db_store.time, "sleep", lambda s: None)  # 재시도 백오프 대기 생략
+    pools = {name: db_store.ConnectionPool(name, backend="sqlite", size=2) for name in db_store.TARGETS}
+    monkeypatch.setattr(db_store, "pools", pools)
+    monkeypatch.setattr(db_store, "_stats", {name: {"ok": 0, "failed": 0, "retries": 0, "last_error": None}
+                                             for name in db_store.TARGETS})
+    db_store.bootstrap()
+    yield pools
+    for pool in pools.values():
+        pool.close_all()
@@ -0,0 +1,136 @@
+import json, sqlite3, threading
+
+import pytest
+
+import db_store
+
+
+def summary(topic, items=()):
+    return {"topic_summary": topic, "content_summary": f"{topic} 내용", "decisions": ["결정"],
+            "action_items": [{"name": n, "task": t, "due": "2025-10-31"} for n, t in items]}
+
+
+def rows(pool):
+    with pool.connection() as conn:
+        return conn.execute(f"SELECT meeting_file, topic_summary, action_items FROM {pool.table} "
+                            f"ORDER BY meeting_file").fetchall()
+
+
+# ===================== 배치 upsert =====================
+def test_upsert_batch_inserts_and_updates_by_meeting_file(sqlite_pools):
+    db_store.upsert_batch("team", [
+        db_store.summary_row("a.wav", summary("첫 회의", [("윤성", "전처리")])),
+        db_store.summary_row("b.wav", summary("둘째 회의")),
+    ])
+    # 같은 meeting_file 재전송 → 행이 늘지 않고 내용만 갱신 (멱등)
+    db_store.upsert_batch("team", [db_store.summary_row("a.wav", summary("첫 회의 수정", [("정우", "리포트")]))])
+
+    result = rows(sqlite_pools["team"])
+    assert [r[0] for r in result] == ["a.wav", "b.wav"]
+    assert result[0][1] == "첫 회의 수정"
+    assert json.loads(result[0][2]) == [{"name": "정우", "task": "리포트", "due": "2025-10-31"}]
+    assert db_store.status()["targets"]["team"]["ok"] == 2
+
+
+def test_upsert_batch_targets_are_independent(sqlite_pools):
+    db_store.upsert_batch("personal", [db_store.summary_row("a.wav", summary("개인"))])
+    assert len(rows(sqlite_pools["personal"])) == 1
+    assert rows(sqlite_pools["team"]) == []
+
+
+# ===================== 재시도 =====================
+def test_transient_failure_is_retried(sqlite_pools, monkeypatch):
+    pool = sqlite_pools["team"]
+    real_connect, calls = pool._connect, []
+
+    def flaky_connect():
+        calls.append(1)
+        if len(calls) <= 2:
+            raise sqlite3.OperationalError("database is locked")
+        return real_connect()
+
+    pool.close_all()  # 풀에 남은 커넥션 없이 새로 연결하도록
+    monkeypatch.setattr(pool, "_connect", flaky_connect)
+    db_store.upsert_batch("team", [db_store.summary_row("a.wav", summary("재시도"))])
+
+    stats = db_store.status()["targets"]["team"]
+    assert stats["retries"] == 2 and stats["ok"] == 1 and stats["failed"] == 0
+    assert "locked" in stats["last_error"]
+    assert [r[0] for r in rows(pool)] == ["a.wav"]
+
+
+def test_persistent_failure_raises_after_retries(sqlite_pools, monkeypatch):
+    pool = sqlite_pools["team"]
+    pool.close_all()
+
+    def broken():
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(pool, "_connect", broken)
+    with pytest.raises(sqlite3.OperationalError):
+        db_store.upsert_batch("team", [db_store.summary_row("a.wav", summary("실패"))])
+    stats = db_store.status()["targets"]["team"]
+    assert stats["retries"] == db_store.WRITE_RETRIES and stats["failed"] == 1
+
+
+def test_data_error_is_raised_without_retry(sqlite_pools):
+    pool = sqlite_pools["team"]
+    with pool.connection() as conn:
+        conn.execute(f"CREATE TRIGGER reject BEFORE INSERT ON {pool.table} WHEN NEW.topic_summary = '거부' "
+                     f"BEGIN SELECT RAISE(ABORT, 'rejected'); END")
+        conn.commit()
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db_store.upsert_batch("team", [db_store.summary_row("a.wav", summary("거부"))])
+    stats = db_store.status()["targets"]["team"]
+    assert stats["retries"] == 0 and stats["failed"] == 1
+
+
+# ===================== 커넥션 풀 =====================
+def test_pool_reuses_idle_connection(sqlite_pools):
+    pool = sqlite_pools["team"]
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+
+
+def test_pool_discards_connection_after_error(sqlite_pools):
+    pool = sqlite_pools["team"]
+    with pytest.raises(RuntimeError):
+        with pool.connection() as broken:
+            raise RuntimeError("쿼리 실패")
+    with pool.connection() as conn:
+        assert conn is not broken
+
+
+def test_pool_blocks_when_all_slots_checked_out(sqlite_pools):
+    pool = sqlite_pools["team"]   # size=2
+    checked_out = threading.Semaphore(0)
+    release = threading.Event()
+    acquired = []
+
+    def hold():
+        with pool.connection():
+            checked_out.release()
+            release.wait(5)
+
+    holders = [threading.Thread(target=hold) for _ in range(2)]
+    for t in holders:
+        t.start()
+    for _ in holders:
+        assert checked_out.acquire(timeout=5)
+
+    def third():
+        with pool.connection() as conn:
+            acquired.append(conn)
+
+    waiter = threading.Thread(target=third)
+    waiter.start()
+    waiter.join(0.3)
+    assert acquired == []        # 두 슬롯이 다 쓰이는 동안 세 번째는 대기
+    release.set()
+    waiter.join(5)
+    for t in holders:
+        t.join(5)
+    assert len(acquired) == 1
@@ -0,0 +1,28 @@
+import os, time
+
+import docx_render
+
+
+def test_summary_key_ignores_action_item_id_and_version():
+    item = {"id": "m-1", "version": 1, "name": "소라", "task": "정리", "due": "2025-10-24"}
+    before = {"topic_summary": "주제", "action_items": [item]}
+    after = {"topic_summary": "주제", "action_items": [dict(item, version=2)]}
+    assert docx_render.summary_key("m", "2025-10-21", before) == docx_render.summary_key("m", "2025-10-21", after)
+    changed = {"topic_summary": "주제", "action_items": [dict(item, due="2025-10-31")]}
+    assert docx_render.summary_key("m", "2025-10-21", before) != docx_render.summary_key("m", "2025-10-21", changed)
+
+
+def test_evict_cache_keeps_recently_used_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(docx_render, "DOCX_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(docx_render, "DOCX_CACHE_MAX_FILES", 10)
+    now = time.time()
+    for i in range(15):
+        path = tmp_path / f"{i}.docx"
+        path.touch()
+        os.utime(path, (now, now - i * 60))  # 숫자가 클수록 오래 전에 사용
+    stale = tmp_path / "stale.docx"
+    stale.touch()
+    os.utime(stale, (now, now - (docx_render.CACHE_MAX_AGE_DAYS + 1) * 86400))
+
+    assert docx_render.evict_cache(force=True) == 7
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(f"{i}.docx" for i in range(9))
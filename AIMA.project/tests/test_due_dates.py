@@ -0,0 +1,32 @@
+from datetime import datetime
+
+import pytest
+
+from due_dates import normalize_due
+
+BASE = datetime(2025, 10, 23)  # 목요일
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("주말", "2025-10-25"),
+    ("주말까지", "2025-10-25"),
+    ("내주 월요일", "2025-10-27"),
+    ("내주까지", "2025-10-31"),
+    ("다음 주 초", "2025-10-27"),
+    ("다음 주 중반", "2025-10-29"),
+    ("다음 주말", "2025-11-01"),
+    ("이번 주 금요일", "2025-10-24"),
+    ("11월 초", "2025-11-10"),
+    ("11월 중순", "2025-11-20"),
+    ("12월 중", "2025-12-31"),
+    ("10월 말", "2025-10-31"),
+    ("다음 달 초", "2025-11-10"),
+    ("월초", "2025-11-10"),
+    ("월말", "2025-10-31"),
+])
+def test_relative_expressions(text, expected):
+    assert normalize_due(text, BASE) == expected
+
+
+def test_weekend_on_sunday_is_same_day():
+    assert normalize_due("주말", datetime(2025, 10, 26)) == "2025-10-26"
@@ -0,0 +1,68 @@
+import time, threading
+from concurrent.futures import CancelledError
+
+import pytest
+
+from llm_client import LLMClient, Limiter
+
+
+class Backend:
+    name, kind = "test:fake", "openai"
+
+
+@pytest.fixture
+def sim():
+    client = LLMClient()
+    client._limiters[Backend.name] = Limiter(1)
+    return client
+
+
+def slow_call(calls: list, seconds: float):
+    def fn():
+        calls.append(time.perf_counter())
+        time.sleep(seconds)
+        return "ok"
+    return fn
+
+
+def wait_until(predicate, timeout: float = 2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_timeout_keeps_slot_until_call_finishes_and_does_not_retry(sim):
+    calls = []
+    started = time.perf_counter()
+    with pytest.raises(TimeoutError):
+        sim.run(Backend, slow_call(calls, 0.5), timeout=0.1)
+    assert time.perf_counter() - started < 0.4
+    assert len(calls) == 1
+    # 스레드에서는 아직 실행 중 → 슬롯 반납 전
+    limiter = sim.limiter(Backend)
+    assert limiter.inflight == 1
+    assert wait_until(lambda: limiter.inflight == 0)
+
+
+def test_cancel_returns_immediately_but_holds_slot(sim):
+    calls, errors = [], []
+
+    def worker():
+        with sim.scope("job-1"):
+            try:
+                sim.run(Backend, slow_call(calls, 0.5))
+            except CancelledError as e:
+                errors.append(e)
+
+    t = threading.Thread(target=worker)
+    t.start()
+    assert wait_until(lambda: calls)
+    assert sim.cancel("job-1") == 1
+    t.join(timeout=0.3)
+    assert not t.is_alive() and errors
+
+    # 취소된 호출이 끝나기 전에는 다음 호출이 슬롯을 기다림
+    started = time.perf_counter()
+    assert sim.run(Backend, slow_call(calls, 0)) == "ok"
+    assert time.perf_counter() - started > 0.2
@@ -0,0 +1,106 @@
+import json, time, threading, urllib.error, urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+import llm_client
+import llm_router
+from llm_router import LLMRouter
+
+PROMPT = "철우: 2025년 10월 21일 회의입니다. 소라는 금요일까지 정리해주세요."
+
+
+class StubChat:
+    """스텁 서버의 /v1/chat/completions 를 직접 부르는 최소 chat 모델 (HTTP 오류는 SDK처럼 status/헤더를 담아 올림)"""
+
+    def __init__(self, base_url: str, timeout: float = 10):
+        self.url = f"{base_url}/chat/completions"
+        self.timeout = timeout
+
+    def invoke(self, prompt):
+        body = json.dumps({"messages": [{"role": "user", "content": prompt}]}).encode("utf-8")
+        req = urllib.request.Request(self.url, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                data = json.load(resp)
+        except urllib.error.HTTPError as e:
+            error = RuntimeError(f"stub HTTP {e.code}")
+            error.status_code = e.code
+            error.response = SimpleNamespace(status_code=e.code, headers=e.headers)
+            raise error
+        return SimpleNamespace(content=data["choices"][0]["message"]["content"], usage_metadata={})
+
+
+@pytest.fixture
+def stubs(monkeypatch):
+    """stubs(**옵션) → 스레드에서 도는 스텁 서버의 base_url. 테스트가 끝나면 모두 종료"""
+    servers = []
+
+    def start(**options):
+        server = llm_router.stub_server(0, jitter=0, **options)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+    monkeypatch.setattr(llm_router, "create_chat", lambda backend, temperature: StubChat(backend.base_url))
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def make_router(primary_url: str, backup_url: str) -> LLMRouter:
+    return LLMRouter(f"openai:primary@{primary_url},ollama:backup@{backup_url}")
+
+
+def call(router: LLMRouter, **options):
+    out, backend = router.invoke(lambda llm: llm.invoke(PROMPT), **options)
+    return json.loads(out.content), backend
+
+
+def test_falls_back_when_primary_returns_500(stubs, monkeypatch):
+    monkeypatch.setattr(llm_client, "MAX_RETRIES", 0)  # 같은 백엔드 재시도 없이 바로 다음 백엔드로
+    router = make_router(stubs(latency=0, fail_rate=1.0, status=500), stubs(latency=0.3))
+
+    payload, backend = call(router, hedge=False)
+    assert backend.name == "ollama:backup"
+    assert payload["action_items"][0]["name"] == "철우"
+    assert router.primary.stats.failure_rate() == 1.0
+
+
+def test_rate_limited_primary_cools_down_for_retry_after(stubs):
+    router = make_router(stubs(latency=0, fail_rate=1.0, status=429, retry_after_sec=7), stubs(latency=0.3))
+
+    started = time.time()
+    _, backend = call(router, hedge=False)
+    assert backend.name == "ollama:backup"
+    # Retry-After 만큼 1순위를 건너뜀 (다음 호출은 1순위에 요청하지 않음)
+    assert router.primary.stats.cooldown_until == pytest.approx(started + 7, abs=1)
+    assert [b.name for b in router.ranked()] == ["ollama:backup"]
+    _, backend = call(router, hedge=False)
+    assert backend.name == "ollama:backup"
+    assert len(router.primary.stats.samples) == 1
+
+
+def test_hedge_uses_first_response(stubs, monkeypatch):
+    monkeypatch.setattr(llm_router, "HEDGE_MIN_SEC", 0.1)
+    monkeypatch.setattr(llm_router, "HEDGE_DEFAULT_SEC", 0.1)
+    router = make_router(stubs(latency=1.5), stubs(latency=0.05))
+
+    started = time.perf_counter()
+    payload, backend = call(router, hedge=True)
+    assert backend.name == "ollama:backup"
+    assert time.perf_counter() - started < 1.0
+    assert payload["meeting_date"] == "2025-10-21"
+
+
+def test_chat_model_is_reused_per_backend_and_temperature(stubs, monkeypatch):
+    created = []
+    router = make_router(stubs(latency=0), stubs(latency=0))
+    monkeypatch.setattr(llm_router, "create_chat",
+                        lambda backend, temperature: created.append((backend.name, temperature)) or StubChat(backend.base_url))
+
+    for _ in range(3):
+        call(router, hedge=False)
+    call(router, hedge=False, temperature=0.7)
+    assert created == [("openai:primary", 0.2), ("openai:primary", 0.7)]
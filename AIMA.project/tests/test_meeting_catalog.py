@@ -0,0 +1,105 @@
+import json
+
+import pytest
+
+from meeting_catalog import MeetingCatalog, data_path, meeting_name
+
+
+def write(path, topic, items=()):
+    path.write_text(json.dumps({"topic_summary": topic, "meeting_date": "2024-10-23",
+                                "action_items": [{"name": n, "task": "보고서", "due": None} for n in items]},
+                               ensure_ascii=False), encoding="utf-8")
+
+
+def test_meeting_name_strips_legacy_wav_suffix():
+    assert meeting_name("static/data/10월 23일 회의록.wav.json") == "10월 23일 회의록"
+    assert meeting_name("static/data/10월 23일 회의록.json") == "10월 23일 회의록"
+    assert meeting_name("wav.file/10월 23일 회의록.wav.wav") == "10월 23일 회의록"
+
+
+def test_sync_prefers_canonical_json_over_legacy_twin(tmp_path):
+    write(tmp_path / "회의.wav.json", "예전")
+    write(tmp_path / "회의.json", "새것", items=["민수"])
+    write(tmp_path / "mock.wav.json", "mock")
+    catalog = MeetingCatalog(str(tmp_path / "catalog.db"))
+
+    assert catalog.sync_from_disk(str(tmp_path)) == 2
+    assert catalog.names() == {"회의", "mock"}
+    assert catalog.get("회의")["topic_summary"] == "새것"
+    assert catalog.get("mock")["meeting_file"] == "wav.file/mock.wav"
+    assert data_path("mock", str(tmp_path)) == str(tmp_path / "mock.wav.json")
+
+
+def test_sync_forgets_rows_catalogued_under_legacy_names(tmp_path):
+    write(tmp_path / "회의.json", "새것")
+    catalog = MeetingCatalog(str(tmp_path / "catalog.db"))
+    catalog.upsert("회의.wav", "2024-10-23", {"action_items": [{"name": "민수", "task": "보고서"}]},
+                   "wav.file/회의.wav.wav")
+
+    catalog.sync_from_disk(str(tmp_path))
+    assert catalog.names() == {"회의"}
+    assert catalog.action_items(meeting="회의.wav") == []
+    assert [d["meeting"] for d in catalog.action_changes(0)["deleted"]] == ["회의.wav"]
+
+
+def analysis(*items):
+    """LLM 추출 결과처럼 ID/버전 없는 요약"""
+    return {"topic_summary": "주간 회의", "content_summary": "", "decisions": [],
+            "action_items": [{"name": n, "task": t, "due": d} for n, t, d in items]}
+
+
+def test_reanalysis_keeps_ids_per_item_and_never_lowers_versions(tmp_path):
+    catalog = MeetingCatalog(str(tmp_path / "catalog.db"))
+    first = analysis(("민수", "보고서", "2025-10-24"), ("지은", "발표 자료", "2025-10-27"))
+    catalog.upsert("회의", "2025-10-23", first)
+    report, slides = (a["id"] for a in first["action_items"])
+    first["action_items"][0].update(due="2025-10-25", version=2)
+    catalog.upsert("회의", "2025-10-23", first)
+
+    # 재분석: 순서가 바뀌고 보고서 항목은 빠짐
+    second = analysis(("윤성", "예산 검토", "2025-10-30"), ("지은", "발표 자료", "2025-10-27"))
+    catalog.upsert("회의", "2025-10-23", second)
+    ids = {a["task"]: a for a in second["action_items"]}
+    assert ids["발표 자료"]["id"] == slides and ids["발표 자료"]["version"] == 1
+    assert ids["예산 검토"]["id"] not in (report, slides)
+    assert catalog.find_action_item(report) is None
+
+    # 한 번 삭제된 ID는 같은 내용이 다시 나와도 재사용하지 않음
+    third = analysis(("민수", "보고서", "2025-10-24"))
+    catalog.upsert("회의", "2025-10-23", third)
+    assert third["action_items"][0]["id"] not in (report, slides, ids["예산 검토"]["id"])
+
+
+def test_stale_patch_after_reanalysis_is_rejected(tmp_path, monkeypatch):
+    import action_items
+
+    catalog = MeetingCatalog(str(tmp_path / "catalog.db"))
+    monkeypatch.setattr(action_items, "catalog", catalog)
+    monkeypatch.setattr(action_items, "_schedule", lambda name: None)  # JSON/DOCX 지연 반영은 생략
+    first = analysis(("민수", "보고서", "2025-10-24"))
+    catalog.upsert("회의", "2025-10-23", first)
+    stale = first["action_items"][0]["id"]
+    action_items.patch_item(stale, {"due": "2025-10-31"}, 1)
+
+    catalog.upsert("회의", "2025-10-23", analysis(("지은", "예산 검토", "2025-10-30")))
+    with pytest.raises(action_items.ActionItemNotFound):
+        action_items.patch_item(stale, {"due": "2025-11-01"}, 1)
+    assert catalog.get("회의")["action_items"][0]["task"] == "예산 검토"
+
+
+def test_index_api_returns_item_version_usable_for_patch(tmp_path, monkeypatch):
+    import action_items
+
+    catalog = MeetingCatalog(str(tmp_path / "catalog.db"))
+    monkeypatch.setattr(action_items, "catalog", catalog)
+    monkeypatch.setattr(action_items, "_schedule", lambda name: None)
+    catalog.upsert("다른 회의", "2025-10-22", analysis(("지은", "발표 자료", None)))
+    catalog.upsert("회의", "2025-10-23", analysis(("민수", "보고서", "2025-10-24")))
+
+    (row,) = catalog.action_items(meeting="회의")
+    assert row["version"] == 1 and row["row_version"] > 1
+    patched = action_items.patch_item(row["id"], {"due": "2025-10-31"}, row["version"])
+
+    (changed,) = catalog.action_changes(row["row_version"])["items"]
+    assert changed["version"] == patched["version"] == 2
+    action_items.patch_item(changed["id"], {"name": "윤성"}, changed["version"])
@@ -0,0 +1,30 @@
+import meeting_search
+from meeting_search import SearchIndex
+
+
+def make_index(tmp_path) -> SearchIndex:
+    index = SearchIndex(str(tmp_path / "search.db"))
+    index.index_meeting("주간회의", {"topic_summary": "배포 일정 논의", "decisions": ["금요일 배포"]})
+    index.index_meeting("회고", {"topic_summary": "스프린트 회고", "content_summary": "배포 지연 원인"})
+    return index
+
+
+def test_long_query_does_not_exceed_sqlite_variable_limit(tmp_path):
+    index = make_index(tmp_path)
+    # 서로 다른 bigram 4만 개 → 예전에는 bigram마다 파라미터가 붙어 "too many SQL variables"
+    query = "배포 일정 " + " ".join(chr(0xAC00 + i // 200) + chr(0xB000 + i % 200) for i in range(40000))
+    result = index.search(query)
+    assert result["total"] == 2
+    assert result["results"][0]["name"] == "주간회의"
+
+
+def test_query_grams_are_capped(tmp_path, monkeypatch):
+    monkeypatch.setattr(meeting_search, "MAX_QUERY_GRAMS", 2)
+    index = make_index(tmp_path)
+    # 앞의 bigram 2개(스프, 프린)만 사용
+    assert [r["name"] for r in index.search("스프린트 배포")["results"]] == ["회고"]
+
+
+def test_best_field_without_postings_returns_empty(tmp_path):
+    index = make_index(tmp_path)
+    assert index._best_field("없는회의", ["배포"], "배포") == {"field": None, "snippet": ""}
@@ -0,0 +1,76 @@
+import pytest
+
+import outbox as outbox_module
+from outbox import Outbox
+
+
+def summary(topic):
+    return {"topic_summary": topic, "content_summary": "내용", "decisions": [], "action_items": []}
+
+
+@pytest.fixture
+def box(sqlite_pools, tmp_path):
+    return Outbox(path=str(tmp_path / "outbox.db"), targets=["team"])
+
+
+def delivered(pool):
+    with pool.connection() as conn:
+        return [r[0] for r in conn.execute(f"SELECT meeting_file FROM {pool.table} ORDER BY meeting_file")]
+
+
+def test_drain_delivers_latest_payload_per_meeting(box, sqlite_pools):
+    box.enqueue("a", summary("v1"))
+    box.enqueue("a", summary("v2"))
+    box.enqueue("b", summary("b"))
+    assert box.drain_once("team") == 3
+    assert delivered(sqlite_pools["team"]) == ["a", "b"]
+    assert box.status()["team"]["pending"] == 0
+
+
+def test_bad_record_goes_to_dead_letter_and_cursor_advances(box, sqlite_pools):
+    box.enqueue("a", summary("ok"))
+    bad = box.enqueue("broken", {"content_summary": "topic_summary 없음"})
+    box.enqueue("c", summary("ok"))
+
+    # 한도 전까지는 예외로 멈춰 있다가(백오프 재시도), MAX_ATTEMPTS 번째에 dead-letter로 옮기고 진행
+    for _ in range(outbox_module.MAX_ATTEMPTS - 1):
+        with pytest.raises(KeyError):
+            box.drain_once("team")
+    assert box.drain_once("team") == 3
+
+    assert delivered(sqlite_pools["team"]) == ["a", "c"]
+    dead = box.dead_letters("team")
+    assert [(d["seq"], d["meeting_file"], d["attempts"]) for d in dead] == [(bad, "broken", outbox_module.MAX_ATTEMPTS)]
+    assert box.status()["team"] == {"last_seq": 3, "pending": 0, "last_error": None, "dead_letters": 1}
+
+
+def test_connection_errors_are_not_counted_as_attempts(box, sqlite_pools, monkeypatch):
+    import sqlite3
+    box.enqueue("a", summary("ok"))
+    pool = sqlite_pools["team"]
+    pool.close_all()
+
+    def down():
+        raise sqlite3.OperationalError("unable to open database")
+
+    monkeypatch.setattr(pool, "_connect", down)
+    for _ in range(outbox_module.MAX_ATTEMPTS + 1):
+        with pytest.raises(sqlite3.OperationalError):
+            box.drain_once("team")
+    assert box.dead_letters() == []
+
+
+def test_schema_errors_are_retried_not_dead_lettered(box, monkeypatch):
+    class ProgrammingError(Exception):
+        """pymysql 1146 (테이블 없음) 과 같은 이름"""
+
+    def missing_table(target, rows):
+        raise ProgrammingError(1146, "Table 'meeting_summary' doesn't exist")
+
+    box.enqueue("a", summary("ok"))
+    monkeypatch.setattr(outbox_module.db_store, "upsert_batch", missing_table)
+    for _ in range(outbox_module.MAX_ATTEMPTS + 1):
+        with pytest.raises(ProgrammingError):
+            box.drain_once("team")
+    assert box.dead_letters() == []
+    assert box.status()["team"]["pending"] == 1